@@ -1,5 +1,6 @@
 # src/wavewarn/main.py
 from pathlib import Path
+from contextlib import asynccontextmanager
 import os
 
 # ---- Load environment variables from backend/.env BEFORE importing routes ----
@@ -34,11 +35,35 @@ from .routes import weather_openweather
 from .routes import openaq
 from .routes import admin_status
 from .routes import admin_config
+from .routes import admin_prewarm
+from .routes import admin_hotkeys
 from .routes import heatwave_analysis
 from .middleware.logging import RequestLogMiddleware
+from .middleware.deadline import DeadlineMiddleware
+from .utils import http_pool
+from .utils import openaq_catalogue
+from .utils import snapshot
+from .utils import prewarm
 # from .routes import imd  # keep commented until you add routes/imd.py
 
-app = FastAPI(title="Wave Warn V2 API")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # one pooled client per upstream host, shared by every provider client
+    http_pool.open_pools()
+    # load/refresh the OpenAQ station index in the background
+    openaq_catalogue.start_refresher()
+    # index the last cache snapshot (entries load on first use) and checkpoint periodically
+    snapshot.start()
+    # keep configured/most-requested locations fresh ahead of their expiry
+    prewarm.start()
+    _startup_debug()
+    yield
+    openaq_catalogue.stop_refresher()
+    prewarm.stop()
+    snapshot.stop()     # final checkpoint
+    await http_pool.close_pools()
+
+app = FastAPI(title="Wave Warn V2 API", lifespan=lifespan)
 
 # ---- CORS (as you had) ----
 app.add_middleware(
@@ -48,6 +73,7 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(DeadlineMiddleware)
 app.add_middleware(RequestLogMiddleware)
 
 # ---- Core health & utility routes ----
@@ -71,8 +97,7 @@ def __env():
     return {"OPENAQ_API_KEY_loaded": bool(k), "key_preview": masked}
 
 # (Optional) print all registered routes & env status on startup
-@app.on_event("startup")
-async def _startup_debug():
+def _startup_debug():
     k = os.getenv("OPENAQ_API_KEY")
     masked = (k[:4] + "***" + k[-4:]) if k and len(k) >= 8 else (k or "")
     print(f"\n[ENV DEBUG] OPENAQ_API_KEY loaded? {'YES' if k else 'NO'} {masked}\n")
@@ -105,6 +130,8 @@ app.include_router(weather_provider.router, tags=["sources-weather"])
 app.include_router(weather_openweather.router, tags=["sources-weather"])
 app.include_router(admin_status.router)
 app.include_router(admin_config.router)
+app.include_router(admin_prewarm.router)
+app.include_router(admin_hotkeys.router)
 app.include_router(heatwave_analysis.router, tags=["risk"])
 # app.include_router(imd.router, tags=["sources-imd"])  # keep commented for now
 
@@ -0,0 +1,16 @@
+# src/wavewarn/middleware/deadline.py
+import os
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.requests import Request
+from ..utils import deadline
+
+# whole-request budget (s) shared by every upstream call the request makes
+REQUEST_DEADLINE_S = float(os.getenv("REQUEST_DEADLINE_S", "25"))
+
+class DeadlineMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request: Request, call_next):
+        # admin jobs (prewarm etc.) are long by design
+        if request.url.path.startswith("/admin/"):
+            return await call_next(request)
+        with deadline.within(REQUEST_DEADLINE_S):
+            return await call_next(request)
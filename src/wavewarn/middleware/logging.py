@@ -4,6 +4,9 @@ import logging
 from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.requests import Request
 
+from ..utils.grid import wx_grid
+from ..utils.hot_locations import route_hot
+
 logger = logging.getLogger("wavewarn.api")
 logging.basicConfig(level=logging.INFO)
 
@@ -12,6 +15,15 @@ class RequestLogMiddleware(BaseHTTPMiddleware):
         t0 = time.time()
         resp = await call_next(request)
         dt = (time.time() - t0) * 1000.0
+        q = request.query_params
+        if "lat" in q and "lon" in q:
+            # per route and weather cell, for /admin/hotkeys
+            try:
+                lat, lon = float(q["lat"]), float(q["lon"])
+            except ValueError:
+                pass
+            else:
+                route_hot.note(f"{request.url.path} {wx_grid.key(lat, lon, count=False)}", lat, lon)
         logger.info("%s %s → %s in %.1f ms",
                     request.method, request.url.path, resp.status_code, dt)
         return resp
@@ -0,0 +1,31 @@
+# src/wavewarn/routes/admin_hotkeys.py
+from fastapi import APIRouter, Query
+from ..utils.hot_locations import wx_hot, aq_hot, route_hot
+
+router = APIRouter(prefix="/admin", tags=["admin"])
+
+_SOURCES = {"weather": wx_hot, "air": aq_hot, "routes": route_hot}
+
+@router.get("/hotkeys")
+def hotkeys(
+    n: int = Query(50, ge=1, le=1000),
+    min_count: int = Query(1, ge=1),
+    as_points: bool = Query(False, description="weather top-n as a POST /admin/prewarm body"),
+):
+    """
+    Heaviest cache cells by estimated lookups (count-min sketch + top-k, decayed hourly).
+    `coverage` is the share of lookups the top-N keys account for.
+    """
+    if as_points:
+        return {"points": [{"lat": lat, "lon": lon} for _, lat, lon, _ in wx_hot.top(n, min_count)]}
+    return {
+        "ok": True,
+        **{
+            name: {
+                "top": [{"key": k, "lat": lat, "lon": lon, "count": c} for k, lat, lon, c in hot.top(n, min_count)],
+                "coverage": hot.coverage(10, 100, hot.sketch.k),
+                "sketch": hot.stats(),
+            }
+            for name, hot in _SOURCES.items()
+        },
+    }
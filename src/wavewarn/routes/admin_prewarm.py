@@ -0,0 +1,31 @@
+# src/wavewarn/routes/admin_prewarm.py
+from fastapi import APIRouter
+from pydantic import BaseModel, Field
+from typing import List
+from ..utils.openmeteo_batch import fetch_weather_batch, fetch_air_batch
+
+router = APIRouter(prefix="/admin", tags=["admin"])
+
+class Point(BaseModel):
+    lat: float = Field(..., ge=-90.0, le=90.0)
+    lon: float = Field(..., ge=-180.0, le=180.0)
+
+class PrewarmRequest(BaseModel):
+    points: List[Point] = Field(..., min_length=1, max_length=5000)
+    weather_days: int = Field(5, ge=1, le=16)
+    air_days: int = Field(5, ge=1, le=5)
+
+@router.post("/prewarm")
+def prewarm(req: PrewarmRequest):
+    """
+    Fill weather + air caches for many points with batched Open-Meteo calls.
+    """
+    coords = [(p.lat, p.lon) for p in req.points]
+    wx = fetch_weather_batch(coords, days=req.weather_days)
+    aq = fetch_air_batch(coords, days=req.air_days)
+    return {
+        "ok": True,
+        "points": len(coords),
+        "weather_ready": len(wx),
+        "air_ready": len(aq),
+    }
@@ -1,7 +1,18 @@
 # src/wavewarn/routes/admin_status.py
 from fastapi import APIRouter
 import os
-from ..utils.cache import wx_cache
+from ..utils.cache import wx_cache, aq_cache, cur_cache
+from ..utils.singleflight import wx_flight, aq_flight
+from ..utils.revalidate import wx_revalidator, aq_revalidator
+from ..utils.grid import wx_grid, aq_grid
+from ..utils.response_cache import response_cache
+from ..utils.negative_cache import negative_cache
+from ..utils.freshness import wx_freshness, aq_freshness
+from ..utils import http_pool, snapshot, prewarm
+from ..utils.weather_provider import hedge_stats
+from ..utils import rate_limit, circuit_breaker
+from ..utils.openaq_catalogue import catalogue
+from ..utils.openaq_series import series_store
 
 router = APIRouter(prefix="/admin", tags=["admin"])
 
@@ -14,8 +25,36 @@ def status():
             "OWM_MAX_PER_MINUTE": os.getenv("OWM_MAX_PER_MINUTE", "50"),
             "OWM_API_KEY_set": bool(os.getenv("OWM_API_KEY")),
         },
+        "rate_limits": rate_limit.stats(),
+        "circuit_breakers": circuit_breaker.stats(),
+        "weather_hedge": hedge_stats(),
         "cache": {
             "weather": wx_cache.stats(),
-        }
+            "air": aq_cache.stats(),
+            "current": cur_cache.stats(),
+            "responses": response_cache.stats(),
+            "negative": negative_cache.stats(),
+        },
+        "singleflight": {
+            "weather": wx_flight.stats(),
+            "air": aq_flight.stats(),
+        },
+        "cache_grid": {
+            "weather": wx_grid.stats(),
+            "air": aq_grid.stats(),
+        },
+        "freshness": {
+            "weather": wx_freshness.stats(),
+            "air": aq_freshness.stats(),
+        },
+        "cache_snapshot": snapshot.stats(),
+        "prewarm": prewarm.stats(),
+        "revalidate": {
+            "weather": wx_revalidator.stats(),
+            "air": aq_revalidator.stats(),
+        },
+        "http_pool": http_pool.stats(),
+        "openaq_catalogue": catalogue.stats(),
+        "openaq_series": series_store.stats(),
     }
 
@@ -1,6 +1,7 @@
 # src/wavewarn/routes/air_quality_openmeteo.py
 from fastapi import APIRouter, Query, HTTPException
 from ..utils.openmeteo_air_client import fetch_air_quality, OMAirError
+from ..utils.cache import data_age_s
 from ..utils.aqi import aqi_pm25, aqi_o3, aqi_overall, aqi_tier
 
 router = APIRouter(prefix="/sources/air", tags=["sources-air"])
@@ -29,6 +30,7 @@ def air_openmeteo(
             "ok": True,
             "location": {"lat": lat, "lon": lon},
             "forecast_days": days,
+            "data_age_s": data_age_s(js),
             "latest": latest,
             "timeline": points,
             "source": "Open-Meteo Air Quality"
@@ -2,6 +2,7 @@
 from fastapi import APIRouter, Query, HTTPException
 from typing import Dict, Any, List, Optional
 from ..utils.openmeteo_air_client import fetch_air_quality, OMAirError
+from ..utils.cache import data_age_s
 from ..utils.aqi import aqi_pm25, aqi_o3, aqi_overall, aqi_tier
 
 router = APIRouter(prefix="/forecast/air", tags=["forecast"])
@@ -43,6 +44,7 @@ def air_forecast_hourly(
             "ok": True,
             "location": {"lat": lat, "lon": lon},
             "hours": len(points),
+            "data_age_s": data_age_s(js),
             "latest": latest,
             "max_hour": max_point,
             "timeline": points,
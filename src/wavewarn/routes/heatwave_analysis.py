@@ -9,6 +9,8 @@ from .risk import (
     tier_from_score,
     drivers_from_score,
 )
+from ..utils.openmeteo_weather_client import _ck as _wx_ck
+from ..utils.response_cache import response_cache, version_of
 
 router = APIRouter(prefix="/heatwave", tags=["heatwave"])
 
@@ -170,6 +172,11 @@ def heatwave_analysis_daily(
         hours = days * 24
 
         js = fetch_openmeteo_hourly(lat, lon, hours=hours)
+        rkey = response_cache.key("heatwave_daily", (_wx_ck(lat, lon),), (version_of(js),), days=days)
+        hit = response_cache.get(rkey, location={"lat": lat, "lon": lon})
+        if hit is not None:
+            return hit
+
         h = js.get("hourly", {})
 
         times = h.get("time", [])
@@ -254,7 +261,7 @@ def heatwave_analysis_daily(
         peak_tier = peak.get("tier") if peak else None
         peak_hour = peak.get("peak_hour") if peak else None
 
-        return {
+        return response_cache.put(rkey, {
             "ok": True,
             "location": {
                 "lat": lat,
@@ -277,7 +284,7 @@ def heatwave_analysis_daily(
             "peak_severity": _severity_label(peak_tier) if peak_tier else None,
             "peak_hour": peak_hour,
             "recommendations": _recommendations(heatwave_active, peak_tier),
-        }
+        })
 
     except Exception as e:
         raise HTTPException(
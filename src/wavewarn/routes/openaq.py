@@ -1,17 +1,71 @@
 # src/wavewarn/routes/openaq.py
+import asyncio
+import os
 import httpx
+from typing import Any, Dict, List, Optional, Tuple
 from fastapi import APIRouter, Query, HTTPException
 from ..utils.openaq_v3_client import (
-    get_locations_near, get_sensors_by_location, choose_sensor_for_params,
-    get_location_latest, extract_pm25_o3_from_latest,
-    get_sensor_hours, summarize_hours_to_latest, OpenAQV3Error
+    get_locations_near_async, get_sensors_by_location_async, choose_sensor_for_params,
+    get_location_latest_async, extract_pm25_o3_from_latest,
+    summarize_hours_to_latest, OpenAQV3Error
 )
+from ..utils.openaq_series import series_store
+from ..utils.circuit_breaker import CircuitOpen
+from ..utils.openaq_catalogue import catalogue
+from ..utils.negative_cache import negative_cache, client_error
 from ..utils.aqi import aqi_pm25, aqi_o3, aqi_overall, aqi_tier
 
 router = APIRouter(prefix="/sources/openaq", tags=["sources-openaq"])
 
+# stations probed at once (each probe is 1-3 OpenAQ calls)
+PROBE_CONCURRENCY = int(os.getenv("OPENAQ_PROBE_CONCURRENCY", "6"))
+
+WANTED = ["pm25", "o3"]
+
+Reading = Tuple[Optional[float], Optional[float], Optional[str]]
+
+async def _ring(lat: float, lon: float, radius_m: int, limit: int) -> List[Dict[str, Any]]:
+    # local station index when it's loaded; live discovery otherwise
+    if catalogue.ready():
+        return catalogue.nearest(lat, lon, k=limit, radius_m=radius_m, parameters=WANTED)
+    return await get_locations_near_async(lat, lon, radius_m=radius_m, limit=limit)
+
+async def _probe(loc: Dict[str, Any], hours: int, sem: asyncio.Semaphore, flaky: set) -> Optional[Reading]:
+    """pm25/o3 for one station: /latest first, else the best sensor's hours. None = no data (id added to flaky if unsure)."""
+    async with sem:
+        pm25_val, o3_val, station_name = None, None, loc.get("name")
+        try:
+            latest = await get_location_latest_async(loc["id"])
+            if latest:
+                pm25_val, o3_val, station_name = extract_pm25_o3_from_latest(latest)
+        except (CircuitOpen, OpenAQV3Error):
+            raise
+        except Exception:
+            pass
+
+        if pm25_val is None and o3_val is None:
+            try:
+                # catalogue/discovery records usually carry sensors already
+                sensors = loc.get("sensors") or await get_sensors_by_location_async(loc["id"])
+                sensor = choose_sensor_for_params(sensors, WANTED)
+                if sensor:
+                    # buffered per sensor; only hours we haven't seen go upstream
+                    rows = await series_store.hours(sensor["id"], hours=hours)
+                    v, p = summarize_hours_to_latest(rows)
+                    if p == "pm25": pm25_val = v
+                    if p == "o3":   o3_val = v
+            except (CircuitOpen, OpenAQV3Error):
+                raise
+            except httpx.HTTPError:
+                flaky.add(loc["id"])
+                return None     # one flaky station shouldn't sink the search
+
+        if pm25_val is None and o3_val is None:
+            return None
+        return pm25_val, o3_val, station_name
+
 @router.get("/nearby")
-def openaq_nearby(
+async def openaq_nearby(
     lat: float = Query(...),
     lon: float = Query(...),
     radius_m: int = Query(10000, ge=1000, le=120000),
@@ -22,49 +76,57 @@ def openaq_nearby(
     """
     v3-compliant flow with robust search:
       - filter locations that have pm25/o3
-      - try up to N closest locations
+      - probe up to N closest locations concurrently, nearest with data wins
       - for each: try /latest, else /sensors/{id}/hours
-      - expand radius up to ~120km if needed
+      - expand radius up to ~120km if needed (the next ring is discovered while
+        the current one is probed; farther rings only if it comes to that)
+      - rings come from the local station catalogue when it is loaded
+      - "no data" and per-point 4xx outcomes are negative-cached per cell
     """
+    cell = f"{negative_cache.cell(lat, lon)}:r{radius_m}:x{int(expand_search)}:h{hours}:n{max_locations}"
+    known = negative_cache.get("openaq", cell)
+    if known is not None:
+        if known["kind"] == "error":
+            raise HTTPException(status_code=known["status"], detail=known["detail"])
+        return known["body"]
+
+    radii: List[int] = [radius_m]
+    for _ in range(3 if expand_search else 0):   # up to 4 rings
+        radii.append(int(radii[-1] * 1.75))       # expand faster
+
+    sem = asyncio.Semaphore(PROBE_CONCURRENCY)
+    tasks: List[asyncio.Future] = []
     try:
-        wanted = ["pm25", "o3"]
-        tried_radii = []
-        r = radius_m
+        rings: Dict[int, asyncio.Future] = {}
 
-        for _ in range(4 if expand_search else 1):  # up to 4 expansions
-            locs = get_locations_near(lat, lon, radius_m=r, limit=max_locations)
-            tried_radii.append(r)
+        def discover(i: int) -> None:
+            if i < len(radii) and i not in rings:
+                rings[i] = asyncio.ensure_future(_ring(lat, lon, radii[i], max_locations))
+                tasks.append(rings[i])
+
+        tried_radii: List[int] = []
+        probed = set()
+        flaky: set = set()
 
+        discover(0)
+        for i, r in enumerate(radii):
+            # one ring of look-ahead: its discovery overlaps this ring's probes, and
+            # a hit here cancels it (finally) before any farther ring costs a call
+            discover(i + 1)
+            tried_radii.append(r)
+            locs = [l for l in (await rings[i])[:max_locations] if l["id"] not in probed]
             if not locs:
-                r = int(r * 1.75)  # expand faster
                 continue
+            probed.update(l["id"] for l in locs)
 
-            # iterate through several closest locations
-            for loc in locs[:max_locations]:
-                loc_id = loc["id"]
-                station_name = loc.get("name")
-
-                # A) try /latest
-                pm25_val, o3_val = None, None
-                try:
-                    latest = get_location_latest(loc_id)
-                    if latest:
-                        pm25_val, o3_val, station_name = extract_pm25_o3_from_latest(latest)
-                except Exception:
-                    pass
-
-                # B) fallback by sensor hours if latest had nothing
-                if pm25_val is None and o3_val is None:
-                    sensors = get_sensors_by_location(loc_id)
-                    sensor = choose_sensor_for_params(sensors, wanted)
-                    if sensor:
-                        rows = get_sensor_hours(sensor["id"], hours=hours)
-                        v, p = summarize_hours_to_latest(rows)
-                        if p == "pm25": pm25_val = v
-                        if p == "o3":   o3_val = v
-
-                if pm25_val is None and o3_val is None:
+            probes = [asyncio.ensure_future(_probe(l, hours, sem, flaky)) for l in locs]
+            tasks.extend(probes)
+            # awaited in distance order: the first hit is the nearest station with data
+            for loc, probe in zip(locs, probes):
+                reading = await probe
+                if reading is None:
                     continue  # try next location
+                pm25_val, o3_val, station_name = reading
 
                 a_pm25 = aqi_pm25(pm25_val)
                 a_o3   = aqi_o3(o3_val)
@@ -74,25 +136,67 @@ def openaq_nearby(
                     "ok": True,
                     "location_query": {"lat": lat, "lon": lon},
                     "search_radii_tried_m": tried_radii,
-                    "station": {"id": loc_id, "name": station_name},
+                    "station_index": "local" if catalogue.ready() else "api",
+                    "station": {"id": loc["id"], "name": station_name},
                     "pm25_ugm3": pm25_val,
                     "o3_ppb": o3_val,
                     "aqi": {"pm25": a_pm25, "o3": a_o3, "overall": a_all, "tier": aqi_tier(a_all)}
                 }
 
-            # if none of the locations had values, expand and retry
-            r = int(r * 1.75)
-
-        return {
+        body = {
             "ok": False,
             "msg": "No PM2.5/O3 data available after iterating locations and expanding radius.",
             "search_radii_tried_m": tried_radii
         }
+        if not flaky:   # a station that errored might have had data; don't pin "no data" on it
+            negative_cache.empty("openaq", cell, body["msg"], body=body)
+        return body
 
     except OpenAQV3Error as e:
         raise HTTPException(status_code=400, detail=str(e))
+    except CircuitOpen as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": f"{e.retry_in_s:.0f}"})
     except httpx.HTTPStatusError as e:
+        status = client_error(e)
+        if status is not None:
+            negative_cache.failed("openaq", cell, status, e.response.text)
         raise HTTPException(status_code=e.response.status_code, detail=e.response.text)
     except Exception as e:
         raise HTTPException(status_code=502, detail=f"OpenAQ v3 fetch/compute failed: {e}")
+    finally:
+        # farther stations / rings still in flight are no longer needed
+        for t in tasks:
+            if not t.done():
+                t.cancel()
+            elif not t.cancelled():
+                t.exception()   # mark retrieved; the error (if any) was already handled
 
+
+@router.get("/sensors/{sensor_id}/history")
+async def openaq_sensor_history(
+    sensor_id: int,
+    hours: int = Query(24, ge=1, le=168),
+):
+    """
+    Hourly values for one sensor, most recent first, from the local buffer
+    (topped up incrementally from /sensors/{id}/hours).
+    """
+    try:
+        rows = await series_store.hours(sensor_id, hours=hours)
+        points = [{"ts": r["period"]["datetimeFrom"]["utc"], "value": r["value"]} for r in rows]
+        return {
+            "ok": True,
+            "sensor_id": sensor_id,
+            "parameter": rows[0]["parameter"]["name"] if rows else None,
+            "hours": hours,
+            "points": points,
+            "count": len(points),
+        }
+    except OpenAQV3Error as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except CircuitOpen as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": f"{e.retry_in_s:.0f}"})
+    except httpx.HTTPStatusError as e:
+        raise HTTPException(status_code=e.response.status_code, detail=e.response.text)
+    except Exception as e:
+        raise HTTPException(status_code=502, detail=f"OpenAQ sensor history failed: {e}")
@@ -10,14 +10,20 @@ Paths:
 """
 
 from fastapi import APIRouter, Query, HTTPException
-from typing import List, Dict, Any
-import httpx
+from typing import Callable, List, Dict, Any, Optional
 from datetime import datetime, timezone, timedelta
 from ..models import RiskPoint, RiskTimeline
-
-from ..utils.openmeteo_air_client import fetch_air_quality
+from ..utils import http_pool
+from ..utils.cache import wx_cache, cur_cache
+from ..utils.grid import wx_grid
+from ..utils.singleflight import wx_flight
+from ..utils.columnar import loads
+from ..utils.compact import CompactHourly, expand
+from ..utils.response_cache import response_cache, version_of
+
+from ..utils.openmeteo_air_client import OMAirError, fetch_air_quality, _ck as _aq_ck
 from ..utils.forecast_utils import group_hourly_to_daily, daily_mean, daily_max, decay_extrapolate
-from ..utils.openmeteo_weather_client import fetch_weather_hourly
+from ..utils.openmeteo_weather_client import fetch_weather_hourly, _ck as _wx_ck
 from ..utils.aqi import aqi_pm25, aqi_o3, aqi_overall, aqi_tier
 
 router = APIRouter(prefix="/risk/model", tags=["risk-model"])
@@ -100,12 +106,15 @@ def daily_insight(heat_tier: str, aq_tier_value: str | None, peak_hour) -> str:
     return f"{heat_text} • Peak around {peak_hour}:00"
 
 
-def get_daily_air_quality(lat: float, lon: float, days: int) -> Dict[str, Dict[str, Any]]:
+def get_daily_air_quality(lat: float, lon: float, days: int,
+                          aq: Optional[dict] = None) -> Dict[str, Dict[str, Any]]:
+    """Daily AQI for `days` days; pass `aq` when the caller already fetched it (min(days, 5) days)."""
     try:
         aq_days = min(days, 5)
         extend_days = max(0, min(5, days - aq_days))
 
-        aq = fetch_air_quality(lat, lon, days=aq_days)
+        if aq is None:
+            aq = fetch_air_quality(lat, lon, days=aq_days)
         hh = aq.get("hourly", {})
 
         times = hh.get("time", [])
@@ -211,27 +220,116 @@ def get_daily_air_quality(lat: float, lon: float, days: int) -> Dict[str, Dict[s
         return {}
 
 
-def build_openmeteo_hourly_url(lat: float, lon: float, hours: int) -> str:
-    days = max(1, min(16, (hours + 23) // 24))
+MODEL_VARS = ("temperature_2m", "relative_humidity_2m", "wind_speed_10m", "shortwave_radiation", "cloud_cover")
+
+
+# one window per cell serves every /timeline length: the longest (72 h), plus
+# slack so the entry still covers it until its TTL runs out
+WINDOW_HOURS = 72 + 6
+
+
+def _model_ck(lat: float, lon: float) -> str:
+    # per provider grid cell, like the canonical entry (the caller already counted the lookup)
+    return f"om_model:{wx_grid.key(lat, lon, count=False)}:h{WINDOW_HOURS}"
+
+
+def build_openmeteo_window_url(lat: float, lon: float, hours: int) -> str:
+    # starts at the current hour, exactly `hours` long
+    return (
+        f"https://api.open-meteo.com/v1/forecast"
+        f"?latitude={lat}&longitude={lon}"
+        f"&hourly=temperature_2m,relative_humidity_2m"
+        f"&forecast_hours={hours}&past_hours=0"
+        f"&timezone=auto"
+    )
+
 
+def build_openmeteo_current_url(lat: float, lon: float) -> str:
     return (
         f"https://api.open-meteo.com/v1/forecast"
         f"?latitude={lat}&longitude={lon}"
-        f"&hourly=temperature_2m,relative_humidity_2m,wind_speed_10m,"
-        f"shortwave_radiation,cloud_cover"
-        f"&forecast_days={days}"
+        f"&current={','.join(MODEL_VARS)}"
         f"&timezone=auto"
     )
 
 
+def _get_json(make_ck: Callable[[], str], lat: float, lon: float, url: str, cache, *,
+              refresh: bool = False, compact: bool = False) -> dict:
+    """Cached Open-Meteo payload for url; compact=True stores hourly payloads as CompactHourly."""
+    ck = make_ck()
+
+    def _fetch():
+        r = http_pool.get("openmeteo", url)
+        r.raise_for_status()
+        js = loads(r.content)
+        wx_grid.learn(lat, lon, js)     # the payload names its grid cell: store (and find) it under that
+        value = CompactHourly.from_payload(js) if compact else js
+        cache.set(make_ck(), value)
+        return expand(value)    # same form as a later hit
+
+    if not refresh:
+        hit = cache.get(ck)
+        if hit:
+            return expand(hit)
+    return wx_flight.do(ck, _fetch)
+
+
 def fetch_openmeteo_hourly(lat: float, lon: float, hours: int) -> dict:
-    url = build_openmeteo_hourly_url(lat, lon, hours)
+    """Whole local days (midnight onwards) covering `hours`, sliced from the canonical weather forecast."""
+    days = max(1, min(16, (hours + 23) // 24))
+    return fetch_weather_hourly(lat, lon, days=days)
 
-    with httpx.Client(timeout=30.0) as c:
-        r = c.get(url, headers={"Accept": "application/json"})
 
-    r.raise_for_status()
-    return r.json()
+def _current_hour_index(js: dict) -> Optional[int]:
+    # hourly times are local (timezone=auto); find the hour we're in now
+    local = datetime.now(timezone.utc) + timedelta(seconds=js.get("utc_offset_seconds") or 0)
+    try:
+        return js["hourly"]["time"].index(local.strftime("%Y-%m-%dT%H:00"))
+    except (KeyError, ValueError):
+        return None
+
+
+def _window(js: dict, hours: int, variables) -> Optional[Dict[str, list]]:
+    """`variables` for now..now+hours from an hourly payload, or None if it doesn't cover that."""
+    h = js.get("hourly") or {}
+    if not all(v in h for v in variables):
+        return None
+    i = _current_hour_index(js)
+    if i is None or i + hours > len(h["time"]):
+        return None
+    return {v: h[v][i:i + hours] for v in ("time", *variables)}
+
+
+def fetch_openmeteo_window(lat: float, lon: float, hours: int) -> Dict[str, list]:
+    """temperature_2m/relative_humidity_2m for the next `hours` hours, starting now."""
+    variables = ("temperature_2m", "relative_humidity_2m")
+    # reuse the canonical forecast only if it is already cached: on a cold
+    # cache its 16-day fetch costs far more than this window
+    cached = wx_cache.lookup(_wx_ck(lat, lon))
+    hit = _window(expand(cached[0]), hours, variables) if cached else None
+    if hit is not None:
+        return hit
+    # not cached, or late in the canonical horizon: slice the cell's short window
+    make_ck = lambda: _model_ck(lat, lon)
+    url = build_openmeteo_window_url(lat, lon, WINDOW_HOURS)
+    js = _get_json(make_ck, lat, lon, url, wx_cache, compact=True)
+    hit = _window(js, hours, variables)
+    if hit is not None:
+        return hit
+    js = _get_json(make_ck, lat, lon, url, wx_cache, refresh=True, compact=True)
+    h = js.get("hourly") or {}
+    i = _current_hour_index(js) or 0
+    return {v: (h.get(v) or [])[i:i + hours] for v in ("time", *variables)}
+
+
+def fetch_openmeteo_current(lat: float, lon: float) -> Dict[str, Any]:
+    """Current conditions for MODEL_VARS: this hour of the canonical forecast, else `current=`."""
+    cached = wx_cache.lookup(_wx_ck(lat, lon))
+    hit = _window(expand(cached[0]), 1, MODEL_VARS) if cached else None
+    if hit is not None:
+        return {v: hit[v][0] for v in MODEL_VARS}
+    make_ck = lambda: f"om_cur:{wx_grid.key(lat, lon, count=False)}"
+    return _get_json(make_ck, lat, lon, build_openmeteo_current_url(lat, lon), cur_cache).get("current") or {}
 
 
 @router.get("/live", response_model=dict)
@@ -240,20 +338,13 @@ def model_live_risk(
     lon: float = Query(..., description="Longitude"),
 ):
     try:
-        js = fetch_openmeteo_hourly(lat, lon, hours=1)
-        h = js.get("hourly", {})
+        cur = fetch_openmeteo_current(lat, lon)
 
-        temps = h.get("temperature_2m", [])
-        rhs = h.get("relative_humidity_2m", [])
-        winds = h.get("wind_speed_10m", [])
-        radiation = h.get("shortwave_radiation", [])
-        clouds = h.get("cloud_cover", [])
-
-        t_now = temps[0] if temps else None
-        rh_now = rhs[0] if rhs else None
-        wind_now = winds[0] if winds else 0
-        radiation_now = radiation[0] if radiation else 0
-        cloud_now = clouds[0] if clouds else 0
+        t_now = cur.get("temperature_2m")
+        rh_now = cur.get("relative_humidity_2m")
+        wind_now = cur.get("wind_speed_10m") or 0
+        radiation_now = cur.get("shortwave_radiation") or 0
+        cloud_now = cur.get("cloud_cover") or 0
 
         score = score_hourly(t_now, rh_now)
         tier = tier_from_score(score)
@@ -292,8 +383,7 @@ def model_risk_timeline(
     hours: int = Query(24, ge=1, le=72, description="How many hours ahead"),
 ):
     try:
-        js = fetch_openmeteo_hourly(lat, lon, hours=hours)
-        h = js.get("hourly", {})
+        h = fetch_openmeteo_window(lat, lon, hours=hours)
 
         temps = h.get("temperature_2m", [])
         rhs = h.get("relative_humidity_2m", [])
@@ -354,7 +444,17 @@ def model_10_day_forecast(
     try:
         hours = days * 24
         js = fetch_openmeteo_hourly(lat, lon, hours=hours)
-        daily_aq = get_daily_air_quality(lat, lon, days)
+        try:
+            aq = fetch_air_quality(lat, lon, days=min(days, 5))
+        except OMAirError:
+            aq = None   # air is optional here; just don't cache the result
+        rkey = response_cache.key("risk_forecast", (_wx_ck(lat, lon), _aq_ck(lat, lon)),
+                                  (version_of(js), None if aq is None else version_of(aq)), days=days)
+        hit = response_cache.get(rkey, location={"lat": lat, "lon": lon})
+        if hit is not None:
+            return hit
+
+        daily_aq = {} if aq is None else get_daily_air_quality(lat, lon, days, aq=aq)
 
         h = js.get("hourly", {})
 
@@ -473,7 +573,7 @@ def model_10_day_forecast(
 
             final_days.append(day_data)
 
-        return {
+        return response_cache.put(rkey, {
             "ok": True,
             "location": {
                 "lat": lat,
@@ -482,7 +582,7 @@ def model_10_day_forecast(
             "days_requested": days,
             "days_returned": len(final_days),
             "days": final_days,
-        }
+        })
 
     except Exception as e:
         raise HTTPException(
@@ -3,8 +3,10 @@ from fastapi import APIRouter, Query, HTTPException
 from typing import Dict, Any, List, Optional
 
 from ..utils.settings import CFG
-from ..utils.weather_provider import get_hourly_weather, WeatherProviderError
-from ..utils.openmeteo_air_client import fetch_air_quality, OMAirError
+from ..utils.weather_provider import get_hourly_weather_async, WeatherProviderError
+from ..utils.openmeteo_air_client import fetch_air_quality_async, OMAirError
+from ..utils.fanout import gather_sources, required, SourceTimeout
+from ..utils.cache import data_age_s
 from ..utils.heat_math import heat_index_c, wbgt_shade_c, tier_from_heat
 from ..utils.aqi import aqi_overall, aqi_tier
 from ..utils.risk_unified import combine_tiers
@@ -12,7 +14,7 @@ from ..utils.risk_unified import combine_tiers
 router = APIRouter(prefix="/risk", tags=["risk"])
 
 @router.get("/unified/hourly")
-def unified_hourly(
+async def unified_hourly(
     lat: float = Query(...),
     lon: float = Query(...),
     days: int = Query(5, ge=1, le=5, description="Hourly horizon; matches AQ’s 1–5 day limit"),
@@ -22,13 +24,18 @@ def unified_hourly(
     """
     Hourly unified risk by fusing Heat (weather provider) + AQI (Open-Meteo air).
     If weights not provided, defaults come from runtime config.
+    Weather and air are fetched concurrently.
     """
     try:
         weight_heat = w_heat if w_heat is not None else CFG.weight_heat
         weight_aqi  = w_aqi  if w_aqi  is not None else CFG.weight_aqi
 
-        wx = get_hourly_weather(lat, lon, days=days)
-        aq = fetch_air_quality(lat, lon, days=days)
+        res = await gather_sources({
+            "weather": get_hourly_weather_async(lat, lon, provider=CFG.weather_provider_prefer, days=days),
+            "air": fetch_air_quality_async(lat, lon, days=days),
+        })
+        wx = required(res, "weather")
+        aq = required(res, "air")
 
         wt = wx.get("hourly", {}) or {}
         at = aq.get("hourly", {}) or {}
@@ -78,6 +85,7 @@ def unified_hourly(
             "hours": len(out),
             "weights": {"heat": weight_heat, "aqi": weight_aqi},
             "provider_weather": wx.get("provider"),
+            "data_age_s": data_age_s(wx, aq),
             "peak": peak,
             "timeline": out,
             "source": "Weather provider (OM/OWM) + Open-Meteo Air → WaveWarn fusion"
@@ -85,6 +93,8 @@ def unified_hourly(
 
     except (WeatherProviderError, OMAirError) as e:
         raise HTTPException(status_code=400, detail=str(e))
+    except SourceTimeout as e:
+        raise HTTPException(status_code=504, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=502, detail=f"Unified risk build failed: {e}")
 
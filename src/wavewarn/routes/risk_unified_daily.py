@@ -1,22 +1,27 @@
 # src/wavewarn/routes/risk_unified_daily.py
 from fastapi import APIRouter, Query, HTTPException
+from starlette.concurrency import run_in_threadpool
 from typing import Dict, Any, List, Optional
 
 from ..utils.settings import CFG
-from ..utils.weather_provider import get_hourly_weather, WeatherProviderError
-from ..utils.openmeteo_air_client import fetch_air_quality, OMAirError
+from ..utils.weather_provider import get_hourly_weather_async, WeatherProviderError
+from ..utils.openmeteo_air_client import fetch_air_quality_async, OMAirError, _ck as _aq_ck
+from ..utils.openmeteo_weather_client import fetch_weather_hourly_async, _ck as _wx_ck
 from ..utils.heat_math import heat_index_c, wbgt_shade_c, tier_from_heat
 from ..utils.aqi import aqi_overall, aqi_tier
 from ..utils.risk_unified import combine_tiers
 from ..utils.daily_reduce import group_by_day, reduce_day
 from ..routes.forecast_air_summary import air_forecast_summary
-from ..utils.waqi_client import fetch_geo, extract_latest, WAQIError
+from ..utils.waqi_client import fetch_geo_async, extract_latest
 from ..utils.aq_blend import blend_day1_with_waqi
+from ..utils.fanout import gather_sources, required, SourceTimeout, SOURCE_TIMEOUTS
+from ..utils.cache import data_age_s
+from ..utils.response_cache import response_cache, version_of
 
 router = APIRouter(prefix="/risk", tags=["risk"])
 
 @router.get("/unified/daily")
-def unified_daily(
+async def unified_daily(
     lat: float = Query(...),
     lon: float = Query(...),
     days_hourly: int = Query(5, ge=1, le=5, description="Days with hourly AQ (1–5)"),
@@ -29,8 +34,35 @@ def unified_daily(
         weight_heat = w_heat if w_heat is not None else CFG.weight_heat
         weight_aqi  = w_aqi  if w_aqi  is not None else CFG.weight_aqi
 
-        wx = get_hourly_weather(lat, lon, days=days_hourly)
-        aq = fetch_air_quality(lat, lon, days=days_hourly)
+        # all independent upstreams at once; the extension's weather horizon is
+        # prefetched so air_forecast_summary below only reads warm caches
+        sources = {
+            "weather": get_hourly_weather_async(lat, lon, provider=CFG.weather_provider_prefer, days=days_hourly),
+            "air": fetch_air_quality_async(lat, lon, days=days_hourly),
+        }
+        if use_waqi_day1:
+            sources["waqi"] = fetch_geo_async(lat, lon)
+        if extend_days > 0:
+            sources["weather_ext"] = fetch_weather_hourly_async(lat, lon, days=min(10, days_hourly + extend_days))
+        res = await gather_sources(sources, timeouts={"weather_ext": SOURCE_TIMEOUTS["weather"]})
+        wx = required(res, "weather")
+        aq = required(res, "air")
+
+        # the same inputs, weights and config always build the same days
+        waqi_data = res.get("waqi")
+        versions = [version_of(wx), version_of(aq)]
+        if extend_days > 0:
+            ext = res.get("weather_ext")
+            versions.append(version_of(ext) if isinstance(ext, dict) else None)
+        if use_waqi_day1:
+            latest = extract_latest(waqi_data) if isinstance(waqi_data, dict) else {}
+            versions.append((latest.get("pm25"), latest.get("o")))
+        rkey = response_cache.key("unified_daily", (_wx_ck(lat, lon), _aq_ck(lat, lon)), versions,
+                                  days_hourly=days_hourly, extend_days=extend_days, w_heat=weight_heat,
+                                  w_aqi=weight_aqi, waqi=use_waqi_day1, provider=wx.get("provider"))
+        hit = response_cache.get(rkey, location={"lat": lat, "lon": lon}, data_age_s=data_age_s(wx, aq))
+        if hit is not None:
+            return hit
 
         wt = wx.get("hourly", {}) or {}
         at = aq.get("hourly", {}) or {}
@@ -73,18 +105,15 @@ def unified_daily(
                 "confidence": "high"
             })
 
-        if use_waqi_day1 and days_partA:
-            try:
-                data = fetch_geo(lat, lon)
-                latest = extract_latest(data)
-                waqi_payload = {"pm25_ugm3": latest.get("pm25"), "o3_ppb": latest.get("o")}
-                days_partA[0] = blend_day1_with_waqi(days_partA[0], waqi_payload)
-            except WAQIError:
-                pass
+        # WAQI is best-effort: any failure/timeout just skips the Day 1 blend
+        if use_waqi_day1 and days_partA and isinstance(waqi_data, dict):
+            latest = extract_latest(waqi_data)
+            waqi_payload = {"pm25_ugm3": latest.get("pm25"), "o3_ppb": latest.get("o")}
+            days_partA[0] = blend_day1_with_waqi(days_partA[0], waqi_payload)
 
         days_partB: List[Dict[str, Any]] = []
         if extend_days > 0:
-            ext = air_forecast_summary(lat, lon, aq_days=days_hourly, extend_days=extend_days)
+            ext = await run_in_threadpool(air_forecast_summary, lat, lon, aq_days=days_hourly, extend_days=extend_days)
             if isinstance(ext, dict) and ext.get("ok"):
                 for r in ext.get("days", []):
                     if r.get("confidence") == "low":
@@ -95,16 +124,19 @@ def unified_daily(
                             "confidence": "low"
                         })
 
-        return {
+        return response_cache.put(rkey, {
             "ok": True,
             "location": {"lat": lat, "lon": lon},
             "weights": {"heat": weight_heat, "aqi": weight_aqi},
             "provider_weather": wx.get("provider"),
+            "data_age_s": data_age_s(wx, aq),
             "days": days_partA + days_partB
-        }
+        })
 
     except (WeatherProviderError, OMAirError) as e:
         raise HTTPException(status_code=400, detail=str(e))
+    except SourceTimeout as e:
+        raise HTTPException(status_code=504, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=502, detail=f"Unified daily build failed: {e}")
 
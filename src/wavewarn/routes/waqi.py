@@ -1,6 +1,7 @@
 # src/wavewarn/routes/waqi.py
 from fastapi import APIRouter, Query, HTTPException
 from ..utils.waqi_client import fetch_geo, extract_latest, WAQIError
+from ..utils.circuit_breaker import CircuitOpen
 from ..utils.aqi import aqi_pm25, aqi_o3, aqi_overall, aqi_tier
 
 router = APIRouter(prefix="/sources/aq", tags=["sources-air"])
@@ -42,6 +43,8 @@ def waqi_nearby(
         }
     except WAQIError as e:
         raise HTTPException(status_code=400, detail=str(e))
+    except CircuitOpen as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": f"{e.retry_in_s:.0f}"})
     except Exception as e:
         raise HTTPException(status_code=502, detail=f"WAQI fetch failed: {e}")
 
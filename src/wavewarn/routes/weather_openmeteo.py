@@ -2,6 +2,7 @@
 from fastapi import APIRouter, Query, HTTPException
 from typing import Dict, Any, List, Optional
 from ..utils.openmeteo_weather_client import fetch_weather_hourly, OMWeatherError
+from ..utils.cache import data_age_s
 
 router = APIRouter(prefix="/sources/wx", tags=["sources-weather"])
 
@@ -25,6 +26,7 @@ def wx_openmeteo(
             "ok": True,
             "location": {"lat": lat, "lon": lon},
             "hours": len(hh.get("time", []) or []),
+            "data_age_s": data_age_s(js),
             "timeline": {
                 "time": hh.get("time", []),
                 "temperature_2m": hh.get("temperature_2m", []),
@@ -1,5 +1,6 @@
 from typing import List, Dict, Any
 from collections import defaultdict
+from .columnar import HourlyFrame
 
 RowH = Dict[str, Any]
 RowD = Dict[str, Any]
@@ -28,6 +29,25 @@ def hourly_to_daily(hourly: List[RowH]) -> List[RowD]:
         })
     return out
 
+def frame_to_daily(frame: HourlyFrame, src: str = "OPEN-METEO(HOURLY)") -> List[RowD]:
+    """hourly_to_daily straight off the columns (T/RH/WS/SW/CLD); no per-hour dicts."""
+    out: List[RowD] = []
+    for day, a, b in sorted(frame.day_spans()):
+        T, RH = frame.present("T", a, b), frame.present("RH", a, b)
+        WS, SW = frame.present("WS", a, b), frame.present("SW", a, b)
+        CLD = frame.present("CLD", a, b)
+        out.append({
+            "date": day,
+            "TMAX": max(T)  if T  else None,
+            "TMIN": min(T)  if T  else None,
+            "RH":   sum(RH) / len(RH) if RH else None,
+            "WS":   max(WS) if WS else None,
+            "SW":   sum(SW) if SW else None,
+            "CLD":  sum(CLD) / len(CLD) if CLD else None,
+            "SRC":  src,
+        })
+    return out
+
 def score_risk(rows: List[RowD]) -> List[RowD]:
     for r in rows:
         tmax, rh = r.get("TMAX"), r.get("RH")
@@ -1,56 +1,390 @@
-# src/wavewarn/utils/cache.py
+import asyncio
+import heapq
+import os
+import threading
 import time
-from typing import Any, Dict, Tuple, Optional
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .cache_backends import CacheBackend, decode, encode, shared_backend, sizeof
+
+# (value, stored_at, fresh_until, drop_at, nbytes) -- wall-clock seconds
+_Entry = Tuple[Any, float, float, float, int]
+
+class _Stripe:
+    __slots__ = ("lock", "data", "heap", "cap", "cap_bytes", "bytes",
+                 "hits", "l1_misses", "misses", "snapshot_hits", "l2_hits",
+                 "sets", "evictions", "expired", "stale_served")
+
+    def __init__(self, cap: int, cap_bytes: Optional[int]):
+        self.lock = threading.Lock()
+        self.data: "OrderedDict[str, _Entry]" = OrderedDict()   # LRU order, oldest first
+        self.heap: List[Tuple[float, str]] = []                 # (drop_at, key) for expiry sweeps
+        self.cap = cap
+        self.cap_bytes = cap_bytes
+        self.bytes = 0
+        self.hits = self.l1_misses = self.misses = self.sets = 0     # hits: L1; misses: every tier
+        self.snapshot_hits = self.l2_hits = 0
+        self.evictions = self.expired = self.stale_served = 0
 
 class TTLCache:
     """
-    Very small in-process TTL cache for API responses.
-    Not multi-process safe; good enough for a single uvicorn worker.
+    In-process LRU + TTL cache for API responses.
+
+    Keys are spread over lock-striped shards, each an OrderedDict in LRU order,
+    so get/set are O(1) (plus an O(log n) heap push for expiry) at any size
+    and safe under the threadpool. Entries carry their own TTL; once past it
+    they are misses, but are kept for `stale_s` so get_stale() can serve
+    them during upstream outages. Past `soft_frac` of its TTL an entry is
+    still a hit, but lookup() flags it for a background refresh
+    (stale-while-revalidate, see revalidate.py). Dead entries are swept a
+    few at a time on every call instead of in a full scan.
+
+    Capacity is max_items and, if given, max_bytes: every entry is sized
+    once on insert (sizeof(); compact forecasts report their own nbytes)
+    and LRU eviction keeps each stripe under its share of both.
+
+    With a shared `backend` (see cache_backends) this is the L1 of a two-level
+    cache: L1 misses are looked up in the backend under `namespace` and
+    copied into L1, and set() writes through to both, so workers share
+    upstream fetches. peek() and clear() only look at L1. Code on the event
+    loop uses alookup()/aget_stale()/aset(), which do the blocking L2 (and
+    snapshot) I/O in a worker thread.
+
+    A `snapshot` (see snapshot.py) attached at startup is consulted on L1
+    misses before the backend: entries from the last checkpoint are decoded
+    and installed one key at a time, on first use.
     """
-    def __init__(self, ttl_seconds: int = 3600, max_items: int = 256):
+    SWEEP_BATCH = 8
+
+    def __init__(self, ttl_seconds: int = 3600, max_items: int = 256, stale_s: float = 0.0,
+                 stripes: Optional[int] = None, backend: Optional[CacheBackend] = None,
+                 namespace: str = "", soft_frac: float = 1.0, max_bytes: Optional[int] = None):
         self.ttl = ttl_seconds
         self.max_items = max_items
-        self._data: Dict[str, Tuple[float, Any]] = {}
-        self.hits = 0
-        self.misses = 0
-        self.sets = 0
-        self.evictions = 0
+        self.max_bytes = max_bytes
+        self.stale_s = stale_s
+        self.soft_frac = soft_frac
+        # small caches get few stripes so per-stripe LRU stays close to global LRU
+        n = stripes or max(1, min(16, max_items // 64))
+        base, extra = divmod(max_items, n)
+        cap_bytes = None if max_bytes is None else max_bytes // n
+        self._stripes = [_Stripe(base + (1 if i < extra else 0), cap_bytes) for i in range(n)]
+        self.backend = backend
+        self.namespace = namespace
+        self.snapshot = None    # set by snapshot.restore()
+
+    def _stripe(self, key: str) -> _Stripe:
+        return self._stripes[hash(key) % len(self._stripes)]
+
+    def _sweep(self, st: _Stripe, now: float, budget: int = SWEEP_BATCH) -> None:
+        # caller holds st.lock
+        heap, data = st.heap, st.data
+        while heap and budget and heap[0][0] <= now:
+            drop_at, key = heapq.heappop(heap)
+            e = data.get(key)
+            if e is not None and e[3] == drop_at:   # not overwritten since
+                del data[key]
+                st.bytes -= e[4]
+                st.expired += 1
+            budget -= 1
+        if len(heap) > 2 * len(data) + 64:
+            # overwritten keys leave dead heap items behind; rebuild now and then
+            st.heap = [(e[3], k) for k, e in data.items()]
+            heapq.heapify(st.heap)
 
     def get(self, key: str) -> Optional[Any]:
+        e = self._fresh(key, time.time())
+        return None if e is None else e[0]
+
+    def lookup(self, key: str) -> Optional[Tuple[Any, bool]]:
+        """(value, refresh_due) for a fresh entry, else None; refresh_due once past the soft TTL."""
+        now = time.time()
+        e = self._fresh(key, now)
+        return None if e is None else (e[0], self._refresh_due(e, now))
+
+    async def alookup(self, key: str) -> Optional[Tuple[Any, bool]]:
+        """lookup() for the event loop: snapshot/L2 reads (blocking I/O + decode) run in a worker thread."""
+        now = time.time()
+        e = self._l1(key, now)
+        if e is None and self._has_lower():
+            e = await asyncio.to_thread(self._lower, key, now)
+        if e is None:
+            self._missed(key)
+            return None
+        return e[0], self._refresh_due(e, now)
+
+    def _refresh_due(self, e: _Entry, now: float) -> bool:
+        return now >= e[1] + (e[2] - e[1]) * self.soft_frac
+
+    def _has_lower(self) -> bool:
+        # anything below L1 worth a lookup (a used-up snapshot isn't)
+        return self.backend is not None or (self.snapshot is not None and self.snapshot.pending() > 0)
+
+    def _fresh(self, key: str, now: float) -> Optional[_Entry]:
+        e = self._l1(key, now)
+        if e is None and self._has_lower():
+            e = self._lower(key, now)
+        if e is None:
+            self._missed(key)
+        return e
+
+    def _count_lower(self, key: str, field: str) -> None:
+        # lower tiers run on threadpool and to_thread workers: count under the stripe lock too
+        st = self._stripe(key)
+        with st.lock:
+            setattr(st, field, getattr(st, field) + 1)
+
+    @property
+    def l2_hits(self) -> int:
+        return sum(st.l2_hits for st in self._stripes)
+
+    def _missed(self, key: str) -> None:
+        # every tier missed: the caller goes upstream
+        st = self._stripe(key)
+        with st.lock:
+            st.misses += 1
+
+    def _l1(self, key: str, now: float) -> Optional[_Entry]:
+        st = self._stripe(key)
+        with st.lock:
+            self._sweep(st, now)
+            e = st.data.get(key)
+            if e is None or now >= e[2]:
+                st.l1_misses += 1
+                return None
+            st.data.move_to_end(key)
+            st.hits += 1
+            return e
+
+    def _lower(self, key: str, now: float) -> Optional[_Entry]:
+        # snapshot, then L2; blocking, so async callers run this in a thread
+        e = self._from_snapshot(key, now)
+        if e is not None and now < e[2]:
+            self._count_lower(key, "snapshot_hits")
+            return e
+        e = self._from_backend(key, now)
+        if e is None or now >= e[2]:
+            return None
+        self._count_lower(key, "l2_hits")
+        return e
+
+    def _install(self, st: _Stripe, key: str, entry: _Entry) -> None:
+        # caller holds st.lock
+        old = st.data.get(key)
+        if old is not None:
+            st.bytes -= old[4]
+            st.data.move_to_end(key)
+        st.data[key] = entry
+        st.bytes += entry[4]
+        heapq.heappush(st.heap, (entry[3], key))
+        while len(st.data) > st.cap or (st.cap_bytes is not None and st.bytes > st.cap_bytes and len(st.data) > 1):
+            _, e = st.data.popitem(last=False)     # least recently used
+            st.bytes -= e[4]
+            st.evictions += 1
+
+    def _from_backend(self, key: str, now: float) -> Optional[_Entry]:
+        """Fetch key from L2 into L1 (fresh or still within stale_s); None if absent."""
+        if self.backend is None:
+            return None
+        blob = self.backend.get(self.namespace + key)
+        if blob is None:
+            return None
+        try:
+            value, stored_at, fresh_until = decode(blob)
+        except ValueError:
+            return None
+        entry = (value, stored_at, fresh_until, max(fresh_until, stored_at + self.stale_s), sizeof(value))
+        return self._adopt(key, entry, now)
+
+    def _from_snapshot(self, key: str, now: float) -> Optional[_Entry]:
+        """Install key from the startup snapshot (first use only); None if it has none."""
+        if self.snapshot is None:
+            return None
+        rec = self.snapshot.take(key)
+        if rec is None:
+            return None
+        value, stored_at, fresh_until, drop_at = rec
+        return self._adopt(key, (value, stored_at, fresh_until, drop_at, sizeof(value)), now)
+
+    def _adopt(self, key: str, entry: _Entry, now: float) -> Optional[_Entry]:
+        # install an entry recovered from outside L1, unless dead or older than L1's copy
+        if now >= entry[3]:
+            return None
+        st = self._stripe(key)
+        with st.lock:
+            cur = st.data.get(key)
+            if cur is not None and cur[1] >= entry[1]:
+                return cur      # a newer local copy landed meanwhile
+            self._install(st, key, entry)
+        return entry
+
+    def peek(self, key: str) -> Optional[Any]:
+        """Like get() but without touching stats or LRU order (for probing candidate keys)."""
+        st = self._stripe(key)
+        with st.lock:
+            e = st.data.get(key)
+        if e is None or time.time() >= e[2]:
+            return None
+        return e[0]
+
+    def refresh_in(self, key: str) -> Optional[float]:
+        """Seconds until key passes its soft TTL (<= 0 once due), None if there's no fresh entry; no stats."""
+        st = self._stripe(key)
+        with st.lock:
+            e = st.data.get(key)
+        now = time.time()
+        if e is None:
+            e = self._from_snapshot(key, now) or self._from_backend(key, now)
+        if e is None or now >= e[2]:
+            return None
+        return e[1] + (e[2] - e[1]) * self.soft_frac - now
+
+    def get_stale(self, key: str, max_age_s: float) -> Optional[Any]:
+        """Return a value even if past TTL (up to max_age_s old); for upstream outages."""
         now = time.time()
-        item = self._data.get(key)
-        if not item:
-            self.misses += 1
-            return None
-        ts, val = item
-        if now - ts > self.ttl:
-            self._data.pop(key, None)
-            self.misses += 1
-            return None
-        self.hits += 1
-        return val
-
-    def set(self, key: str, value: Any) -> None:
-        if len(self._data) >= self.max_items:
-            # naive eviction: remove oldest
-            oldest_key = min(self._data, key=lambda k: self._data[k][0])
-            self._data.pop(oldest_key, None)
-            self.evictions += 1
-        self._data[key] = (time.time(), value)
-        self.sets += 1
+        e = self._l1_any(key)
+        if e is None:
+            e = self._from_snapshot(key, now) or self._from_backend(key, now)
+        return self._stale_value(key, e, now, max_age_s)
+
+    async def aget_stale(self, key: str, max_age_s: float) -> Optional[Any]:
+        """get_stale() for the event loop (snapshot/L2 reads in a worker thread)."""
+        now = time.time()
+        e = self._l1_any(key)
+        if e is None and self._has_lower():
+            e = await asyncio.to_thread(lambda: self._from_snapshot(key, now) or self._from_backend(key, now))
+        return self._stale_value(key, e, now, max_age_s)
+
+    def _l1_any(self, key: str) -> Optional[_Entry]:
+        st = self._stripe(key)
+        with st.lock:
+            return st.data.get(key)
+
+    def _stale_value(self, key: str, e: Optional[_Entry], now: float, max_age_s: float) -> Optional[Any]:
+        if e is None or now - e[1] > max_age_s:
+            return None
+        st = self._stripe(key)
+        with st.lock:
+            st.stale_served += 1
+        return e[0]
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None,
+            soft_ttl: Optional[float] = None) -> None:
+        """ttl overrides the cache TTL; soft_ttl instead sets when revalidation starts (TTL = soft_ttl / soft_frac)."""
+        write = self._set_l1(key, value, ttl, soft_ttl)
+        if write is not None:
+            write()
+
+    async def aset(self, key: str, value: Any, ttl: Optional[float] = None,
+                   soft_ttl: Optional[float] = None) -> None:
+        """set() for the event loop: the L2 write-through runs in a worker thread."""
+        write = self._set_l1(key, value, ttl, soft_ttl)
+        if write is not None:
+            await asyncio.to_thread(write)
+
+    def _set_l1(self, key: str, value: Any, ttl: Optional[float],
+                soft_ttl: Optional[float]) -> Optional[Callable[[], None]]:
+        # installs in L1; returns the pending L2 write, if any
+        now = time.time()
+        if soft_ttl is not None:
+            ttl = soft_ttl / self.soft_frac
+        ttl = self.ttl if ttl is None else ttl
+        entry = (value, now, now + ttl, now + max(ttl, self.stale_s), sizeof(value))
+        st = self._stripe(key)
+        with st.lock:
+            self._sweep(st, now)
+            self._install(st, key, entry)
+            st.sets += 1
+        if self.snapshot is not None:
+            self.snapshot.discard(key)      # superseded
+        if self.backend is None:
+            return None
+        backend = self.backend
+        return lambda: backend.set(self.namespace + key, encode(value, now, entry[2]), entry[3] - now)
+
+    def delete(self, key: str) -> None:
+        st = self._stripe(key)
+        with st.lock:
+            e = st.data.pop(key, None)
+            if e is not None:
+                st.bytes -= e[4]
+        if self.backend is not None:
+            self.backend.delete(self.namespace + key)
+
+    def clear(self) -> None:
+        for st in self._stripes:
+            with st.lock:
+                st.data.clear()
+                st.heap.clear()
+                st.bytes = 0
+
+    def entries(self) -> List[Tuple[str, _Entry]]:
+        """Copy of the L1 entries not yet past drop_at (for checkpoints)."""
+        now = time.time()
+        out: List[Tuple[str, _Entry]] = []
+        for st in self._stripes:
+            with st.lock:
+                out.extend((k, e) for k, e in st.data.items() if e[3] > now)
+        return out
+
+    def __len__(self) -> int:
+        return sum(len(st.data) for st in self._stripes)
 
     def stats(self) -> dict:
+        tot: Dict[str, int] = dict.fromkeys(
+            ("size", "bytes", "l1_hits", "l1_misses", "misses", "snapshot_hits", "l2_hits",
+             "sets", "evictions", "expired", "stale_served"), 0)
+        for st in self._stripes:
+            with st.lock:
+                tot["size"] += len(st.data)
+                tot["bytes"] += st.bytes
+                tot["l1_hits"] += st.hits
+                tot["l1_misses"] += st.l1_misses
+                tot["misses"] += st.misses
+                tot["snapshot_hits"] += st.snapshot_hits
+                tot["l2_hits"] += st.l2_hits
+                tot["sets"] += st.sets
+                tot["evictions"] += st.evictions
+                tot["expired"] += st.expired
+                tot["stale_served"] += st.stale_served
+        # a lookup is a hit if any tier had the key fresh; misses went upstream
+        hits = tot["l1_hits"] + tot["snapshot_hits"] + tot["l2_hits"]
+        lookups = hits + tot["misses"]
+        l1_lookups = tot["l1_hits"] + tot["l1_misses"]
         return {
             "ttl_s": self.ttl,
-            "size": len(self._data),
+            "soft_ttl_s": round(self.ttl * self.soft_frac, 1),
             "max_items": self.max_items,
-            "hits": self.hits,
-            "misses": self.misses,
-            "sets": self.sets,
-            "evictions": self.evictions,
+            "max_bytes": self.max_bytes,
+            "stripes": len(self._stripes),
+            "hits": hits,
+            **tot,
+            "avg_entry_bytes": round(tot["bytes"] / tot["size"]) if tot["size"] else None,
+            "hit_rate": round(hits / lookups, 3) if lookups else None,
+            "l1_hit_rate": round(tot["l1_hits"] / l1_lookups, 3) if l1_lookups else None,
+            "l2": self.backend.stats() if self.backend is not None else None,
         }
 
-# singletons used by clients
-wx_cache = TTLCache(ttl_seconds=3600, max_items=256)     # weather
-aq_cache = TTLCache(ttl_seconds=3600, max_items=256)     # air (optional later)
+def data_age_s(*payloads: Optional[Dict[str, Any]]) -> Optional[float]:
+    """Age (s) of the oldest provider payload stamped with _fetched_at, for responses."""
+    stamps = [p["_fetched_at"] for p in payloads if p and "_fetched_at" in p]
+    return round(time.time() - min(stamps), 1) if stamps else None
+
+# expired weather/air entries are kept this long for stale serving (see circuit_breaker)
+_STALE_S = float(os.getenv("CB_STALE_MAX_S", "21600"))
+# past this fraction of their TTL, weather/air entries are refreshed in the background
+_SOFT_FRAC = float(os.getenv("CACHE_SOFT_TTL_FRAC", "0.75"))
+
+# RAM budgets for the Open-Meteo caches (entries are CompactHourly, ~12 KB per 16-day forecast)
+_WX_MAX_BYTES = int(float(os.getenv("CACHE_WX_MAX_MB", "128")) * 1024 * 1024)
+_AQ_MAX_BYTES = int(float(os.getenv("CACHE_AQ_MAX_MB", "32")) * 1024 * 1024)
 
+# singletons used by clients; all share one L2 (CACHE_BACKEND), namespaced per cache.
+# Open-Meteo entries get model-run-aligned TTLs (freshness.py); 3600 is the fallback.
+wx_cache = TTLCache(ttl_seconds=3600, max_items=200_000, max_bytes=_WX_MAX_BYTES, stale_s=_STALE_S,
+                    soft_frac=_SOFT_FRAC, backend=shared_backend, namespace="wx:")     # weather
+aq_cache = TTLCache(ttl_seconds=3600, max_items=200_000, max_bytes=_AQ_MAX_BYTES, stale_s=_STALE_S,
+                    soft_frac=_SOFT_FRAC, backend=shared_backend, namespace="aq:")     # air
+cur_cache = TTLCache(ttl_seconds=600, max_items=256,
+                     backend=shared_backend, namespace="cur:")   # current conditions (Open-Meteo updates every 15 min)
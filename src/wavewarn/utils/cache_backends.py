@@ -0,0 +1,262 @@
+# src/wavewarn/utils/cache_backends.py
+"""
+Shared (L2) cache backends behind TTLCache.
+
+Every uvicorn worker keeps its own in-process TTLCache (L1); with an L2
+configured, misses fall through to a store all workers share, so one
+worker's upstream fetch warms the others. Values are stored as compact
+bytes: CompactHourly's packed arrays or orjson (or json), + zlib for
+anything non-trivial.
+
+CACHE_BACKEND:
+  memory  (default) no L2
+  redis   REDIS_URL, spoken over a tiny stdlib RESP client (no redis package)
+  sqlite  CACHE_SQLITE_PATH, WAL-mode file shared by workers on one host
+
+L2 errors never fail a request: the backend logs, backs off for a few
+seconds and the cache carries on as L1-only.
+"""
+import json
+import logging
+import os
+import socket
+import sqlite3
+import struct
+import tempfile
+import threading
+import time
+import zlib
+from typing import Any, Optional, Tuple
+from urllib.parse import urlparse
+
+from .compact import CompactHourly
+
+try:
+    import orjson as _orjson
+except ImportError:  # optional speed-up
+    _orjson = None
+
+logger = logging.getLogger("wavewarn.cache")
+
+# ---- serialisation ----
+_HEAD = struct.Struct("<dd")    # stored_at, fresh_until
+_ZLIB_MIN = 512
+
+def _json(value: Any) -> bytes:
+    return _orjson.dumps(value) if _orjson is not None else json.dumps(value, separators=(",", ":")).encode()
+
+def sizeof(value: Any) -> int:
+    """Bytes a cached value accounts for: nbytes if it knows, else its serialised size."""
+    n = getattr(value, "nbytes", None)
+    if n is not None:
+        return n
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    try:
+        return len(_json(value))
+    except (TypeError, ValueError):
+        return 0
+
+def encode(value: Any, stored_at: float, fresh_until: float) -> bytes:
+    # kind: j = JSON, c = CompactHourly; upper case = zlib-compressed
+    if isinstance(value, CompactHourly):
+        kind, raw = b"c", value.to_bytes()
+    else:
+        kind, raw = b"j", _json(value)
+    if len(raw) >= _ZLIB_MIN:
+        kind, raw = kind.upper(), zlib.compress(raw, 6)
+    return _HEAD.pack(stored_at, fresh_until) + kind + raw
+
+def decode(blob: bytes) -> Tuple[Any, float, float]:
+    """Inverse of encode(); raises ValueError on anything it didn't write."""
+    try:
+        stored_at, fresh_until = _HEAD.unpack_from(blob)
+        kind, raw = blob[_HEAD.size:_HEAD.size + 1], blob[_HEAD.size + 1:]
+        if kind in (b"J", b"C"):
+            raw = zlib.decompress(raw)
+        if kind in (b"c", b"C"):
+            value = CompactHourly.from_bytes(raw)
+        elif kind in (b"j", b"J"):
+            value = _orjson.loads(raw) if _orjson is not None else json.loads(raw)
+        else:
+            raise ValueError(f"unknown kind {kind!r}")
+    except (struct.error, zlib.error, KeyError) as e:
+        raise ValueError(f"bad cache blob: {e}") from e
+    return value, stored_at, fresh_until
+
+# ---- backends ----
+class CacheBackend:
+    """get/set raw bytes with a TTL. Subclasses implement _get/_set/_delete."""
+    name = "base"
+    RETRY_AFTER_S = 5.0
+
+    def __init__(self):
+        self.gets = self.hits = self.sets = self.errors = 0
+        self._down_until = 0.0
+
+    def _guard(self, op, *args):
+        if time.monotonic() < self._down_until:
+            return None
+        try:
+            return op(*args)
+        except Exception as e:
+            self.errors += 1
+            self._down_until = time.monotonic() + self.RETRY_AFTER_S
+            logger.warning("cache backend %s unavailable (%s); L1 only for %.0fs", self.name, e, self.RETRY_AFTER_S)
+            return None
+
+    def get(self, key: str) -> Optional[bytes]:
+        self.gets += 1
+        blob = self._guard(self._get, key)
+        if blob is not None:
+            self.hits += 1
+        return blob
+
+    def set(self, key: str, blob: bytes, ttl_s: float) -> None:
+        self.sets += 1
+        self._guard(self._set, key, blob, max(1.0, ttl_s))
+
+    def delete(self, key: str) -> None:
+        self._guard(self._delete, key)
+
+    def stats(self) -> dict:
+        return {
+            "backend": self.name,
+            "gets": self.gets,
+            "hits": self.hits,
+            "sets": self.sets,
+            "errors": self.errors,
+            "available": time.monotonic() >= self._down_until,
+        }
+
+class RedisError(Exception):
+    pass
+
+class RedisBackend(CacheBackend):
+    """Minimal RESP2 client: GET / SET PX / DEL, one connection per thread."""
+    name = "redis"
+
+    def __init__(self, url: str, prefix: str = "wavewarn:", timeout: float = 0.25):
+        super().__init__()
+        u = urlparse(url)
+        self.host, self.port = u.hostname or "localhost", u.port or 6379
+        self.password = u.password
+        self.db = int((u.path or "/0").lstrip("/") or 0)
+        self.prefix = prefix
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _conn(self):
+        c = getattr(self._local, "conn", None)
+        if c is None:
+            sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            c = self._local.conn = (sock, sock.makefile("rb"))
+            if self.password:
+                self._call(b"AUTH", self.password.encode())
+            if self.db:
+                self._call(b"SELECT", str(self.db).encode())
+        return c
+
+    @staticmethod
+    def _pack(*args: bytes) -> bytes:
+        out = [b"*%d\r\n" % len(args)]
+        for a in args:
+            out.append(b"$%d\r\n%s\r\n" % (len(a), a))
+        return b"".join(out)
+
+    def _read(self, f):
+        line = f.readline()
+        if not line:
+            raise ConnectionError("redis closed the connection")
+        kind, rest = line[:1], line[1:-2]
+        if kind == b"+":
+            return rest
+        if kind == b"-":
+            raise RedisError(rest.decode(errors="replace"))
+        if kind == b":":
+            return int(rest)
+        if kind == b"$":
+            n = int(rest)
+            if n < 0:
+                return None
+            data = f.read(n + 2)
+            return data[:-2]
+        if kind == b"*":
+            n = int(rest)
+            return None if n < 0 else [self._read(f) for _ in range(n)]
+        raise RedisError(f"unexpected reply {line!r}")
+
+    def _call(self, *args: bytes):
+        sock, f = self._conn()
+        try:
+            sock.sendall(self._pack(*args))
+            return self._read(f)
+        except (OSError, ConnectionError):
+            # drop the broken connection; the next call reconnects
+            self._local.conn = None
+            try:
+                sock.close()
+            except OSError:
+                pass
+            raise
+
+    def _get(self, key: str) -> Optional[bytes]:
+        return self._call(b"GET", (self.prefix + key).encode())
+
+    def _set(self, key: str, blob: bytes, ttl_s: float) -> None:
+        self._call(b"SET", (self.prefix + key).encode(), blob, b"PX", str(int(ttl_s * 1000)).encode())
+
+    def _delete(self, key: str) -> None:
+        self._call(b"DEL", (self.prefix + key).encode())
+
+class SQLiteBackend(CacheBackend):
+    """Single-host shared cache in a WAL-mode SQLite file."""
+    name = "sqlite"
+    PURGE_EVERY = 500
+
+    def __init__(self, path: str):
+        super().__init__()
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._local = threading.local()
+        self._since_purge = 0
+        with self._db() as db:
+            db.execute("CREATE TABLE IF NOT EXISTS kv (k TEXT PRIMARY KEY, v BLOB NOT NULL, exp REAL NOT NULL)")
+
+    def _db(self) -> sqlite3.Connection:
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = self._local.db = sqlite3.connect(self.path, timeout=0.5, isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+        return db
+
+    def _get(self, key: str) -> Optional[bytes]:
+        row = self._db().execute("SELECT v FROM kv WHERE k = ? AND exp > ?", (key, time.time())).fetchone()
+        return row[0] if row else None
+
+    def _set(self, key: str, blob: bytes, ttl_s: float) -> None:
+        db = self._db()
+        db.execute("INSERT OR REPLACE INTO kv (k, v, exp) VALUES (?, ?, ?)", (key, blob, time.time() + ttl_s))
+        self._since_purge += 1
+        if self._since_purge >= self.PURGE_EVERY:
+            self._since_purge = 0
+            db.execute("DELETE FROM kv WHERE exp <= ?", (time.time(),))
+
+    def _delete(self, key: str) -> None:
+        self._db().execute("DELETE FROM kv WHERE k = ?", (key,))
+
+def make_backend(kind: Optional[str] = None) -> Optional[CacheBackend]:
+    """The configured shared backend, or None for in-process only."""
+    kind = (kind or os.getenv("CACHE_BACKEND", "memory")).lower()
+    if kind == "redis":
+        return RedisBackend(os.getenv("REDIS_URL", "redis://localhost:6379"),
+                            timeout=float(os.getenv("REDIS_TIMEOUT_S", "0.25")))
+    if kind == "sqlite":
+        path = os.getenv("CACHE_SQLITE_PATH") or os.path.join(tempfile.gettempdir(), "wavewarn", "cache.sqlite3")
+        return SQLiteBackend(path)
+    return None
+
+# one backend shared by all TTLCache singletons (keys are namespaced per cache)
+shared_backend = make_backend()
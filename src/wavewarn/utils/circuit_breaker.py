@@ -0,0 +1,123 @@
+# src/wavewarn/utils/circuit_breaker.py
+"""
+Per-provider circuit breakers.
+
+closed    -> calls go through; CB_FAILURES consecutive errors/timeouts open it
+open      -> calls fail immediately with CircuitOpen for CB_RESET_S
+half_open -> one probe call at a time; success closes, failure re-opens
+
+http_pool.get/aget run every upstream call through its provider's breaker,
+so an outage costs callers nothing instead of a full connect/read timeout.
+"""
+import os
+import threading
+import time
+from typing import Dict, Optional
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+class CircuitOpen(Exception):
+    def __init__(self, name: str, retry_in_s: float):
+        super().__init__(f"{name} circuit open (upstream failing; retry in {retry_in_s:.0f}s)")
+        self.name = name
+        self.retry_in_s = retry_in_s
+
+class CircuitBreaker:
+    def __init__(self, name: str, failures: Optional[int] = None, reset_s: Optional[float] = None):
+        self.name = name
+        self.threshold = failures or int(os.getenv("CB_FAILURES", "5"))
+        self.reset_s = reset_s or float(os.getenv("CB_RESET_S", "30"))
+        self._lock = threading.Lock()
+        self.state = CLOSED
+        self.consecutive = 0
+        self.opened_at = 0.0
+        self._probing = False
+        self.opened = 0            # times the breaker tripped
+        self.short_circuited = 0   # calls refused while open
+        self.last_error: Optional[str] = None
+
+    def _retry_in(self, now: float) -> float:
+        return max(0.0, self.opened_at + self.reset_s - now)
+
+    def before(self) -> None:
+        """Raise CircuitOpen if the call must not go upstream right now."""
+        with self._lock:
+            now = time.monotonic()
+            if self.state == OPEN and self._retry_in(now) <= 0:
+                self.state = HALF_OPEN
+            if self.state == HALF_OPEN and not self._probing:
+                self._probing = True        # this caller is the probe
+                return
+            if self.state != CLOSED:
+                self.short_circuited += 1
+                raise CircuitOpen(self.name, self._retry_in(now))
+
+    def success(self) -> None:
+        with self._lock:
+            self.state = CLOSED
+            self.consecutive = 0
+            self._probing = False
+
+    def failure(self, err: object) -> None:
+        with self._lock:
+            self.consecutive += 1
+            self.last_error = str(err)[:200]
+            if self.state == HALF_OPEN or self.consecutive >= self.threshold:
+                if self.state != OPEN:
+                    self.opened += 1
+                self.state = OPEN
+                self.opened_at = time.monotonic()
+            self._probing = False
+
+    def abandon(self) -> None:
+        """Call was cancelled before it told us anything; free the probe slot."""
+        with self._lock:
+            self._probing = False
+
+    def is_open(self) -> bool:
+        """True while calls would be refused (half-open with a probe in flight counts)."""
+        with self._lock:
+            if self.state == OPEN:
+                return self._retry_in(time.monotonic()) > 0
+            return self.state == HALF_OPEN and self._probing
+
+    def stats(self) -> dict:
+        with self._lock:
+            now = time.monotonic()
+            state = self.state
+            if state == OPEN and self._retry_in(now) <= 0:
+                state = HALF_OPEN   # next call will probe
+            return {
+                "state": state,
+                "consecutive_failures": self.consecutive,
+                "opened": self.opened,
+                "short_circuited": self.short_circuited,
+                "retry_in_s": round(self._retry_in(now), 1) if state == OPEN else None,
+                "last_error": self.last_error,
+            }
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+def breaker(provider: str) -> CircuitBreaker:
+    b = _breakers.get(provider)
+    if b is None:
+        with _breakers_lock:
+            b = _breakers.setdefault(provider, CircuitBreaker(provider))
+    return b
+
+def is_open(provider: str) -> bool:
+    return breaker(provider).is_open()
+
+def slow_call_s() -> float:
+    """A call cancelled after this long (fan-out budget, hedge loser) counts as a timeout."""
+    return float(os.getenv("CB_SLOW_CALL_S", "5"))
+
+def stale_max_s() -> float:
+    """How old a cached payload may be and still be served while a breaker is open."""
+    return float(os.getenv("CB_STALE_MAX_S", "21600"))
+
+def stats() -> Dict[str, dict]:
+    with _breakers_lock:
+        items = sorted(_breakers.items())
+    return {p: b.stats() for p, b in items}
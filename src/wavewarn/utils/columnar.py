@@ -0,0 +1,92 @@
+# src/wavewarn/utils/columnar.py
+"""
+Columnar ingest for hourly provider payloads.
+
+Bodies are decoded from bytes (orjson when installed, stdlib json
+otherwise). Either decoder still builds the nested lists of Python floats;
+without numpy there is no parser that fills typed arrays directly. What this
+module removes is everything after that: each hourly variable is packed
+once into an array('d') with NaN for missing hours, next to a single time
+index, and the decoded lists can then be dropped. Daily aggregation walks
+contiguous day spans of those columns; per-hour dicts are only built when a
+route actually returns hourly rows.
+"""
+from array import array
+from math import isnan, nan
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    import orjson as _orjson
+except ImportError:  # optional speed-up
+    _orjson = None
+import json
+
+def loads(body: bytes) -> Any:
+    """Decode a JSON response body (bytes) into Python objects, with orjson if it is installed."""
+    if _orjson is not None:
+        return _orjson.loads(body)
+    return json.loads(body)
+
+def slice_hourly(js: Dict[str, Any], hours: int) -> Dict[str, Any]:
+    """The payload cut to its first `hours` hourly rows (shallow; js itself is returned if it fits)."""
+    h = js.get("hourly")
+    if not h or len(h.get("time") or ()) <= hours:
+        return js
+    return {**js, "hourly": {k: v[:hours] if isinstance(v, list) else v for k, v in h.items()}}
+
+def _column(values: Optional[List[Any]], n: int) -> array:
+    values = (values or [])[:n]
+    try:
+        col = array("d", values)       # no gaps: packed without another list
+    except TypeError:                   # None for missing hours
+        col = array("d", [nan if v is None else v for v in values])
+    if len(col) < n:
+        col.extend(array("d", [nan]) * (n - len(col)))
+    return col
+
+class HourlyFrame:
+    """One time index plus one float64 column per field (NaN = missing)."""
+    __slots__ = ("time", "cols")
+
+    def __init__(self, time: List[str], cols: Dict[str, array]):
+        self.time = time
+        self.cols = cols
+
+    @classmethod
+    def from_openmeteo(cls, js: Dict[str, Any], columns: Dict[str, str]) -> "HourlyFrame":
+        """columns maps our field name -> Open-Meteo hourly variable, e.g. {"T": "temperature_2m"}."""
+        hourly = js["hourly"]
+        time = hourly["time"]
+        return cls(time, {k: _column(hourly.get(var), len(time)) for k, var in columns.items()})
+
+    def __len__(self) -> int:
+        return len(self.time)
+
+    def day_spans(self) -> List[Tuple[str, int, int]]:
+        """(date, start, end) for each run of hours sharing a YYYY-MM-DD prefix."""
+        spans: List[Tuple[str, int, int]] = []
+        start = 0
+        for i in range(1, len(self.time) + 1):
+            if i == len(self.time) or self.time[i][:10] != self.time[start][:10]:
+                spans.append((self.time[start][:10], start, i))
+                start = i
+        return spans
+
+    def present(self, name: str, start: int, end: int) -> List[float]:
+        """Non-missing values of a column in [start, end)."""
+        col = self.cols.get(name)
+        if col is None:
+            return []
+        return [v for v in col[start:end] if not isnan(v)]
+
+    def rows(self, **extra: Any) -> List[Dict[str, Any]]:
+        """Materialise per-hour dicts ({"time", field: value|None, ...}); only for responses."""
+        out: List[Dict[str, Any]] = []
+        for i, t in enumerate(self.time):
+            row: Dict[str, Any] = {"time": t}
+            for name, col in self.cols.items():
+                v = col[i]
+                row[name] = None if isnan(v) else v
+            row.update(extra)
+            out.append(row)
+        return out
@@ -0,0 +1,119 @@
+# src/wavewarn/utils/compact.py
+"""
+Compact cache form of Open-Meteo hourly payloads.
+
+A parsed payload is mostly ISO time strings and boxed floats. CompactHourly
+keeps the same information as one int32 epoch-hour index (local wall-clock
+hours, as the payload gives them with timezone=auto), one float32 column
+per hourly variable (NaN = missing) and a small metadata header. A 16-day
+weather forecast drops from ~100 KB of Python objects to ~12 KB, and
+`nbytes` makes byte-bounded caches possible.
+
+to_payload() rebuilds the Open-Meteo JSON shape (optionally only the first
+`hours` rows), so callers don't know the difference. Values come back
+rounded to 2 decimals, which is the precision Open-Meteo reports.
+"""
+import json
+import struct
+from array import array
+from datetime import datetime, timezone
+from functools import lru_cache
+from math import nan
+from typing import Any, Dict, List, Optional
+
+from .columnar import slice_hourly
+
+try:
+    import orjson as _orjson
+except ImportError:  # optional speed-up
+    _orjson = None
+
+_EPOCH = datetime(1970, 1, 1)
+# fixed per-object overhead (instance, arrays, header dict) on 64-bit CPython, roughly
+_OVERHEAD = 400
+
+def _dumps(obj: Any) -> bytes:
+    return _orjson.dumps(obj) if _orjson is not None else json.dumps(obj, separators=(",", ":")).encode()
+
+def _loads(raw: bytes) -> Any:
+    return _orjson.loads(raw) if _orjson is not None else json.loads(raw)
+
+@lru_cache(maxsize=65536)
+def _epoch_hour(ts: str) -> int:
+    return int((datetime.fromisoformat(ts) - _EPOCH).total_seconds()) // 3600
+
+@lru_cache(maxsize=65536)
+def _iso(hour: int) -> str:
+    return datetime.fromtimestamp(hour * 3600, tz=timezone.utc).strftime("%Y-%m-%dT%H:%M")
+
+class CompactHourly:
+    __slots__ = ("meta", "hours", "cols", "nbytes")
+
+    def __init__(self, meta: Dict[str, Any], hours: array, cols: Dict[str, array]):
+        self.meta = meta        # everything except "hourly" (lat/lon, units, _fetched_at, ...)
+        self.hours = hours      # array('i') of epoch hours
+        self.cols = cols        # variable -> array('f')
+        self.nbytes = (_OVERHEAD + len(_dumps(meta)) + hours.itemsize * len(hours)
+                       + sum(c.itemsize * len(c) + 64 for c in cols.values()))
+
+    @classmethod
+    def from_payload(cls, js: Dict[str, Any]) -> "CompactHourly":
+        h = js.get("hourly") or {}
+        times = h.get("time") or []
+        n = len(times)
+        cols = {}
+        for k, v in h.items():
+            if k == "time" or not isinstance(v, list):
+                continue
+            col = array("f", [nan if x is None else x for x in v[:n]])
+            if len(col) < n:
+                col.extend(array("f", [nan]) * (n - len(col)))
+            cols[k] = col
+        meta = {k: v for k, v in js.items() if k != "hourly"}
+        return cls(meta, array("i", [_epoch_hour(t) for t in times]), cols)
+
+    def __len__(self) -> int:
+        return len(self.hours)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Header lookup, so version/age helpers work on either form."""
+        return self.meta.get(key, default)
+
+    def to_payload(self, hours: Optional[int] = None) -> Dict[str, Any]:
+        n = len(self.hours) if hours is None else min(hours, len(self.hours))
+        hourly: Dict[str, List[Any]] = {"time": [_iso(x) for x in self.hours[:n]]}
+        for k, col in self.cols.items():
+            hourly[k] = [None if x != x else round(x, 2) for x in col[:n].tolist()]   # x != x: NaN
+        return {**self.meta, "hourly": hourly}
+
+    # ---- bytes (for shared cache backends) ----
+    def to_bytes(self) -> bytes:
+        head = _dumps({"meta": self.meta, "cols": list(self.cols)})
+        parts = [struct.pack("<II", len(head), len(self.hours)), head, self.hours.tobytes()]
+        parts += [c.tobytes() for c in self.cols.values()]
+        return b"".join(parts)
+
+    @classmethod
+    def from_bytes(cls, raw: bytes) -> "CompactHourly":
+        hlen, n = struct.unpack_from("<II", raw)
+        pos = 8
+        head = _loads(raw[pos:pos + hlen])
+        pos += hlen
+        hours = array("i")
+        hours.frombytes(raw[pos:pos + 4 * n])
+        pos += 4 * n
+        cols = {}
+        for k in head["cols"]:
+            col = array("f")
+            col.frombytes(raw[pos:pos + 4 * n])
+            pos += 4 * n
+            cols[k] = col
+        return cls(head["meta"], hours, cols)
+
+def expand(value: Any, hours: Optional[int] = None) -> Any:
+    """Payload dict (first `hours` rows) for a cached value, whichever form it was stored in."""
+    if isinstance(value, CompactHourly):
+        return value.to_payload(hours)
+    if value is None or hours is None:
+        return value
+    return slice_hourly(value, hours)
@@ -0,0 +1,50 @@
+# src/wavewarn/utils/deadline.py
+"""
+Per-request deadline, carried in a contextvar.
+
+DeadlineMiddleware opens one per request; everything below it (async tasks,
+threadpool work, hedge threads) inherits it, so each upstream call sizes its
+timeout, retries and rate-limit queueing from what is left of the request's
+budget instead of its own fixed timeout.
+"""
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+
+import httpx
+
+_deadline: ContextVar[Optional[float]] = ContextVar("wavewarn_deadline", default=None)
+
+class DeadlineExceeded(httpx.TimeoutException):
+    """Raised before an upstream call when the request budget is already spent."""
+    def __init__(self, what: str = "request"):
+        super().__init__(f"{what}: request deadline exceeded")
+
+@contextmanager
+def within(seconds: Optional[float]) -> Iterator[None]:
+    """Run the block under a deadline `seconds` from now (never extends an outer one)."""
+    if seconds is None:
+        yield
+        return
+    at = time.monotonic() + seconds
+    outer = _deadline.get()
+    token = _deadline.set(at if outer is None else min(outer, at))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+def remaining() -> Optional[float]:
+    """Seconds left, or None when no deadline is set (scripts, background jobs)."""
+    at = _deadline.get()
+    return None if at is None else at - time.monotonic()
+
+def timeout_for(default: float, what: str = "request") -> float:
+    """A call's timeout: its own default, capped by the remaining budget."""
+    left = remaining()
+    if left is None:
+        return default
+    if left <= 0:
+        raise DeadlineExceeded(what)
+    return min(default, left)
@@ -0,0 +1,53 @@
+# src/wavewarn/utils/fanout.py
+"""
+Concurrent upstream fetches for the async routes.
+Independent sources run at once, each under its own timeout, so wall time is
+roughly the slowest source instead of the sum of all of them.
+"""
+import asyncio
+import os
+from typing import Any, Awaitable, Dict, Optional
+from . import deadline
+
+# per-source budgets (s), capped by the request deadline; the httpx pool timeouts still apply underneath
+SOURCE_TIMEOUTS: Dict[str, float] = {
+    "weather": float(os.getenv("FANOUT_WEATHER_TIMEOUT_S", "12")),
+    "air":     float(os.getenv("FANOUT_AIR_TIMEOUT_S", "12")),
+    "waqi":    float(os.getenv("FANOUT_WAQI_TIMEOUT_S", "5")),
+}
+
+class SourceTimeout(Exception):
+    def __init__(self, source: str, timeout_s: float):
+        super().__init__(f"{source} did not answer within {timeout_s:.1f}s")
+        self.source = source
+        self.timeout_s = timeout_s
+
+async def gather_sources(sources: Dict[str, Awaitable[Any]],
+                         timeouts: Optional[Dict[str, float]] = None) -> Dict[str, Any]:
+    """
+    Await all sources concurrently. Each result is either the source's value or
+    the exception it raised (SourceTimeout when it overran its budget); callers
+    decide which sources are required and which are best-effort.
+    """
+    budgets = {**SOURCE_TIMEOUTS, **(timeouts or {})}
+
+    async def _one(name: str, aw: Awaitable[Any]) -> Any:
+        limit = budgets.get(name, 30.0)
+        left = deadline.remaining()
+        if left is not None:
+            limit = max(0.0, min(limit, left))   # never past the request deadline
+        try:
+            return await asyncio.wait_for(aw, limit)
+        except asyncio.TimeoutError:
+            raise SourceTimeout(name, limit)
+
+    names = list(sources)
+    results = await asyncio.gather(*(_one(n, sources[n]) for n in names), return_exceptions=True)
+    return dict(zip(names, results))
+
+def required(results: Dict[str, Any], name: str) -> Any:
+    """Return a source's value, re-raising its exception if it failed."""
+    val = results[name]
+    if isinstance(val, BaseException):
+        raise val
+    return val
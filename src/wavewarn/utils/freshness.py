@@ -0,0 +1,85 @@
+# src/wavewarn/utils/freshness.py
+"""
+Cache expiry aligned to upstream model runs.
+
+A forecast only changes when the provider publishes a new model run, so a
+flat TTL both refetches unchanged data and keeps serving an old run after
+a new one is out. A FreshnessPolicy knows a provider's update cadence
+(every N hours, anchored at one UTC publish hour). It returns how long an
+entry stays fresh: until the next publish, plus a per-key offset
+(crc32(key) spread over SPREAD_S) so locations don't all refresh in the
+same minute.
+
+Response headers override the schedule when present: Last-Modified
+re-anchors the cadence, and Cache-Control max-age / Expires caps it. The
+result is a soft TTL; TTLCache serves the entry stale-while-revalidate
+after it, up to its hard TTL.
+"""
+import os
+import re
+import time
+import zlib
+from email.utils import parsedate_to_datetime
+from typing import Mapping, Optional
+
+MIN_TTL_S = 60.0
+SPREAD_S = float(os.getenv("FRESHNESS_SPREAD_S", "900"))
+
+_MAX_AGE = re.compile(r"max-age=(\d+)")
+
+def _http_time(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+    try:
+        return parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError):
+        return None
+
+class FreshnessPolicy:
+    def __init__(self, name: str, every_h: float, anchor_utc_h: float, spread_s: float = SPREAD_S):
+        self.name = name
+        self.every_s = every_h * 3600.0
+        self.anchor_s = (anchor_utc_h % 24) * 3600.0
+        self.spread_s = spread_s
+        self.from_headers = 0
+
+    def next_publish(self, now: float, last_modified: Optional[float] = None) -> float:
+        """Unix time of the next model-run publish after now."""
+        anchor = last_modified if last_modified is not None else self.anchor_s
+        k = (now - anchor) // self.every_s + 1
+        return anchor + k * self.every_s
+
+    def soft_ttl(self, key: str, headers: Optional[Mapping[str, str]] = None, now: Optional[float] = None) -> float:
+        """Seconds until `key` should be refetched."""
+        now = time.time() if now is None else now
+        headers = headers or {}
+        until = self.next_publish(now, _http_time(headers.get("last-modified")))
+        until += zlib.crc32(key.encode()) % max(1, int(self.spread_s))
+
+        # an explicit upstream lifetime wins if it is shorter
+        cap = None
+        m = _MAX_AGE.search(headers.get("cache-control") or "")
+        if m:
+            cap = now + int(m.group(1))
+        elif headers.get("expires"):
+            cap = _http_time(headers.get("expires"))
+        if cap is not None and cap < until:
+            self.from_headers += 1
+            until = cap
+        return max(MIN_TTL_S, until - now)
+
+    def stats(self) -> dict:
+        now = time.time()
+        return {
+            "every_h": self.every_s / 3600.0,
+            "next_publish_in_s": round(self.next_publish(now) - now),
+            "spread_s": self.spread_s,
+            "capped_by_headers": self.from_headers,
+        }
+
+# Open-Meteo's blended forecast picks up new runs every few hours; CAMS air
+# quality runs twice a day. Anchors are the UTC hour a new run is usually live.
+wx_freshness = FreshnessPolicy("openmeteo", float(os.getenv("OM_WX_UPDATE_EVERY_H", "3")),
+                               float(os.getenv("OM_WX_UPDATE_AT_UTC_H", "2")))
+aq_freshness = FreshnessPolicy("openmeteo_air", float(os.getenv("OM_AIR_UPDATE_EVERY_H", "12")),
+                               float(os.getenv("OM_AIR_UPDATE_AT_UTC_H", "10")))
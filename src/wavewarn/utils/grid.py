@@ -0,0 +1,105 @@
+# src/wavewarn/utils/grid.py
+"""
+Cache keys on the provider's model grid instead of the query point.
+
+Open-Meteo resolves at ~9-25 km and echoes the grid cell it used
+(latitude/longitude, plus the elevation it downscaled to) in every payload.
+A GridIndex snaps query points to a configured resolution (finer than the
+model) and learns, per snapped point, which provider cell answered it.
+Keys name that cell, so everyone in one model cell and elevation band
+shares one cache entry. Until a snapped point has been seen, its key is
+provisional and the first fetch teaches the alias.
+"""
+import math
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+ALIAS_MAX = int(os.getenv("GRID_ALIAS_MAX", "100000"))
+ELEV_STEP_M = float(os.getenv("GRID_ELEV_STEP_M", "100"))
+
+class GridIndex:
+    def __init__(self, prefix: str, res_deg: float, max_aliases: int = ALIAS_MAX):
+        self.prefix = prefix
+        self.res = res_deg
+        self.max_aliases = max_aliases
+        self._lock = threading.Lock()
+        self._alias: "OrderedDict[Tuple[int, int], str]" = OrderedDict()
+        self.resolved = 0       # keys answered from the alias map
+        self.provisional = 0    # keys for snapped points not yet learned
+
+    def _snap(self, lat: float, lon: float) -> Tuple[int, int]:
+        return (math.floor(lat / self.res + 0.5), math.floor(lon / self.res + 0.5))
+
+    def key(self, lat: float, lon: float, count: bool = True) -> str:
+        """Cache key for a query point: its learned cell, else a provisional snapped key."""
+        s = self._snap(lat, lon)
+        with self._lock:
+            cell = self._alias.get(s)
+            if cell is not None:
+                if count:   # bookkeeping lookups (hot keys, prewarm) leave stats and LRU alone
+                    self._alias.move_to_end(s)
+                    self.resolved += 1
+                return f"{self.prefix}:{cell}"
+            if count:
+                self.provisional += 1
+        return f"{self.prefix}:s{s[0]}:{s[1]}"
+
+    def learn(self, lat: float, lon: float, js: Dict[str, Any]) -> str:
+        """Record which cell answered (lat, lon) from the payload; returns the key to store under."""
+        cell = _cell(js)
+        if cell is None:
+            s = self._snap(lat, lon)
+            return f"{self.prefix}:s{s[0]}:{s[1]}"
+        s = self._snap(lat, lon)
+        with self._lock:
+            self._alias[s] = cell
+            self._alias.move_to_end(s)
+            if len(self._alias) > self.max_aliases:
+                self._alias.popitem(last=False)
+        return f"{self.prefix}:{cell}"
+
+    def aliases(self) -> List[Tuple[int, int, str]]:
+        """(i, j, cell) for every learned snapped point, oldest first (for snapshots)."""
+        with self._lock:
+            return [(i, j, cell) for (i, j), cell in self._alias.items()]
+
+    def restore(self, aliases: Iterable[Sequence[Any]]) -> int:
+        """Re-learn aliases from aliases(); points learned since startup win."""
+        n = 0
+        with self._lock:
+            for i, j, cell in reversed(list(aliases)):     # newest first, each moved behind the live ones
+                if (i, j) not in self._alias:
+                    self._alias[(i, j)] = cell
+                    self._alias.move_to_end((i, j), last=False)
+                    n += 1
+            while len(self._alias) > self.max_aliases:
+                self._alias.popitem(last=False)
+        return n
+
+    def stats(self) -> dict:
+        with self._lock:
+            n = len(self._alias)
+            cells = len(set(self._alias.values()))
+        looked_up = self.resolved + self.provisional
+        return {
+            "res_deg": self.res,
+            "aliases": n,
+            "cells": cells,
+            "points_per_cell": round(n / cells, 2) if cells else None,
+            "resolved_rate": round(self.resolved / looked_up, 3) if looked_up else None,
+        }
+
+def _cell(js: Dict[str, Any]) -> Optional[str]:
+    # "<lat>:<lon>:e<band>" of the grid cell the provider used
+    glat, glon = js.get("latitude"), js.get("longitude")
+    if glat is None or glon is None:
+        return None
+    elev = js.get("elevation")
+    band = "x" if elev is None or ELEV_STEP_M <= 0 else int(math.floor(float(elev) / ELEV_STEP_M))
+    return f"{float(glat):.4f}:{float(glon):.4f}:e{band}"
+
+# one index per provider model; resolutions a bit finer than the models'
+wx_grid = GridIndex("om_wx", float(os.getenv("OM_WX_GRID_DEG", "0.05")))
+aq_grid = GridIndex("om_air", float(os.getenv("OM_AIR_GRID_DEG", "0.1")))
@@ -0,0 +1,223 @@
+# src/wavewarn/utils/hedge.py
+"""
+Hedged requests: start the primary, and if it hasn't answered within a
+p95-based delay, start the secondary too and take whichever valid answer
+lands first. Used by the weather provider's "auto" mode.
+
+Sync races run in a small shared pool. A loser is not interrupted: it runs
+under the caller's context, so its HTTP calls stop at the request deadline
+(utils/deadline), and it holds its thread until then. When every pool thread
+is busy, nothing waits in the pool's queue. The primary runs in the
+caller's thread, unhedged, and falls back to the secondary if it fails.
+"""
+import asyncio
+import contextvars
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, Tuple
+
+class LatencyWindow:
+    """Rolling window of upstream latencies (seconds) for percentile lookups."""
+    def __init__(self, size: int = 200):
+        self._samples: Deque[float] = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, q: float) -> Optional[float]:
+        with self._lock:
+            data = sorted(self._samples)
+        if not data:
+            return None
+        idx = min(len(data) - 1, int(round(q * (len(data) - 1))))
+        return data[idx]
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+class Timer:
+    """Context manager that records elapsed time into a LatencyWindow."""
+    def __init__(self, window: LatencyWindow):
+        self.window = window
+
+    def __enter__(self):
+        self.t0 = time.monotonic()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        # a cancelled hedge loser still ran at least this long; dropping it
+        # would bias the p95 towards the fast calls
+        if exc_type is None or issubclass(exc_type, asyncio.CancelledError):
+            self.window.record(time.monotonic() - self.t0)
+        return False
+
+# shared by sync races; losers keep running here after the winner returns
+_THREADS = int(os.getenv("HEDGE_THREADS", "16"))
+_pool = ThreadPoolExecutor(max_workers=_THREADS, thread_name_prefix="hedge")
+_busy = 0
+_busy_lock = threading.Lock()
+
+def _release(_: Future) -> None:
+    global _busy
+    with _busy_lock:
+        _busy -= 1
+
+def _submit(fn: Callable[[], Any]) -> Optional[Future]:
+    """Run fn on a free pool thread (in a copy of the caller's context), or None if all are busy."""
+    global _busy
+    with _busy_lock:
+        if _busy >= _THREADS:
+            return None
+        _busy += 1
+    # each thread needs its own context copy (a Context can't be entered twice at once)
+    f = _pool.submit(contextvars.copy_context().run, fn)
+    f.add_done_callback(_release)
+    return f
+
+def _failure(name: str, *errors: Optional[BaseException]) -> BaseException:
+    # prefer a real upstream error; both may have "succeeded" with invalid data
+    for e in errors:
+        if e is not None:
+            return e
+    return RuntimeError(f"{name}: no valid response from either provider")
+
+class Hedger:
+    def __init__(self, name: str, latency: LatencyWindow, *, primary: str, secondary: str):
+        self.name = name
+        self.latency = latency
+        self.primary = primary
+        self.secondary = secondary
+        self.fixed_delay_ms = os.getenv("HEDGE_DELAY_MS")
+        self.min_ms = float(os.getenv("HEDGE_MIN_DELAY_MS", "250"))
+        self.max_ms = float(os.getenv("HEDGE_MAX_DELAY_MS", "5000"))
+        self.default_ms = float(os.getenv("HEDGE_DEFAULT_DELAY_MS", "2000"))
+        self._lock = threading.Lock()
+        self.counts: Dict[str, int] = {
+            "requests": 0,
+            "hedged": 0,           # secondary was started alongside the primary
+            "skipped_budget": 0,   # would have hedged, but secondary's budget said no
+            "fallback": 0,         # primary failed outright; secondary used alone
+            "skipped_pool": 0,     # sync race with every hedge thread busy: ran unhedged
+        }
+        self.wins: Dict[str, int] = {primary: 0, secondary: 0}
+
+    def delay_s(self) -> float:
+        if self.fixed_delay_ms:
+            return float(self.fixed_delay_ms) / 1000.0
+        p95 = self.latency.percentile(0.95) if len(self.latency) >= 20 else None
+        ms = self.default_ms if p95 is None else p95 * 1000.0
+        return min(self.max_ms, max(self.min_ms, ms)) / 1000.0
+
+    def _count(self, key: str) -> None:
+        with self._lock:
+            self.counts[key] += 1
+
+    def _won(self, who: str) -> None:
+        with self._lock:
+            self.wins[who] += 1
+
+    def race(self, primary: Callable[[], Any], secondary: Callable[[], Any], *,
+             can_hedge: Callable[[], bool], valid: Callable[[Any], bool]) -> Tuple[str, Any]:
+        """Blocking race. Returns (winner_name, value); raises the primary's error if both fail."""
+        self._count("requests")
+        f1 = _submit(primary)
+        if f1 is None:
+            # slow losers hold every thread: run the primary here instead of queueing it
+            self._count("skipped_pool")
+            try:
+                value = primary()
+            except Exception:
+                return self._fall_back(secondary)
+            if valid(value):
+                self._won(self.primary)
+                return self.primary, value
+            return self._fall_back(secondary)
+        done, _ = wait([f1], timeout=self.delay_s())
+        f2 = None
+        if not done:
+            if not can_hedge():
+                self._count("skipped_budget")
+            else:
+                f2 = _submit(secondary)
+                if f2 is None:
+                    self._count("skipped_pool")
+            if f2 is None:
+                # no early hedge: wait the primary out, but still fall back if it fails
+                done, _ = wait([f1])
+        if done:
+            if f1.exception() is None and valid(f1.result()):
+                self._won(self.primary)
+                return self.primary, f1.result()
+            return self._fall_back(secondary)
+        self._count("hedged")
+        names = {f1: self.primary, f2: self.secondary}
+        pending = {f1, f2}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for f in done:
+                if f.exception() is None and valid(f.result()):
+                    self._won(names[f])
+                    return names[f], f.result()
+        raise _failure(self.name, f1.exception(), f2.exception())
+
+    def _fall_back(self, secondary: Callable[[], Any]) -> Tuple[str, Any]:
+        self._count("fallback")
+        value = secondary()
+        self._won(self.secondary)
+        return self.secondary, value
+
+    async def arace(self, primary: Callable[[], Awaitable[Any]], secondary: Callable[[], Awaitable[Any]], *,
+                    can_hedge: Callable[[], bool], valid: Callable[[Any], bool]) -> Tuple[str, Any]:
+        """Async race; whichever task loses (or is left behind by a cancel) is cancelled."""
+        self._count("requests")
+        tasks = []
+        try:
+            t1 = asyncio.ensure_future(primary())
+            tasks.append(t1)
+            done, _ = await asyncio.wait({t1}, timeout=self.delay_s())
+            if not done and not can_hedge():
+                self._count("skipped_budget")
+                done, _ = await asyncio.wait({t1})
+            if done:
+                if t1.exception() is None and valid(t1.result()):
+                    self._won(self.primary)
+                    return self.primary, t1.result()
+                self._count("fallback")
+                value = await secondary()
+                self._won(self.secondary)
+                return self.secondary, value
+            self._count("hedged")
+            t2 = asyncio.ensure_future(secondary())
+            tasks.append(t2)
+            names = {t1: self.primary, t2: self.secondary}
+            pending = {t1, t2}
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for t in done:
+                    if t.exception() is None and valid(t.result()):
+                        self._won(names[t])
+                        return names[t], t.result()
+            raise _failure(self.name, t1.exception(), t2.exception())
+        finally:
+            for t in tasks:
+                if not t.done():
+                    t.cancel()
+
+    def stats(self) -> dict:
+        with self._lock:
+            counts = dict(self.counts)
+            wins = dict(self.wins)
+        p95 = self.latency.percentile(0.95)
+        return {
+            **counts,
+            "wins": wins,
+            "hedge_rate": round(counts["hedged"] / counts["requests"], 3) if counts["requests"] else None,
+            "delay_ms": round(self.delay_s() * 1000.0),
+            "primary_p95_ms": round(p95 * 1000.0) if p95 is not None else None,
+            "samples": len(self.latency),
+        }
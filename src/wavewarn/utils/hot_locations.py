@@ -0,0 +1,52 @@
+# src/wavewarn/utils/hot_locations.py
+"""
+Which locations drive our load, keyed on cache cell.
+
+The Open-Meteo clients note() every cache lookup with its key and the query
+point. RequestLogMiddleware notes every route call that has lat/lon, keyed
+"<path> <weather cell>". Each HotLocations is a CountMinTopK (sketch.py): a
+few KB of counters plus the exact top-k keys with the latest query point
+for each. Per-request cost is one hash and a handful of array updates.
+
+Counts are halved every PREWARM_DECAY_S (prewarm.py drives it), so rankings
+follow current traffic. The top keys feed the prewarm scheduler and
+/admin/hotkeys, which also reports how much of the traffic the top keys
+cover (for sizing caches).
+"""
+import os
+from typing import List, Tuple
+
+from .sketch import CountMinTopK
+
+WIDTH = int(os.getenv("HOTKEYS_WIDTH", "512"))
+DEPTH = int(os.getenv("HOTKEYS_DEPTH", "4"))
+TOP_K = int(os.getenv("HOTKEYS_K", "256"))
+
+class HotLocations:
+    def __init__(self, name: str, width: int = WIDTH, depth: int = DEPTH, k: int = TOP_K):
+        self.name = name
+        self.sketch = CountMinTopK(width, depth, k)
+
+    def note(self, key: str, lat: float, lon: float) -> None:
+        self.sketch.add(key, (lat, lon))
+
+    def top(self, n: int, min_count: int = 1) -> List[Tuple[str, float, float, int]]:
+        """Up to n (key, lat, lon, count), most requested first."""
+        return [(k, p[0], p[1], c) for k, c, p in self.sketch.top(n, min_count)]
+
+    def coverage(self, *sizes: int) -> dict:
+        """Share of noted lookups the top-N keys account for, per N: how big a cache the traffic needs."""
+        counts = [c for _, c, _ in self.sketch.top()]
+        total = self.sketch.total
+        return {f"top_{n}": round(sum(counts[:n]) / total, 3) if total else None for n in sizes}
+
+    def decay(self) -> None:
+        self.sketch.decay()
+
+    def stats(self) -> dict:
+        return self.sketch.stats()
+
+wx_hot = HotLocations("weather")
+aq_hot = HotLocations("air")
+route_hot = HotLocations("routes")
+ALL = (wx_hot, aq_hot, route_hot)
@@ -0,0 +1,305 @@
+# src/wavewarn/utils/http_pool.py
+"""
+Shared, provider-aware HTTP connection pools.
+
+One httpx.Client per upstream host, opened in the app lifespan and reused by
+every client module, so a cache miss rides a warm keep-alive connection
+instead of paying a fresh TCP+TLS handshake. Async routes get a matching
+httpx.AsyncClient per host (bound to the server's event loop).
+
+Every get/aget also goes through the provider's circuit breaker: transport
+errors, timeouts and 5xx count as failures, and while the breaker is open
+calls raise CircuitOpen straight away.
+
+Timeouts and retries follow the request deadline (utils/deadline): each
+attempt gets min(provider timeout, time left), and transport errors or
+502/503/504 are retried with jittered backoff only while the remaining
+budget still covers another attempt.
+"""
+from typing import Dict, Any, Optional
+import asyncio
+import os
+import random
+import threading
+import time
+import logging
+from functools import lru_cache
+import httpx
+import certifi
+from .circuit_breaker import breaker, slow_call_s
+from . import deadline
+from .deadline import DeadlineExceeded
+
+logger = logging.getLogger("wavewarn.http")
+
+# provider -> upstream host + default per-call timeout (s)
+PROVIDERS: Dict[str, Dict[str, Any]] = {
+    "openmeteo":     {"base_url": "https://api.open-meteo.com",             "timeout": 30.0},
+    "openmeteo_air": {"base_url": "https://air-quality-api.open-meteo.com", "timeout": 30.0},
+    "openaq":        {"base_url": "https://api.openaq.org",                 "timeout": 30.0},
+    "waqi":          {"base_url": "https://api.waqi.info",                  "timeout": 20.0},
+    "openweather":   {"base_url": "https://api.openweathermap.org",         "timeout": 15.0},
+    "power":         {"base_url": "https://power.larc.nasa.gov",            "timeout": 30.0},
+}
+
+_JSON = {"Accept": "application/json"}
+
+# GET retries (all our upstream calls are idempotent GETs)
+RETRIES = int(os.getenv("HTTP_RETRIES", "2"))
+RETRY_BASE_S = float(os.getenv("HTTP_RETRY_BASE_MS", "200")) / 1000.0
+RETRY_MAX_S = float(os.getenv("HTTP_RETRY_MAX_MS", "2000")) / 1000.0
+RETRY_MIN_ATTEMPT_S = float(os.getenv("HTTP_RETRY_MIN_ATTEMPT_S", "1.0"))
+_RETRY_STATUS = {502, 503, 504}
+_retries = 0
+
+_clients: Dict[str, httpx.Client] = {}
+_aclients: Dict[str, httpx.AsyncClient] = {}
+_lock = threading.Lock()
+
+
+def _env_flag(name: str, default: str = "0") -> bool:
+    return os.getenv(name, default).lower() in ("1", "true", "yes")
+
+
+@lru_cache(maxsize=1)
+def _http2_enabled() -> bool:
+    if not _env_flag("HTTP_POOL_HTTP2"):
+        return False
+    try:
+        import h2  # noqa: F401  (httpx needs it for HTTP/2)
+        return True
+    except ImportError:
+        logger.warning("HTTP_POOL_HTTP2 set but 'h2' is not installed; using HTTP/1.1")
+        return False
+
+
+def _limits() -> httpx.Limits:
+    per_host = int(os.getenv("HTTP_POOL_MAX_PER_HOST", "20"))
+    return httpx.Limits(
+        max_connections=per_host,
+        max_keepalive_connections=per_host,
+        keepalive_expiry=float(os.getenv("HTTP_POOL_KEEPALIVE_S", "60")),
+    )
+
+
+def _verify(provider: str):
+    # OpenAQ may sit behind a custom CA; load the bundle once per pool, not per call
+    if provider == "openaq":
+        return os.getenv("OPENAQ_CA_BUNDLE") or certifi.where()
+    return True
+
+
+def _build(provider: str) -> httpx.Client:
+    cfg = PROVIDERS[provider]
+    return httpx.Client(
+        timeout=cfg["timeout"],
+        limits=_limits(),
+        http2=_http2_enabled(),
+        verify=_verify(provider),
+        headers=_JSON,
+    )
+
+
+def _abuild(provider: str) -> httpx.AsyncClient:
+    cfg = PROVIDERS[provider]
+    return httpx.AsyncClient(
+        timeout=cfg["timeout"],
+        limits=_limits(),
+        http2=_http2_enabled(),
+        verify=_verify(provider),
+        headers=_JSON,
+    )
+
+
+def client(provider: str) -> httpx.Client:
+    """
+    Pooled client for a provider. Created lazily if the lifespan hasn't opened
+    it yet (scripts, tests), so callers never need to care.
+    """
+    c = _clients.get(provider)
+    if c is None:
+        with _lock:
+            c = _clients.get(provider)
+            if c is None:
+                c = _clients[provider] = _build(provider)
+    return c
+
+
+def _settle(provider: str, r: httpx.Response) -> httpx.Response:
+    if r.status_code >= 500:
+        breaker(provider).failure(f"HTTP {r.status_code}")
+    else:
+        breaker(provider).success()
+    return r
+
+
+def _attempt_timeout(provider: str, timeout: Optional[float]) -> float:
+    return deadline.timeout_for(timeout if timeout is not None else PROVIDERS[provider]["timeout"], provider)
+
+
+def _backoff(attempt: int) -> Optional[float]:
+    """Full-jitter pause before retry #attempt, or None if no retry is left/affordable."""
+    global _retries
+    if attempt > RETRIES:
+        return None
+    pause = random.uniform(0.0, min(RETRY_MAX_S, RETRY_BASE_S * (2 ** (attempt - 1))))
+    left = deadline.remaining()
+    if left is not None and left - pause < RETRY_MIN_ATTEMPT_S:
+        return None
+    _retries += 1
+    return pause
+
+
+def _get_once(provider: str, url: str, headers, params, timeout: float) -> httpx.Response:
+    br = breaker(provider)
+    br.before()
+    try:
+        r = client(provider).get(url, headers=headers, params=params, timeout=timeout)
+    except httpx.TransportError as e:
+        br.failure(e)
+        raise
+    except BaseException:
+        br.abandon()
+        raise
+    return _settle(provider, r)
+
+
+def get(provider: str, url: str, *, headers: Optional[Dict[str, str]] = None,
+        params: Optional[Dict[str, Any]] = None, timeout: Optional[float] = None) -> httpx.Response:
+    """GET through the provider's pool. Caller handles raise_for_status()/json()."""
+    attempt = 0
+    while True:
+        err: Optional[Exception] = None
+        try:
+            r = _get_once(provider, url, headers, params, _attempt_timeout(provider, timeout))
+            if r.status_code not in _RETRY_STATUS:
+                return r
+        except DeadlineExceeded:
+            raise
+        except httpx.TransportError as e:
+            err = e
+        attempt += 1
+        pause = _backoff(attempt)
+        if pause is None:
+            if err is not None:
+                raise err
+            return r
+        time.sleep(pause)
+
+
+def aclient(provider: str) -> httpx.AsyncClient:
+    """Async twin of client(); must be first used from the serving event loop."""
+    c = _aclients.get(provider)
+    if c is None:
+        with _lock:
+            c = _aclients.get(provider)
+            if c is None:
+                c = _aclients[provider] = _abuild(provider)
+    return c
+
+
+async def _aget_once(provider: str, url: str, headers, params, timeout: float) -> httpx.Response:
+    br = breaker(provider)
+    br.before()
+    t0 = time.monotonic()
+    try:
+        r = await aclient(provider).get(url, headers=headers, params=params, timeout=timeout)
+    except httpx.TransportError as e:
+        br.failure(e)
+        raise
+    except asyncio.CancelledError:
+        # cut off by a fan-out budget or a hedge: only a slow upstream counts
+        if time.monotonic() - t0 >= slow_call_s():
+            br.failure("timed out (cancelled by caller)")
+        else:
+            br.abandon()
+        raise
+    except BaseException:
+        br.abandon()
+        raise
+    return _settle(provider, r)
+
+
+async def aget(provider: str, url: str, *, headers: Optional[Dict[str, str]] = None,
+               params: Optional[Dict[str, Any]] = None, timeout: Optional[float] = None) -> httpx.Response:
+    attempt = 0
+    while True:
+        err: Optional[Exception] = None
+        try:
+            r = await _aget_once(provider, url, headers, params, _attempt_timeout(provider, timeout))
+            if r.status_code not in _RETRY_STATUS:
+                return r
+        except DeadlineExceeded:
+            raise
+        except httpx.TransportError as e:
+            err = e
+        attempt += 1
+        pause = _backoff(attempt)
+        if pause is None:
+            if err is not None:
+                raise err
+            return r
+        await asyncio.sleep(pause)
+
+
+def preconnect(timeout: float = 3.0) -> Dict[str, bool]:
+    """
+    Open one connection per host (HEAD on the base URL) so the first real
+    request skips the handshake. Failures are ignored; it's only a warm-up.
+    """
+    out: Dict[str, bool] = {}
+
+    def _one(provider: str):
+        try:
+            client(provider).head(PROVIDERS[provider]["base_url"], timeout=timeout)
+            out[provider] = True
+        except Exception as e:
+            logger.info("preconnect %s skipped: %s", provider, e)
+            out[provider] = False
+
+    threads = [threading.Thread(target=_one, args=(p,), daemon=True) for p in PROVIDERS]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(timeout + 1.0)
+    return out
+
+
+def open_pools() -> None:
+    """Create every provider pool; pre-connect in the background unless disabled."""
+    for p in PROVIDERS:
+        client(p)
+        aclient(p)
+    if _env_flag("HTTP_POOL_PRECONNECT", "1"):
+        threading.Thread(target=preconnect, daemon=True, name="http-preconnect").start()
+
+
+async def close_pools() -> None:
+    with _lock:
+        clients = list(_clients.values())
+        aclients = list(_aclients.values())
+        _clients.clear()
+        _aclients.clear()
+    for c in clients:
+        try:
+            c.close()
+        except Exception:
+            pass
+    for ac in aclients:
+        try:
+            await ac.aclose()
+        except Exception:
+            pass
+
+
+def stats() -> Dict[str, Any]:
+    limits = _limits()
+    return {
+        "open": sorted(_clients.keys()),
+        "open_async": sorted(_aclients.keys()),
+        "max_per_host": limits.max_connections,
+        "keepalive_s": limits.keepalive_expiry,
+        "http2": _http2_enabled(),
+        "retries": _retries,
+        "max_retries": RETRIES,
+    }
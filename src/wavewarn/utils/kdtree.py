@@ -0,0 +1,78 @@
+# src/wavewarn/utils/kdtree.py
+"""
+Small static KD-tree over lat/lon points.
+
+Points are stored as 3-D unit vectors, so straight-line (chord) distance is
+monotonic in great-circle distance and there is no dateline/pole special
+casing. Built once, queried many times; pure Python, no numpy.
+"""
+import heapq
+import math
+from typing import Callable, List, Optional, Sequence, Tuple
+
+EARTH_RADIUS_M = 6371008.8
+
+def _xyz(lat: float, lon: float) -> Tuple[float, float, float]:
+    la, lo = math.radians(lat), math.radians(lon)
+    c = math.cos(la)
+    return (c * math.cos(lo), c * math.sin(lo), math.sin(la))
+
+def chord_to_m(chord: float) -> float:
+    return 2.0 * EARTH_RADIUS_M * math.asin(min(1.0, chord / 2.0))
+
+def m_to_chord(meters: float) -> float:
+    return 2.0 * math.sin(min(math.pi, meters / EARTH_RADIUS_M) / 2.0)
+
+class KDTree:
+    # node = (point index, split axis, left node, right node)
+    def __init__(self, coords: Sequence[Tuple[float, float]]):
+        self._pts = [_xyz(lat, lon) for lat, lon in coords]
+        self._root = self._build(list(range(len(self._pts))))
+
+    def __len__(self) -> int:
+        return len(self._pts)
+
+    def _build(self, idx: List[int]):
+        if not idx:
+            return None
+        # split on the axis with the widest spread
+        pts = self._pts
+        axis = max(range(3), key=lambda a: max(pts[i][a] for i in idx) - min(pts[i][a] for i in idx))
+        idx.sort(key=lambda i: pts[i][axis])
+        mid = len(idx) // 2
+        return (idx[mid], axis, self._build(idx[:mid]), self._build(idx[mid + 1:]))
+
+    def query(self, lat: float, lon: float, k: int, radius_m: Optional[float] = None,
+              accept: Optional[Callable[[int], bool]] = None) -> List[Tuple[float, int]]:
+        """
+        Up to k nearest points as (distance_m, index), nearest first, optionally
+        within radius_m and only indices for which accept(i) is true.
+        """
+        if k <= 0 or self._root is None:
+            return []
+        q = _xyz(lat, lon)
+        bound = m_to_chord(radius_m) ** 2 if radius_m is not None else math.inf
+        best: List[Tuple[float, int]] = []   # max-heap of (-d2, index)
+        pts = self._pts
+
+        def visit(node):
+            nonlocal bound
+            if node is None:
+                return
+            i, axis, left, right = node
+            p = pts[i]
+            d2 = (p[0] - q[0]) ** 2 + (p[1] - q[1]) ** 2 + (p[2] - q[2]) ** 2
+            if d2 <= bound and (accept is None or accept(i)):
+                heapq.heappush(best, (-d2, i))
+                if len(best) > k:
+                    heapq.heappop(best)
+                if len(best) == k:
+                    bound = min(bound, -best[0][0])
+            diff = q[axis] - p[axis]
+            near, far = (left, right) if diff < 0 else (right, left)
+            visit(near)
+            if diff * diff <= bound:
+                visit(far)
+
+        visit(self._root)
+        return sorted((chord_to_m(math.sqrt(-nd2)), i) for nd2, i in best)
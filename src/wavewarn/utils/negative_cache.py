@@ -0,0 +1,89 @@
+# src/wavewarn/utils/negative_cache.py
+"""
+Negative caching: remember, per provider and cell, that a lookup came back
+empty or was rejected, so the next identical request answers at once
+instead of walking the expensive path again (an OpenAQ nearby search can
+take dozens of calls to reach the same "no data").
+
+Two kinds of marker, each with its own TTL:
+  empty   the provider answered but has nothing here (no WAQI station, no
+          OpenAQ readings within the search radii); NEG_CACHE_EMPTY_TTL_S
+  error   a 4xx that is about this request (bad coordinate, unknown
+          station); NEG_CACHE_ERROR_TTL_S. Auth, quota and 429 responses
+          are about us, not the point, and are never cached.
+
+Cells are Open-Meteo grid keys where a client has them, else points snapped
+to NEG_CACHE_CELL_DEG. Markers live only in this process.
+"""
+import math
+import os
+import threading
+from typing import Any, Dict, Optional
+
+import httpx
+
+from .cache import TTLCache
+
+EMPTY_TTL_S = float(os.getenv("NEG_CACHE_EMPTY_TTL_S", "1800"))
+ERROR_TTL_S = float(os.getenv("NEG_CACHE_ERROR_TTL_S", "300"))
+CELL_DEG = float(os.getenv("NEG_CACHE_CELL_DEG", "0.01"))
+
+# 4xx statuses that say nothing about the coordinate
+_NOT_PER_POINT = {401, 402, 403, 407, 408, 429}
+
+def client_error(e: BaseException) -> Optional[int]:
+    """The status of a per-request 4xx (worth a negative entry), else None."""
+    if isinstance(e, httpx.HTTPStatusError):
+        code = e.response.status_code
+        if 400 <= code < 500 and code not in _NOT_PER_POINT:
+            return code
+    return None
+
+class NegativeCache:
+    def __init__(self, max_items: int, empty_ttl_s: float = EMPTY_TTL_S, error_ttl_s: float = ERROR_TTL_S,
+                 cell_deg: float = CELL_DEG):
+        self._store = TTLCache(ttl_seconds=int(empty_ttl_s), max_items=max_items)
+        self.empty_ttl_s = empty_ttl_s
+        self.error_ttl_s = error_ttl_s
+        self.cell_deg = cell_deg
+        self._counts: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()       # callers run on threadpool workers
+
+    def cell(self, lat: float, lon: float) -> str:
+        r = self.cell_deg
+        return f"{math.floor(lat / r + 0.5)}:{math.floor(lon / r + 0.5)}"
+
+    def _count(self, provider: str, field: str) -> None:
+        with self._lock:
+            c = self._counts.setdefault(provider, {"hits": 0, "empty": 0, "errors": 0})
+            c[field] += 1
+
+    def get(self, provider: str, cell: str) -> Optional[Dict[str, Any]]:
+        """The marker for (provider, cell): {"kind": "empty"|"error", "detail", "status", ...}, or None."""
+        hit = self._store.get(f"{provider}|{cell}")
+        if hit is not None:
+            self._count(provider, "hits")
+        return hit
+
+    def empty(self, provider: str, cell: str, detail: str, **extra: Any) -> None:
+        self._store.set(f"{provider}|{cell}", {"kind": "empty", "detail": detail, **extra}, ttl=self.empty_ttl_s)
+        self._count(provider, "empty")
+
+    def failed(self, provider: str, cell: str, status: int, detail: str) -> None:
+        self._store.set(f"{provider}|{cell}", {"kind": "error", "status": status, "detail": detail},
+                        ttl=self.error_ttl_s)
+        self._count(provider, "errors")
+
+    def stats(self) -> dict:
+        s = self._store.stats()
+        with self._lock:
+            providers = {p: dict(c) for p, c in self._counts.items()}
+        return {
+            "size": s["size"],
+            "empty_ttl_s": self.empty_ttl_s,
+            "error_ttl_s": self.error_ttl_s,
+            "cell_deg": self.cell_deg,
+            "providers": providers,
+        }
+
+negative_cache = NegativeCache(max_items=int(os.getenv("NEG_CACHE_MAX_ITEMS", "4096")))
@@ -0,0 +1,184 @@
+# src/wavewarn/utils/openaq_catalogue.py
+"""
+Local OpenAQ station catalogue.
+
+Stations that measure pm25/o3 (id, name, coordinates, sensors) are pulled
+from the paged /v3/locations listing, persisted as JSON and indexed in a
+KDTree, so nearby lookups are an in-memory query instead of a discovery
+round trip. Results keep the shape of OpenAQ location records (plus
+"distance"), so callers can use either source.
+
+A background thread started from the app lifespan loads the file, refreshes
+it when older than OPENAQ_CATALOGUE_MAX_AGE_H, and keeps refreshing on that
+period. Without OPENAQ_API_KEY (or with OPENAQ_CATALOGUE=0) it stays empty
+and callers fall back to live discovery.
+"""
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
+from .kdtree import KDTree
+from .openaq_v3_client import _get
+
+logger = logging.getLogger("wavewarn.openaq_catalogue")
+
+PAGE_LIMIT = 1000
+MAX_PAGES = int(os.getenv("OPENAQ_CATALOGUE_MAX_PAGES", "200"))
+MAX_AGE_S = float(os.getenv("OPENAQ_CATALOGUE_MAX_AGE_H", "24")) * 3600.0
+
+def _path() -> str:
+    return os.getenv("OPENAQ_CATALOGUE_PATH") or os.path.join(tempfile.gettempdir(), "wavewarn", "openaq_stations.json")
+
+def _slim(loc: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Keep only what nearby lookups need, in OpenAQ's own field layout."""
+    c = loc.get("coordinates") or {}
+    if c.get("latitude") is None or c.get("longitude") is None:
+        return None
+    sensors = [{"id": s["id"], "parameter": {"name": (s.get("parameter") or {}).get("name")}}
+               for s in loc.get("sensors") or [] if s.get("id") is not None]
+    return {
+        "id": loc["id"],
+        "name": loc.get("name"),
+        "coordinates": {"latitude": float(c["latitude"]), "longitude": float(c["longitude"])},
+        "sensors": sensors,
+    }
+
+def _params(st: Dict[str, Any]) -> frozenset:
+    return frozenset((s.get("parameter") or {}).get("name") for s in st["sensors"])
+
+class StationCatalogue:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stations: List[Dict[str, Any]] = []
+        self._params: List[frozenset] = []
+        self._tree: Optional[KDTree] = None
+        self.built_at: Optional[float] = None   # unix time the listing was fetched
+        self.source: Optional[str] = None       # "disk" | "api"
+        self.refreshing = False
+        self.last_error: Optional[str] = None
+
+    # ---- build / persist ----
+    def _install(self, stations: List[Dict[str, Any]], built_at: float, source: str) -> None:
+        tree = KDTree([(s["coordinates"]["latitude"], s["coordinates"]["longitude"]) for s in stations])
+        params = [_params(s) for s in stations]
+        with self._lock:
+            self._stations, self._params, self._tree = stations, params, tree
+            self.built_at, self.source = built_at, source
+
+    def load(self, path: Optional[str] = None) -> bool:
+        try:
+            with open(path or _path(), "r", encoding="utf-8") as f:
+                js = json.load(f)
+            self._install(js["stations"], float(js["built_at"]), "disk")
+            return True
+        except (OSError, ValueError, KeyError) as e:
+            logger.info("openaq catalogue not loaded from disk: %s", e)
+            return False
+
+    def save(self, path: Optional[str] = None) -> None:
+        path = path or _path()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with self._lock:
+            js = {"built_at": self.built_at, "stations": self._stations}
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(js, f, separators=(",", ":"))
+        os.replace(tmp, path)    # readers never see a half-written file
+
+    def refresh(self) -> int:
+        """Re-list stations from OpenAQ, rebuild the index and persist it. Returns station count."""
+        self.refreshing = True
+        try:
+            stations: Dict[int, Dict[str, Any]] = {}
+            for page in range(1, MAX_PAGES + 1):
+                url = (f"https://api.openaq.org/v3/locations?"
+                       f"limit={PAGE_LIMIT}&page={page}&parameters=pm25,o3")
+                r = _get(url)
+                r.raise_for_status()
+                results = r.json().get("results", [])
+                for loc in results:
+                    st = _slim(loc)
+                    if st is not None:
+                        stations[st["id"]] = st
+                if len(results) < PAGE_LIMIT:
+                    break
+            self._install(list(stations.values()), time.time(), "api")
+            self.save()
+            self.last_error = None
+            logger.info("openaq catalogue refreshed: %d stations", len(stations))
+            return len(stations)
+        except Exception as e:
+            self.last_error = str(e)[:200]
+            raise
+        finally:
+            self.refreshing = False
+
+    # ---- queries ----
+    def ready(self) -> bool:
+        return self._tree is not None and len(self._tree) > 0
+
+    def age_s(self) -> Optional[float]:
+        return None if self.built_at is None else time.time() - self.built_at
+
+    def nearest(self, lat: float, lon: float, k: int = 8, radius_m: Optional[float] = None,
+                parameters: Optional[Iterable[str]] = None) -> List[Dict[str, Any]]:
+        """
+        Up to k stations nearest first, optionally within radius_m and measuring
+        at least one of `parameters`. Each result carries "distance" (m).
+        """
+        with self._lock:
+            tree, stations, params = self._tree, self._stations, self._params
+        if tree is None:
+            return []
+        accept = None
+        if parameters:
+            wanted = frozenset(parameters)
+            accept = lambda i: not params[i].isdisjoint(wanted)
+        return [{**stations[i], "distance": round(d, 1)}
+                for d, i in tree.query(lat, lon, k, radius_m=radius_m, accept=accept)]
+
+    def stats(self) -> dict:
+        age = self.age_s()
+        return {
+            "stations": len(self._stations),
+            "source": self.source,
+            "age_h": round(age / 3600.0, 2) if age is not None else None,
+            "refreshing": self.refreshing,
+            "last_error": self.last_error,
+        }
+
+catalogue = StationCatalogue()
+
+# ---- background refresh (started/stopped by the app lifespan) ----
+_stop = threading.Event()
+
+def _enabled() -> bool:
+    return (os.getenv("OPENAQ_CATALOGUE", "1").lower() in ("1", "true", "yes")
+            and bool(os.getenv("OPENAQ_API_KEY")))
+
+def _loop() -> None:
+    catalogue.load()
+    while not _stop.is_set():
+        age = catalogue.age_s()
+        if age is None or age >= MAX_AGE_S:
+            try:
+                catalogue.refresh()
+            except Exception as e:
+                logger.warning("openaq catalogue refresh failed: %s", e)
+                _stop.wait(600.0)   # retry in 10 min
+                continue
+            age = 0.0
+        _stop.wait(max(60.0, MAX_AGE_S - age))
+
+def start_refresher() -> None:
+    if not _enabled():
+        return
+    _stop.clear()
+    threading.Thread(target=_loop, daemon=True, name="openaq-catalogue").start()
+
+def stop_refresher() -> None:
+    _stop.set()
@@ -0,0 +1,176 @@
+# src/wavewarn/utils/openaq_series.py
+"""
+Per-sensor hourly buffers for OpenAQ /sensors/{id}/hours.
+
+Each sensor keeps a ring buffer (deque, newest last) of (epoch_hour, value)
+covering up to OPENAQ_SERIES_HOURS. A call first asks OpenAQ only for what
+the buffer lacks: hours after the last stored one (at most once per
+OPENAQ_SERIES_SYNC_S) and, when a longer window than ever before is asked
+for, the older gap. It then answers from memory.
+
+The forward request reaches back over the last OPENAQ_SERIES_OVERLAP_H hours
+and to the oldest hole in the window, so hours OpenAQ published late or
+that an outage skipped are filled in on a later sync rather than left as
+permanent gaps. It is still one call either way. Repeat lookups for a
+station cost nothing upstream and short history series come for free.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from datetime import datetime, timezone
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from .openaq_v3_client import _aget_json
+from .singleflight import SingleFlight
+
+CAPACITY_H = int(os.getenv("OPENAQ_SERIES_HOURS", "168"))
+SYNC_S = float(os.getenv("OPENAQ_SERIES_SYNC_S", "300"))
+MAX_SENSORS = int(os.getenv("OPENAQ_SERIES_MAX_SENSORS", "2000"))
+OVERLAP_H = int(os.getenv("OPENAQ_SERIES_OVERLAP_H", "6"))   # re-asked each sync for late rows
+
+series_flight = SingleFlight("openaq_hours")
+
+def _now_hour() -> int:
+    return int(time.time() // 3600)
+
+def _iso(hour: int) -> str:
+    return datetime.fromtimestamp(hour * 3600, tz=timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+def _row_hour(row: Dict[str, Any]) -> Optional[int]:
+    ts = (((row.get("period") or {}).get("datetimeFrom") or {}).get("utc"))
+    if not ts:
+        return None
+    return int(datetime.fromisoformat(ts.replace("Z", "+00:00")).timestamp() // 3600)
+
+class SensorSeries:
+    __slots__ = ("parameter", "points", "covered_from", "synced_at")
+
+    def __init__(self):
+        self.parameter: Optional[str] = None
+        self.points: Deque[Tuple[int, float]] = deque(maxlen=CAPACITY_H)
+        self.covered_from: Optional[int] = None   # earliest hour we've asked OpenAQ about
+        self.synced_at = 0.0                      # monotonic time of the last forward fetch
+
+    def last_hour(self) -> Optional[int]:
+        return self.points[-1][0] if self.points else None
+
+    def first_hole(self, start: int) -> Optional[int]:
+        """Earliest hour from `start` up to the last stored one that has no value."""
+        h = start
+        for p, _ in self.points:
+            if p < h:
+                continue
+            if p > h:
+                return h
+            h += 1
+        return None
+
+    def merge(self, rows: List[Dict[str, Any]]) -> int:
+        """Add rows (any order, re-sent hours overwrite); returns how many new hours were stored."""
+        new: Dict[int, float] = {}
+        for row in rows:
+            h, v = _row_hour(row), row.get("value")
+            if h is None or v is None:
+                continue
+            new[h] = float(v)
+            self.parameter = self.parameter or (row.get("parameter") or {}).get("name")
+        last = self.last_hour()
+        if last is not None and all(h > last for h in new):
+            self.points.extend(sorted(new.items()))     # the common case: pure append
+        elif new:
+            merged = dict(self.points)
+            added = sum(1 for h in new if h not in merged)
+            merged.update(new)
+            self.points = deque(sorted(merged.items()), maxlen=CAPACITY_H)
+            return added
+        return len(new)
+
+    def window(self, hours: int) -> List[Dict[str, Any]]:
+        """Stored rows of the last `hours` hours, most recent first, in OpenAQ's row shape."""
+        start = _now_hour() - hours + 1
+        out: List[Dict[str, Any]] = []
+        for h, v in reversed(self.points):
+            if h < start:
+                break
+            out.append({"value": v, "parameter": {"name": self.parameter},
+                        "period": {"datetimeFrom": {"utc": _iso(h)}}})
+        return out
+
+class SeriesStore:
+    def __init__(self, max_sensors: int = MAX_SENSORS):
+        self.max_sensors = max_sensors
+        self._lock = threading.Lock()
+        self._series: "OrderedDict[int, SensorSeries]" = OrderedDict()
+        self.upstream_calls = 0
+        self.served_from_buffer = 0
+
+    def series(self, sensor_id: int) -> SensorSeries:
+        with self._lock:
+            s = self._series.get(sensor_id)
+            if s is None:
+                s = self._series[sensor_id] = SensorSeries()
+                if len(self._series) > self.max_sensors:
+                    self._series.popitem(last=False)
+            self._series.move_to_end(sensor_id)
+            return s
+
+    def _gaps(self, s: SensorSeries, hours: int) -> List[Tuple[int, int]]:
+        """[from, to) hour ranges still missing for a `hours` window ending now."""
+        now = _now_hour() + 1
+        start = now - min(hours, CAPACITY_H)
+        if s.covered_from is None:
+            return [(start, now)]
+        gaps = []
+        if start < s.covered_from:
+            gaps.append((start, s.covered_from))
+        if time.monotonic() - s.synced_at >= SYNC_S:
+            last = s.last_hour()
+            if last is None:
+                frm = s.covered_from
+            else:
+                # overlap the tail, and reach back to any hole an outage or late publish left
+                hole = s.first_hole(max(start, s.covered_from))
+                frm = min(last + 1, now - OVERLAP_H, last + 1 if hole is None else hole)
+            gaps.append((max(start, frm), now))
+        return gaps
+
+    async def hours(self, sensor_id: int, hours: int = 24) -> List[Dict[str, Any]]:
+        """Like get_sensor_hours_async, but incremental; rows come most recent first."""
+        s = self.series(sensor_id)
+        if not self._gaps(s, hours):
+            self.served_from_buffer += 1
+            return s.window(hours)
+
+        async def sync() -> None:
+            for a, b in self._gaps(s, hours):
+                url = (f"https://api.openaq.org/v3/sensors/{sensor_id}/hours"
+                       f"?datetime_from={_iso(a)}&datetime_to={_iso(b)}&limit=500")
+                js = await _aget_json(url)
+                self.upstream_calls += 1
+                s.merge(js.get("results", []))
+                if b >= _now_hour():
+                    s.synced_at = time.monotonic()
+                s.covered_from = a if s.covered_from is None else min(s.covered_from, a)
+
+        # one sync per sensor at a time; callers that joined someone else's
+        # sync for a shorter window run their own for the rest
+        for _ in range(2):
+            await series_flight.ado(f"sensor:{sensor_id}", sync)
+            if not self._gaps(s, hours):
+                break
+        return s.window(hours)
+
+    def stats(self) -> dict:
+        with self._lock:
+            n = len(self._series)
+            points = sum(len(s.points) for s in self._series.values())
+        return {
+            "sensors": n,
+            "max_sensors": self.max_sensors,
+            "points": points,
+            "upstream_calls": self.upstream_calls,
+            "served_from_buffer": self.served_from_buffer,
+        }
+
+series_store = SeriesStore()
@@ -1,8 +1,8 @@
 # src/wavewarn/utils/openaq_v3_client.py
 from typing import Dict, Any, List, Optional, Tuple
 import os
-import httpx
-import certifi
+from . import http_pool
+from .rate_limit import limiter, max_queue_s, RateLimitExceeded
 from datetime import datetime, timedelta, timezone
 
 class OpenAQV3Error(Exception):
@@ -14,30 +14,59 @@ def _headers() -> Dict[str, str]:
         raise OpenAQV3Error("OPENAQ_API_KEY not set (export it or load via .env).")
     return {"Accept": "application/json", "X-API-Key": api_key}
 
-def _client() -> httpx.Client:
-    ca_path = os.getenv("OPENAQ_CA_BUNDLE") or certifi.where()
-    return httpx.Client(timeout=30.0, verify=ca_path)
+def _get(url: str):
+    # pooled client; CA bundle (OPENAQ_CA_BUNDLE) is loaded once in http_pool
+    headers = _headers()
+    bucket = limiter("openaq")   # only when OPENAQ_MAX_PER_MINUTE is set
+    if bucket is not None:
+        try:
+            bucket.acquire(max_queue_s())
+        except RateLimitExceeded as e:
+            raise OpenAQV3Error(str(e)) from e
+    return http_pool.get("openaq", url, headers=headers)
+
+async def _aget(url: str):
+    headers = _headers()
+    bucket = limiter("openaq")
+    if bucket is not None:
+        try:
+            await bucket.aacquire(max_queue_s())
+        except RateLimitExceeded as e:
+            raise OpenAQV3Error(str(e)) from e
+    return await http_pool.aget("openaq", url, headers=headers)
+
+async def _aget_json(url: str) -> Dict[str, Any]:
+    r = await _aget(url)
+    r.raise_for_status()
+    return r.json()
 
 # ---------- discovery ----------
-def get_locations_near(lat: float, lon: float, radius_m: int = 15000, limit: int = 30) -> List[Dict[str, Any]]:
+def _locations_url(lat: float, lon: float, radius_m: int, limit: int) -> str:
     # Filter for locations that actually measure pm25 or o3
-    url = (
+    return (
         f"https://api.openaq.org/v3/locations?"
         f"coordinates={lat},{lon}&radius={radius_m}&limit={limit}&sort=distance"
         f"&parameters=pm25,o3"
     )
-    with _client() as c:
-        r = c.get(url, headers=_headers())
+
+def get_locations_near(lat: float, lon: float, radius_m: int = 15000, limit: int = 30) -> List[Dict[str, Any]]:
+    r = _get(_locations_url(lat, lon, radius_m, limit))
     r.raise_for_status()
     return r.json().get("results", [])
 
+async def get_locations_near_async(lat: float, lon: float, radius_m: int = 15000, limit: int = 30) -> List[Dict[str, Any]]:
+    return (await _aget_json(_locations_url(lat, lon, radius_m, limit))).get("results", [])
+
 def get_sensors_by_location(location_id: int) -> List[Dict[str, Any]]:
     url = f"https://api.openaq.org/v3/locations/{location_id}/sensors"
-    with _client() as c:
-        r = c.get(url, headers=_headers())
+    r = _get(url)
     r.raise_for_status()
     return r.json().get("results", [])
 
+async def get_sensors_by_location_async(location_id: int) -> List[Dict[str, Any]]:
+    url = f"https://api.openaq.org/v3/locations/{location_id}/sensors"
+    return (await _aget_json(url)).get("results", [])
+
 def choose_sensor_for_params(sensors: List[Dict[str, Any]], wanted: List[str]) -> Optional[Dict[str, Any]]:
     # Prefer pm25, then o3
     by_param = {}
@@ -53,13 +82,17 @@ def choose_sensor_for_params(sensors: List[Dict[str, Any]], wanted: List[str]) -
 # ---------- latest-at-location (shortcut) ----------
 def get_location_latest(location_id: int) -> Dict[str, Any]:
     url = f"https://api.openaq.org/v3/locations/{location_id}/latest"
-    with _client() as c:
-        r = c.get(url, headers=_headers())
+    r = _get(url)
     r.raise_for_status()
     js = r.json()
     results = js.get("results") or []
     return results[0] if results else {}
 
+async def get_location_latest_async(location_id: int) -> Dict[str, Any]:
+    url = f"https://api.openaq.org/v3/locations/{location_id}/latest"
+    results = (await _aget_json(url)).get("results") or []
+    return results[0] if results else {}
+
 def extract_pm25_o3_from_latest(latest: Dict[str, Any]) -> Tuple[Optional[float], Optional[float], Optional[str]]:
     name = latest.get("name")
     measurements = latest.get("measurements", [])
@@ -84,18 +117,22 @@ def extract_pm25_o3_from_latest(latest: Dict[str, Any]) -> Tuple[Optional[float]
     return pm25, o3_ppb, name
 
 # ---------- sensor time-series ----------
-def get_sensor_hours(sensor_id: int, hours: int = 24) -> List[Dict[str, Any]]:
+def _sensor_hours_url(sensor_id: int, hours: int) -> str:
     dt_to = datetime.now(timezone.utc)
     dt_from = dt_to - timedelta(hours=hours)
     qs = (f"?datetime_from={dt_from.strftime('%Y-%m-%dT%H:%M:%SZ')}"
           f"&datetime_to={dt_to.strftime('%Y-%m-%dT%H:%M:%SZ')}"
           f"&limit=500")
-    url = f"https://api.openaq.org/v3/sensors/{sensor_id}/hours{qs}"
-    with _client() as c:
-        r = c.get(url, headers=_headers())
+    return f"https://api.openaq.org/v3/sensors/{sensor_id}/hours{qs}"
+
+def get_sensor_hours(sensor_id: int, hours: int = 24) -> List[Dict[str, Any]]:
+    r = _get(_sensor_hours_url(sensor_id, hours))
     r.raise_for_status()
     return r.json().get("results", [])
 
+async def get_sensor_hours_async(sensor_id: int, hours: int = 24) -> List[Dict[str, Any]]:
+    return (await _aget_json(_sensor_hours_url(sensor_id, hours))).get("results", [])
+
 def summarize_hours_to_latest(results: List[Dict[str, Any]]) -> Tuple[Optional[float], Optional[str]]:
     # pick the first (most recent) non-null
     for row in results:
@@ -1,32 +1,36 @@
 # src/wavewarn/utils/openmeteo_air_client.py
+import os
 from typing import Dict, Any
-import httpx
 from .cache import aq_cache
+from .grid import aq_grid
+from .hot_locations import aq_hot
+from .freshness import aq_freshness
+from .singleflight import aq_flight
+from .revalidate import aq_revalidator
+from .compact import expand
+from .openmeteo_client import OpenMeteoClient
 
 class OMAirError(Exception): ...
 
-def _ck(lat: float, lon: float, days: int) -> str:
-    return f"om_air:{round(lat, 2)}:{round(lon, 2)}:d{days}"
+# one cached forecast per location at the longest air horizon; shorter ones are slices
+MAX_DAYS = int(os.getenv("OM_AIR_MAX_DAYS", "5"))
 
-def fetch_air_quality(lat: float, lon: float, days: int = 5) -> Dict[str, Any]:
-    ck = _ck(lat, lon, days)
-    cached = aq_cache.get(ck)
-    if cached:
-        return cached
-
-    url = (
+def _url(lat: float, lon: float, days: int = MAX_DAYS) -> str:
+    return (
         "https://air-quality-api.open-meteo.com/v1/air-quality"
         f"?latitude={lat}&longitude={lon}"
         "&hourly=pm2_5,ozone"
         f"&forecast_days={days}&timezone=auto"
     )
-    try:
-        with httpx.Client(timeout=30.0) as c:
-            r = c.get(url, headers={"Accept": "application/json"})
-        r.raise_for_status()
-        js = r.json()
-        aq_cache.set(ck, js)     # <- cache for 1 hour
-        return js
-    except Exception as e:
-        raise OMAirError(f"Open-Meteo air failed: {e}")
 
+client = OpenMeteoClient(provider="openmeteo_air", label="air", url=_url, cache=aq_cache, grid=aq_grid,
+                         freshness=aq_freshness, flight=aq_flight, revalidator=aq_revalidator, hot=aq_hot,
+                         error=OMAirError)
+_ck = client.key
+
+def fetch_air_quality(lat: float, lon: float, days: int = 5) -> Dict[str, Any]:
+    return expand(client.canonical(lat, lon), min(days, MAX_DAYS) * 24)
+
+async def fetch_air_quality_async(lat: float, lon: float, days: int = 5) -> Dict[str, Any]:
+    """Async twin of fetch_air_quality (same cache, same errors)."""
+    return expand(await client.acanonical(lat, lon), min(days, MAX_DAYS) * 24)
@@ -0,0 +1,94 @@
+# src/wavewarn/utils/openmeteo_batch.py
+"""
+Multi-coordinate Open-Meteo fetches.
+
+Open-Meteo accepts comma-separated latitude/longitude lists and answers with a
+JSON list (one payload per point, same order). We skip points already cached,
+split the rest into URL-length-safe chunks and fill the normal per-point cache
+entries (the clients' canonical full-horizon forecasts, stored compact), so N
+locations cost a handful of upstream calls instead of N. Results are sliced
+to `days`.
+"""
+from typing import Any, Callable, Dict, Iterable, List, Tuple
+import logging
+import os
+import time
+
+from . import http_pool
+from .columnar import loads
+from .compact import CompactHourly, expand
+from .openmeteo_client import OpenMeteoClient
+from . import openmeteo_weather_client as om_wx
+from . import openmeteo_air_client as om_air
+
+logger = logging.getLogger("wavewarn.batch")
+
+Coord = Tuple[float, float]
+
+MAX_URL_LEN = int(os.getenv("OM_BATCH_MAX_URL_LEN", "1800"))
+MAX_POINTS = int(os.getenv("OM_BATCH_MAX_POINTS", "100"))
+
+def _csv(vals: Iterable[float]) -> str:
+    return ",".join(f"{round(v, 4)}" for v in vals)
+
+def _chunks(points: List[Coord], url_for: Callable[[List[Coord]], str]) -> List[List[Coord]]:
+    """Greedy split so each chunk's URL stays under MAX_URL_LEN (and MAX_POINTS)."""
+    out: List[List[Coord]] = []
+    cur: List[Coord] = []
+    for p in points:
+        trial = cur + [p]
+        if cur and (len(trial) > MAX_POINTS or len(url_for(trial)) > MAX_URL_LEN):
+            out.append(cur)
+            trial = [p]
+        cur = trial
+    if cur:
+        out.append(cur)
+    return out
+
+def _batch(coords: Iterable[Coord], days: int, client: OpenMeteoClient,
+           refresh: bool = False) -> Dict[Coord, Dict[str, Any]]:
+    provider, cache, grid, freshness, url = client.provider, client.cache, client.grid, client.freshness, client.url
+    out: Dict[Coord, Any] = {}
+    # one upstream point per cache key; duplicates/near-duplicates share it
+    pending: Dict[str, List[Coord]] = {}
+    for lat, lon in coords:
+        key = grid.key(lat, lon)
+        if key in pending:
+            pending[key].append((lat, lon))
+            continue
+        hit = None if refresh else cache.get(key)
+        if hit:
+            out[(lat, lon)] = hit
+        else:
+            pending[key] = [(lat, lon)]
+
+    todo = [pts[0] for pts in pending.values()]
+    key_of = {pts[0]: key for key, pts in pending.items()}
+    url_for = lambda pts: url(_csv(p[0] for p in pts), _csv(p[1] for p in pts))
+    for chunk in _chunks(todo, url_for):
+        try:
+            r = http_pool.get(provider, url_for(chunk))
+            r.raise_for_status()
+            js = loads(r.content)
+        except Exception as e:
+            logger.warning("batch %s chunk of %d failed: %s", provider, len(chunk), e)
+            continue
+        payloads = js if isinstance(js, list) else [js]
+        fetched_at = time.time()
+        for (lat, lon), payload in zip(chunk, payloads):
+            key = key_of[(lat, lon)]
+            payload["_fetched_at"] = fetched_at
+            cell = grid.learn(lat, lon, payload)
+            value = CompactHourly.from_payload(payload)
+            cache.set(cell, value, soft_ttl=freshness.soft_ttl(cell, r.headers))
+            for p in pending.get(key, [(lat, lon)]):
+                out[p] = value      # same form as a cache hit
+    return {p: expand(v, days * 24) for p, v in out.items()}
+
+# each client's url() only formats its arguments, so CSV strings slot straight in
+# refresh=True refetches points even if cached (used by the prewarm scheduler)
+def fetch_weather_batch(coords: Iterable[Coord], days: int = 10, refresh: bool = False) -> Dict[Coord, Dict[str, Any]]:
+    return _batch(coords, days, om_wx.client, refresh=refresh)
+
+def fetch_air_batch(coords: Iterable[Coord], days: int = 5, refresh: bool = False) -> Dict[Coord, Dict[str, Any]]:
+    return _batch(coords, days, om_air.client, refresh=refresh)
@@ -0,0 +1,144 @@
+# src/wavewarn/utils/openmeteo_client.py
+"""
+The cached Open-Meteo fetch path, shared by the weather and air clients.
+
+An OpenMeteoClient holds one canonical full-horizon forecast per provider
+grid cell, stored compact (CompactHourly). The lookup order is:
+  - the cache (L1, snapshot, L2) with stale-while-revalidate past the soft
+    TTL;
+  - the negative cache for cells that came back with a 4xx;
+  - one single-flight upstream call per cell.
+With the breaker open or the deadline spent, an expired entry is served
+instead of an error. Every sync method has an async twin that keeps the
+cache's blocking tiers off the event loop.
+
+openmeteo_weather_client and openmeteo_air_client each build one instance
+and keep their module-level functions as the public API.
+"""
+import contextlib
+import time
+from typing import Any, Callable, Dict, Optional, Tuple, Type
+
+from . import http_pool
+from .cache import TTLCache
+from .circuit_breaker import CircuitOpen, stale_max_s
+from .columnar import loads
+from .compact import CompactHourly, expand
+from .deadline import DeadlineExceeded
+from .freshness import FreshnessPolicy
+from .grid import GridIndex
+from .hedge import LatencyWindow, Timer
+from .hot_locations import HotLocations
+from .negative_cache import negative_cache, client_error
+from .revalidate import Revalidator
+from .singleflight import SingleFlight
+
+class OpenMeteoClient:
+    def __init__(self, *, provider: str, label: str, url: Callable[..., str], cache: TTLCache,
+                 grid: GridIndex, freshness: FreshnessPolicy, flight: SingleFlight,
+                 revalidator: Revalidator, hot: HotLocations, error: Type[Exception],
+                 latency: Optional[LatencyWindow] = None):
+        self.provider = provider        # http_pool / breaker / negative-cache name
+        self.label = label              # "weather" | "air", for error messages
+        self.url = url                  # url(lat, lon) -> canonical request
+        self.cache = cache
+        self.grid = grid
+        self.freshness = freshness
+        self.flight = flight
+        self.revalidator = revalidator
+        self.hot = hot
+        self.error = error
+        self.latency = latency          # upstream (cache-miss) latencies, if anyone reads them
+
+    def key(self, lat: float, lon: float) -> str:
+        # the provider grid cell this point falls in (see grid.py)
+        return self.grid.key(lat, lon)
+
+    def _failed(self, e: BaseException) -> Exception:
+        return self.error(f"Open-Meteo {self.label} failed: {e}")
+
+    def _timer(self):
+        return Timer(self.latency) if self.latency is not None else contextlib.nullcontext()
+
+    def _stale(self, value: Any, e: Exception) -> Dict[str, Any]:
+        # upstream is known down (or no budget left to ask): an expired entry beats an error
+        js = expand(value)
+        if js is None:
+            raise self._failed(e)
+        return {**js, "stale": True}
+
+    def _rejected(self, ck: str, e: Exception) -> None:
+        # a 4xx for this cell will be a 4xx next time too; remember it briefly
+        status = client_error(e)
+        if status is not None:
+            negative_cache.failed(self.provider, ck, status, str(self._failed(e)))
+
+    def _known_bad(self, ck: str) -> None:
+        known = negative_cache.get(self.provider, ck)
+        if known is not None:
+            raise self.error(known["detail"])
+
+    def _store(self, lat: float, lon: float, r) -> Tuple[str, CompactHourly, float]:
+        # (key, value, soft TTL); callers return value, so a miss reads exactly like a later hit
+        js = loads(r.content)
+        js["_fetched_at"] = time.time()     # -> data_age_s in responses
+        key = self.grid.learn(lat, lon, js)
+        # stored as float32 columns; fresh until shortly after the next model run is published
+        return key, CompactHourly.from_payload(js), self.freshness.soft_ttl(key, r.headers)
+
+    def fetch(self, ck: str, lat: float, lon: float) -> Any:
+        try:
+            with self._timer():
+                r = http_pool.get(self.provider, self.url(lat, lon))
+            r.raise_for_status()
+            key, value, soft_ttl = self._store(lat, lon, r)
+            self.cache.set(key, value, soft_ttl=soft_ttl)
+            return value
+        except (CircuitOpen, DeadlineExceeded) as e:
+            return self._stale(self.cache.get_stale(ck, stale_max_s()), e)
+        except Exception as e:
+            self._rejected(ck, e)
+            raise self._failed(e)
+
+    async def afetch(self, ck: str, lat: float, lon: float) -> Any:
+        try:
+            with self._timer():
+                r = await http_pool.aget(self.provider, self.url(lat, lon))
+            r.raise_for_status()
+            key, value, soft_ttl = self._store(lat, lon, r)
+            await self.cache.aset(key, value, soft_ttl=soft_ttl)
+            return value
+        except (CircuitOpen, DeadlineExceeded) as e:
+            return self._stale(await self.cache.aget_stale(ck, stale_max_s()), e)
+        except Exception as e:
+            self._rejected(ck, e)
+            raise self._failed(e)
+
+    def canonical(self, lat: float, lon: float) -> Any:
+        """The cell's forecast: a CompactHourly (cached or just fetched), or a stale payload dict."""
+        ck = self.key(lat, lon)
+        self.hot.note(ck, lat, lon)     # feeds the prewarm scheduler's learned hot set
+        hit = self.cache.lookup(ck)
+        if hit:
+            cached, refresh_due = hit
+            if refresh_due:
+                # past the soft TTL: answer now, refresh once in the background
+                self.revalidator.schedule(ck, lambda: self.fetch(ck, lat, lon))
+            return cached
+
+        self._known_bad(ck)
+        # concurrent misses on the same key share one upstream call
+        return self.flight.do(ck, lambda: self.fetch(ck, lat, lon))
+
+    async def acanonical(self, lat: float, lon: float) -> Any:
+        ck = self.key(lat, lon)
+        self.hot.note(ck, lat, lon)
+        hit = await self.cache.alookup(ck)
+        if hit:
+            cached, refresh_due = hit
+            if refresh_due:
+                self.revalidator.aschedule(ck, lambda: self.afetch(ck, lat, lon))
+            return cached
+
+        self._known_bad(ck)
+        return await self.flight.ado(ck, lambda: self.afetch(ck, lat, lon))
@@ -1,35 +1,53 @@
 # src/wavewarn/utils/openmeteo_weather_client.py
+import os
 from typing import Dict, Any
-import httpx
 from .cache import wx_cache
+from .grid import wx_grid
+from .hot_locations import wx_hot
+from .freshness import wx_freshness
+from .singleflight import wx_flight
+from .revalidate import wx_revalidator
+from .hedge import LatencyWindow
+from .compact import expand
+from .openmeteo_client import OpenMeteoClient
 
 class OMWeatherError(Exception): ...
-# existing helper(s) you already have remain unchanged
 
-def _ck(lat: float, lon: float, days: int) -> str:
-    # round to ~1km buckets to improve cache hit rate
-    return f"om_wx:{round(lat, 2)}:{round(lon, 2)}:d{days}"
+# upstream (cache-miss) latencies; drives the hedge delay in weather_provider
+om_latency = LatencyWindow()
 
-def fetch_weather_hourly(lat: float, lon: float, days: int = 10) -> Dict[str, Any]:
-    ck = _ck(lat, lon, days)
-    cached = wx_cache.get(ck)
-    if cached:
-        return cached
+# One canonical entry per location: every hourly variable any route reads, at
+# the longest horizon any route asks for. Shorter horizons are slices of it.
+WX_VARS = ("temperature_2m", "relative_humidity_2m", "wind_speed_10m", "uv_index",
+           "apparent_temperature", "shortwave_radiation", "cloud_cover")
+MAX_DAYS = int(os.getenv("OM_WX_MAX_DAYS", "16"))
 
-    # your existing URL building logic (unchanged)
-    url = (
+def _url(lat: float, lon: float, days: int = MAX_DAYS) -> str:
+    return (
         "https://api.open-meteo.com/v1/forecast"
         f"?latitude={lat}&longitude={lon}"
-        "&hourly=temperature_2m,relative_humidity_2m,wind_speed_10m,uv_index,apparent_temperature"
+        f"&hourly={','.join(WX_VARS)}"
         f"&forecast_days={days}&timezone=auto"
     )
-    try:
-        with httpx.Client(timeout=30.0) as c:
-            r = c.get(url, headers={"Accept": "application/json"})
-        r.raise_for_status()
-        js = r.json()
-        wx_cache.set(ck, js)     # <- cache for 1 hour (as configured)
-        return js
-    except Exception as e:
-        raise OMWeatherError(f"Open-Meteo weather failed: {e}")
 
+client = OpenMeteoClient(provider="openmeteo", label="weather", url=_url, cache=wx_cache, grid=wx_grid,
+                         freshness=wx_freshness, flight=wx_flight, revalidator=wx_revalidator, hot=wx_hot,
+                         error=OMWeatherError, latency=om_latency)
+_ck = client.key
+
+def fetch_canonical(lat: float, lon: float) -> Dict[str, Any]:
+    """The full cached forecast (WX_VARS x MAX_DAYS, from local midnight today)."""
+    return expand(client.canonical(lat, lon))
+
+async def fetch_canonical_async(lat: float, lon: float) -> Dict[str, Any]:
+    """Async twin of fetch_canonical."""
+    return expand(await client.acanonical(lat, lon))
+
+def fetch_weather_hourly(lat: float, lon: float, days: int = 10) -> Dict[str, Any]:
+    """Hourly weather for `days` local days, sliced from the canonical forecast."""
+    # only the requested rows are decoded from the compact entry
+    return expand(client.canonical(lat, lon), min(days, MAX_DAYS) * 24)
+
+async def fetch_weather_hourly_async(lat: float, lon: float, days: int = 10) -> Dict[str, Any]:
+    """Async twin of fetch_weather_hourly (same cache, same errors)."""
+    return expand(await client.acanonical(lat, lon), min(days, MAX_DAYS) * 24)
@@ -1,9 +1,13 @@
 # src/wavewarn/utils/openweather_client.py
 import os
 import time
-import requests
+import httpx
 from typing import Dict, Any, List, Optional
 from datetime import datetime, timezone
+from . import http_pool
+from .columnar import loads
+from .rate_limit import limiter, max_queue_s, TokenBucket, RateLimitExceeded
+from .circuit_breaker import CircuitOpen
 
 class OWMError(Exception):
     pass
@@ -18,30 +22,59 @@ def _iso_utc_from_unix(ts: int) -> str:
     # OpenWeather returns UNIX seconds (UTC)
     return datetime.fromtimestamp(int(ts), tz=timezone.utc).strftime("%Y-%m-%dT%H:%M")
 
+def _bucket() -> TokenBucket:
+    # OWM_MAX_PER_MINUTE is always set (defaults to 50)
+    return limiter("openweather")
+
+def has_spare_budget(reserve_frac: float = 0.2) -> bool:
+    """True if an optional call (hedging) can go now and still leave reserve_frac of the budget."""
+    return _bucket().has_spare(reserve_frac)
+
+_ONECALL_URL = "https://api.openweathermap.org/data/3.0/onecall"
+
+def _params(lat: float, lon: float, units: str, exclude: str) -> Dict[str, Any]:
+    return {
+        "lat": lat,
+        "lon": lon,
+        "appid": _get_api_key(),
+        "units": units,
+        "exclude": exclude,  # we want current,hourly,daily by default
+    }
+
+def _check(r: httpx.Response) -> Dict[str, Any]:
+    if r.status_code == 401:
+        raise OWMError("OpenWeather: 401 Unauthorized (check API key & plan).")
+    if r.status_code == 429:
+        raise OWMError("OpenWeather: 429 Rate limit exceeded.")
+    r.raise_for_status()
+    return loads(r.content)
+
 def fetch_onecall(lat: float, lon: float, *, units: str = "metric",
                   exclude: str = "minutely,alerts") -> Dict[str, Any]:
     """
     Calls OpenWeather One Call 3.0 API for a location.
     Returns raw JSON.
     """
-    api = _get_api_key()
-    url = "https://api.openweathermap.org/data/3.0/onecall"
-    params = {
-        "lat": lat,
-        "lon": lon,
-        "appid": api,
-        "units": units,
-        "exclude": exclude,  # we want current,hourly,daily by default
-    }
     try:
-        r = requests.get(url, params=params, timeout=15)
-        if r.status_code == 401:
-            raise OWMError("OpenWeather: 401 Unauthorized (check API key & plan).")
-        if r.status_code == 429:
-            raise OWMError("OpenWeather: 429 Rate limit exceeded.")
-        r.raise_for_status()
-        return r.json()
-    except requests.RequestException as e:
+        params = _params(lat, lon, units, exclude)
+        _bucket().acquire(max_queue_s())   # queue briefly instead of eating a 429
+        r = http_pool.get("openweather", _ONECALL_URL, params=params)
+        return _check(r)
+    except (RateLimitExceeded, CircuitOpen) as e:
+        raise OWMError(f"OpenWeather: {e}") from e
+    except httpx.HTTPError as e:
+        raise OWMError(f"OpenWeather request failed: {e}") from e
+
+async def fetch_onecall_async(lat: float, lon: float, *, units: str = "metric",
+                              exclude: str = "minutely,alerts") -> Dict[str, Any]:
+    try:
+        params = _params(lat, lon, units, exclude)
+        await _bucket().aacquire(max_queue_s())
+        r = await http_pool.aget("openweather", _ONECALL_URL, params=params)
+        return _check(r)
+    except (RateLimitExceeded, CircuitOpen) as e:
+        raise OWMError(f"OpenWeather: {e}") from e
+    except httpx.HTTPError as e:
         raise OWMError(f"OpenWeather request failed: {e}") from e
 
 def normalize_to_openmeteo_shape(onecall: Dict[str, Any]) -> Dict[str, Any]:
@@ -79,8 +112,13 @@ def fetch_hourly(lat: float, lon: float, *, days: int = 2, hours: Optional[int]
     Returns normalized dict from normalize_to_openmeteo_shape().
     """
     raw = fetch_onecall(lat, lon)
-    norm = normalize_to_openmeteo_shape(raw)
+    return _slice_hours(normalize_to_openmeteo_shape(raw), days, hours)
+
+async def fetch_hourly_async(lat: float, lon: float, *, days: int = 2, hours: Optional[int] = None) -> Dict[str, Any]:
+    raw = await fetch_onecall_async(lat, lon)
+    return _slice_hours(normalize_to_openmeteo_shape(raw), days, hours)
 
+def _slice_hours(norm: Dict[str, Any], days: int, hours: Optional[int]) -> Dict[str, Any]:
     # Slice to requested hours if specified
     if hours is None:
         hours = min(len(norm["hourly"]["time"]), int(days) * 24)
@@ -1,4 +1,4 @@
-import httpx
+from . import http_pool
 
 class PowerError(Exception):
     pass
@@ -7,8 +7,7 @@ def fetch_power_json(url: str):
     """Fetch daily NASA POWER JSON data."""
     if not url.startswith("https://power.larc.nasa.gov/"):
         raise PowerError("Invalid NASA POWER URL.")
-    with httpx.Client(timeout=30.0) as c:
-        r = c.get(url, headers={"Accept": "application/json"})
+    r = http_pool.get("power", url)
     r.raise_for_status()
     return r.json()
 
@@ -0,0 +1,160 @@
+# src/wavewarn/utils/prewarm.py
+"""
+Background prewarming of hot locations.
+
+A thread started from the app lifespan wakes every PREWARM_TICK_S. Each
+tick, and for each Open-Meteo cache, it collects the hot set:
+  - configured points: PREWARM_LOCATIONS ("lat,lon;lat,lon") and/or
+    PREWARM_FILE (a JSON list of [lat, lon] or {"lat", "lon"});
+  - learned points: the PREWARM_TOP_N heaviest keys of the cache's
+    count-min/top-k sketch (hot_locations.py) with an estimated
+    PREWARM_MIN_HITS lookups or more in the current decay window.
+Points that are missing from L1, or whose soft TTL ends within PREWARM_LEAD_S,
+are refetched with the batch client. The most overdue go first, and at most
+PREWARM_MAX_POINTS per cache per tick, which caps upstream traffic at a few
+batched calls a minute. Soft TTLs are already spread per key (freshness.py),
+so refreshes trickle in instead of arriving at model-run boundaries.
+Requests for hot locations therefore land on fresh entries and never
+trigger a foreground fetch or a stale-while-revalidate refresh.
+
+Computed risk responses are not prewarmed: their keys change with every
+data version, and rebuilding one from warm inputs costs milliseconds.
+"""
+import json
+import logging
+import os
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .cache import TTLCache, wx_cache, aq_cache
+from .grid import GridIndex, wx_grid, aq_grid
+from . import hot_locations
+from .hot_locations import HotLocations, wx_hot, aq_hot
+from .openmeteo_batch import fetch_weather_batch, fetch_air_batch
+
+logger = logging.getLogger("wavewarn.prewarm")
+
+Coord = Tuple[float, float]
+
+TICK_S = float(os.getenv("PREWARM_TICK_S", "60"))   # 0 = off
+LEAD_S = float(os.getenv("PREWARM_LEAD_S", str(2 * max(TICK_S, 1.0))))
+MAX_POINTS = int(os.getenv("PREWARM_MAX_POINTS", "200"))
+TOP_N = int(os.getenv("PREWARM_TOP_N", "200"))
+MIN_HITS = int(os.getenv("PREWARM_MIN_HITS", "3"))
+DECAY_S = float(os.getenv("PREWARM_DECAY_S", "3600"))
+
+def _configured() -> List[Coord]:
+    pts: List[Coord] = []
+    for part in (os.getenv("PREWARM_LOCATIONS") or "").split(";"):
+        if part.strip():
+            try:
+                lat, lon = part.split(",")
+                pts.append((float(lat), float(lon)))
+            except ValueError:
+                logger.warning("PREWARM_LOCATIONS: bad entry %r", part)
+    path = os.getenv("PREWARM_FILE")
+    if path:
+        try:
+            with open(path) as f:
+                for p in json.load(f):
+                    pts.append((float(p["lat"]), float(p["lon"])) if isinstance(p, dict) else (float(p[0]), float(p[1])))
+        except (OSError, ValueError, KeyError, IndexError, TypeError) as e:
+            logger.warning("PREWARM_FILE %s unreadable: %s", path, e)
+    return pts
+
+class Prewarmer:
+    def __init__(self, name: str, cache: TTLCache, grid: GridIndex, hot: HotLocations,
+                 fetch: Callable[..., Dict[Coord, object]], configured: List[Coord]):
+        self.name = name
+        self.cache = cache
+        self.grid = grid
+        self.hot = hot
+        self.fetch = fetch
+        self.configured = configured
+        self.ticks = 0
+        self.refreshed = 0
+        self.deferred = 0       # due points left for a later tick (budget)
+        self.failed = 0
+        self.last_tick_ms: Optional[float] = None
+        self.hot_size = 0
+
+    def due(self) -> List[Coord]:
+        """Hot points needing a refresh, most overdue first, one per cache key."""
+        points = list(self.configured) + [(lat, lon) for _, lat, lon, _ in self.hot.top(TOP_N, MIN_HITS)]
+        seen: Dict[str, Tuple[float, Coord]] = {}
+        for lat, lon in points:
+            key = self.grid.key(lat, lon, count=False)
+            if key in seen:
+                continue
+            left = self.cache.refresh_in(key)
+            seen[key] = (float("-inf") if left is None else left, (lat, lon))
+        self.hot_size = len(seen)
+        due = sorted((v for v in seen.values() if v[0] <= LEAD_S), key=lambda v: v[0])
+        return [p for _, p in due]
+
+    def tick(self) -> int:
+        t0 = time.perf_counter()
+        self.ticks += 1
+        due = self.due()
+        batch, self.deferred = due[:MAX_POINTS], max(0, len(due) - MAX_POINTS)
+        if batch:
+            try:
+                got = self.fetch(batch, days=1, refresh=True)
+                self.refreshed += len(got)
+                self.failed += len(batch) - len(got)
+            except Exception as e:
+                self.failed += len(batch)
+                logger.warning("prewarm %s: %s", self.name, e)
+        self.last_tick_ms = round((time.perf_counter() - t0) * 1000, 1)
+        return len(batch)
+
+    def stats(self) -> dict:
+        return {
+            "configured": len(self.configured),
+            "hot": self.hot_size,
+            "ticks": self.ticks,
+            "refreshed": self.refreshed,
+            "deferred": self.deferred,
+            "failed": self.failed,
+            "last_tick_ms": self.last_tick_ms,
+            "learned": self.hot.stats(),
+        }
+
+_prewarmers: List[Prewarmer] = []
+_stop = threading.Event()
+
+def _loop() -> None:
+    last_decay = time.time()
+    while True:
+        for p in _prewarmers:
+            try:
+                p.tick()
+            except Exception as e:     # never let one bad tick end the thread
+                logger.warning("prewarm %s tick failed: %s", p.name, e)
+        if time.time() - last_decay >= DECAY_S:
+            last_decay = time.time()
+            for h in hot_locations.ALL:
+                h.decay()
+        if _stop.wait(TICK_S):
+            return
+
+def start() -> None:
+    if TICK_S <= 0:
+        return
+    configured = _configured()
+    _prewarmers[:] = [
+        Prewarmer("weather", wx_cache, wx_grid, wx_hot, fetch_weather_batch, configured),
+        Prewarmer("air", aq_cache, aq_grid, aq_hot, fetch_air_batch, configured),
+    ]
+    _stop.clear()
+    threading.Thread(target=_loop, daemon=True, name="prewarm").start()
+
+def stop() -> None:
+    _stop.set()
+
+def stats() -> dict:
+    if TICK_S <= 0:
+        return {"enabled": False}
+    return {"enabled": True, "tick_s": TICK_S, "lead_s": LEAD_S, "max_points_per_tick": MAX_POINTS,
+            **{p.name: p.stats() for p in _prewarmers}}
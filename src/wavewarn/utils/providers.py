@@ -1,24 +1,19 @@
 from typing import List, Dict, Any
+from .columnar import HourlyFrame
 RowH = Dict[str, Any]  # {"time","T","RH","WS","SW","CLD","SRC"}
 
-def normalize_open_meteo_hourly(js: dict) -> List[RowH]:
-    d = js["hourly"]
-    times = d["time"]
-    out: List[RowH] = []
-
-    def gx(name, i):
-        arr = d.get(name)
-        return None if (arr is None or i >= len(arr)) else arr[i]
+# our hourly field -> Open-Meteo variable
+OM_HOURLY = {
+    "T":   "temperature_2m",
+    "RH":  "relative_humidity_2m",
+    "WS":  "wind_speed_10m",
+    "SW":  "shortwave_radiation",
+    "CLD": "cloud_cover",
+}
 
-    for i, t in enumerate(times):
-        out.append({
-            "time": t,
-            "T":   gx("temperature_2m", i),
-            "RH":  gx("relative_humidity_2m", i),
-            "WS":  gx("wind_speed_10m", i),
-            "SW":  gx("shortwave_radiation", i),
-            "CLD": gx("cloud_cover", i),
-            "SRC": "OPEN-METEO(HOURLY)",
-        })
-    return out
+def open_meteo_frame(js: dict) -> HourlyFrame:
+    """Columnar view of an Open-Meteo hourly payload (T/RH/WS/SW/CLD)."""
+    return HourlyFrame.from_openmeteo(js, OM_HOURLY)
 
+def normalize_open_meteo_hourly(js: dict) -> List[RowH]:
+    return open_meteo_frame(js).rows(SRC="OPEN-METEO(HOURLY)")
@@ -2,10 +2,10 @@
 from __future__ import annotations
 import os
 from typing import List, Dict, Any, Optional
-import httpx
 
-from .providers import normalize_open_meteo_hourly
-from .aggregate import hourly_to_daily, score_risk, detect_heatwave
+from .providers import open_meteo_frame
+from .openmeteo_weather_client import fetch_weather_hourly
+from .aggregate import frame_to_daily, score_risk, detect_heatwave
 from .power_client import fetch_power_json, normalize_power  # safe even if POWER is disabled
 
 RowD = Dict[str, Any]
@@ -15,16 +15,8 @@ def fetch_open_meteo_daily(lat: float, lon: float, days: int = 7) -> List[RowD]:
     Primary provider: Open-Meteo (hourly → daily aggregation).
     Returns rows with keys: date, TMAX, TMIN, RH, WS, SW, CLD, SRC, risk_score, tier, heatwave_*.
     """
-    url = (
-        f"https://api.open-meteo.com/v1/forecast?latitude={lat}&longitude={lon}"
-        f"&hourly=temperature_2m,relative_humidity_2m,wind_speed_10m,shortwave_radiation,cloud_cover"
-        f"&forecast_days={days}&timezone=auto"
-    )
-    with httpx.Client(timeout=30.0) as c:
-        r = c.get(url, headers={"Accept": "application/json"})
-    r.raise_for_status()
-    hourly = normalize_open_meteo_hourly(r.json())
-    daily = hourly_to_daily(hourly)
+    # a slice of the cached canonical forecast (superset of the variables we read)
+    daily = frame_to_daily(open_meteo_frame(fetch_weather_hourly(lat, lon, days=days)))
     daily = score_risk(daily)
     daily = detect_heatwave(daily)
     return daily
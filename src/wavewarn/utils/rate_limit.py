@@ -0,0 +1,164 @@
+# src/wavewarn/utils/rate_limit.py
+"""
+Token-bucket rate limiting for upstream providers.
+
+Callers reserve a token before each upstream call. If the bucket is empty they
+queue (sleep) until their token refills, or fail fast when that wait would
+exceed what the request can afford. Bucket state lives in a small file under
+RATE_LIMIT_STATE_DIR guarded by flock, so every uvicorn worker on the host
+draws from the same budget; without fcntl (Windows) it falls back to
+per-process state.
+"""
+import asyncio
+import os
+import struct
+import tempfile
+import threading
+import time
+from typing import Dict, Optional
+
+from . import deadline
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX
+    fcntl = None
+
+class RateLimitExceeded(Exception):
+    def __init__(self, name: str, wait_s: float, max_wait_s: float):
+        super().__init__(f"{name}: rate budget exhausted (next slot in {wait_s:.1f}s, can wait {max_wait_s:.1f}s)")
+        self.wait_s = wait_s
+
+_STATE = struct.Struct("<dd")   # tokens, updated_at (unix seconds)
+
+class TokenBucket:
+    def __init__(self, name: str, per_minute: float, burst: Optional[float] = None,
+                 state_dir: Optional[str] = None):
+        self.name = name
+        self.rate = per_minute / 60.0            # tokens per second
+        # small default burst: a full bucket plus a minute of refill must stay
+        # near the plan's per-minute ceiling
+        self.capacity = float(burst) if burst else max(1.0, per_minute / 6.0)
+        self._lock = threading.Lock()
+        self._mem = [self.capacity, time.time()]
+        self._fd: Optional[int] = None
+        if fcntl is not None:
+            d = state_dir or os.getenv("RATE_LIMIT_STATE_DIR") or os.path.join(tempfile.gettempdir(), "wavewarn-ratelimit")
+            try:
+                os.makedirs(d, exist_ok=True)
+                self._fd = os.open(os.path.join(d, f"{name}.bucket"), os.O_RDWR | os.O_CREAT, 0o600)
+            except OSError:
+                self._fd = None
+        self.granted = 0
+        self.queued = 0
+        self.rejected = 0
+        self.waited_s = 0.0
+
+    # ---- shared state ----
+    def _read(self):
+        if self._fd is None:
+            return self._mem[0], self._mem[1]
+        raw = os.pread(self._fd, _STATE.size, 0)
+        if len(raw) < _STATE.size:
+            return self.capacity, time.time()
+        return _STATE.unpack(raw)
+
+    def _write(self, tokens: float, ts: float) -> None:
+        if self._fd is None:
+            self._mem[0], self._mem[1] = tokens, ts
+        else:
+            os.pwrite(self._fd, _STATE.pack(tokens, ts), 0)
+
+    def _update(self, fn):
+        # thread lock for this process, flock for the other workers
+        with self._lock:
+            if self._fd is not None:
+                fcntl.flock(self._fd, fcntl.LOCK_EX)
+            try:
+                now = time.time()
+                tokens, ts = self._read()
+                tokens = min(self.capacity, tokens + max(0.0, now - ts) * self.rate)
+                new_tokens, result = fn(tokens)
+                self._write(new_tokens, now)
+                return result
+            finally:
+                if self._fd is not None:
+                    fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    # ---- API ----
+    def tokens(self) -> float:
+        return self._update(lambda t: (t, t))
+
+    def _reserve(self, max_wait_s: float) -> float:
+        """Take a token (possibly going into debt = queueing). Returns seconds to wait."""
+        def take(tokens: float):
+            wait = 0.0 if tokens >= 1.0 else (1.0 - tokens) / self.rate
+            if wait > max_wait_s:
+                self.rejected += 1
+                return tokens, (False, wait)
+            self.granted += 1
+            if wait > 0:
+                self.queued += 1
+                self.waited_s += wait
+            return tokens - 1.0, (True, wait)
+        ok, wait = self._update(take)
+        if not ok:
+            raise RateLimitExceeded(self.name, wait, max_wait_s)
+        return wait
+
+    def acquire(self, max_wait_s: float) -> float:
+        wait = self._reserve(max_wait_s)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    async def aacquire(self, max_wait_s: float) -> float:
+        wait = self._reserve(max_wait_s)
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+
+    def has_spare(self, reserve_frac: float = 0.0) -> bool:
+        """True if a call can go now without queueing and still leave reserve_frac of the bucket."""
+        return self.tokens() >= 1.0 + reserve_frac * self.capacity
+
+    def stats(self) -> dict:
+        return {
+            "per_minute": round(self.rate * 60.0, 2),
+            "burst": self.capacity,
+            "tokens": round(self.tokens(), 2),
+            "shared": self._fd is not None,
+            "granted": self.granted,
+            "queued": self.queued,
+            "rejected": self.rejected,
+            "waited_s": round(self.waited_s, 2),
+        }
+
+# provider -> (per-minute ceiling env, default or None = unlimited, burst env)
+_PLANS = {
+    "openweather": ("OWM_MAX_PER_MINUTE", "50", "OWM_BURST"),
+    "openaq":      ("OPENAQ_MAX_PER_MINUTE", None, "OPENAQ_BURST"),
+}
+_buckets: Dict[str, Optional[TokenBucket]] = {}
+_buckets_lock = threading.Lock()
+
+def limiter(provider: str) -> Optional[TokenBucket]:
+    """The provider's bucket, or None if it has no configured ceiling."""
+    if provider not in _buckets:
+        with _buckets_lock:
+            if provider not in _buckets:
+                plan = _PLANS.get(provider)
+                per_min = os.getenv(plan[0], plan[1]) if plan else None
+                burst = os.getenv(plan[2]) if plan else None
+                _buckets[provider] = (TokenBucket(provider, float(per_min), burst=float(burst) if burst else None)
+                                      if per_min else None)
+    return _buckets[provider]
+
+def max_queue_s() -> float:
+    """How long a call may wait for a token before failing fast (never past the request deadline)."""
+    cap = float(os.getenv("RATE_LIMIT_MAX_QUEUE_S", "5"))
+    left = deadline.remaining()
+    return cap if left is None else max(0.0, min(cap, left))
+
+def stats() -> Dict[str, dict]:
+    return {p: b.stats() for p in _PLANS if (b := limiter(p)) is not None}
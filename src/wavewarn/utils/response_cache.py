@@ -0,0 +1,94 @@
+# src/wavewarn/utils/response_cache.py
+"""
+Computed-response cache for the heavy risk routes.
+
+Routes still fetch their inputs (normally warm provider-cache hits), then
+look here before rebuilding per-hour dicts, tiers and insight strings. Keys
+hold the route, the grid cells the inputs came from, the request
+parameters, each input's data version (its _fetched_at stamp) and the
+RuntimeConfig version. A refreshed forecast or a /admin/config write
+therefore changes the key, and old bodies age out of the LRU. If any input
+has no version (OpenWeather, a failed source), the response is not cached.
+
+Bodies are stored pre-serialised. Per-request fields ("location",
+"data_age_s") are left out and spliced in front on every response, so one
+entry serves everyone in the same cells.
+"""
+import json
+import os
+from typing import Any, Dict, Iterable, Optional
+
+from fastapi.responses import Response
+
+from .cache import TTLCache
+from .settings import config_version
+
+try:
+    import orjson as _orjson
+except ImportError:  # optional speed-up
+    _orjson = None
+
+LIVE_FIELDS = ("location", "data_age_s")
+
+def _dumps(obj: Any) -> bytes:
+    if _orjson is not None:
+        return _orjson.dumps(obj)
+    # same settings as Starlette's JSONResponse
+    return json.dumps(obj, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+def version_of(payload: Optional[Dict[str, Any]]) -> Optional[float]:
+    """Data version of a provider payload (None = unknown, don't cache)."""
+    return payload.get("_fetched_at") if payload else None
+
+class ResponseCache:
+    def __init__(self, max_items: int, ttl_s: int):
+        self._store = TTLCache(ttl_seconds=ttl_s, max_items=max_items)
+        self.built = 0
+        self.uncacheable = 0
+
+    def key(self, route: str, cells: Iterable[str], versions: Iterable[Any], **params: Any) -> Optional[str]:
+        versions = tuple(versions)
+        if any(v is None for v in versions):
+            self.uncacheable += 1
+            return None
+        p = ",".join(f"{k}={params[k]}" for k in sorted(params))
+        return f"{route}|{'|'.join(cells)}|{p}|{versions}|cfg{config_version()}"
+
+    def get(self, key: Optional[str], **live: Any) -> Optional[Response]:
+        if key is None:
+            return None
+        body = self._store.get(key)
+        return None if body is None else self._respond(body, live)
+
+    def put(self, key: Optional[str], content: Dict[str, Any]) -> Response:
+        """Serialise a freshly built response, cache it (if key) and return it."""
+        self.built += 1
+        live = {k: content[k] for k in LIVE_FIELDS if k in content}
+        body = _dumps({k: v for k, v in content.items() if k not in LIVE_FIELDS})
+        if key is not None:
+            self._store.set(key, body)
+        return self._respond(body, live)
+
+    @staticmethod
+    def _respond(body: bytes, live: Dict[str, Any]) -> Response:
+        if live:
+            head = _dumps(live)[:-1]    # '{"location":...' without the closing brace
+            body = head + (b"}" if body == b"{}" else b"," + body[1:])
+        return Response(content=body, media_type="application/json")
+
+    def stats(self) -> dict:
+        s = self._store.stats()
+        return {
+            "size": s["size"],
+            "max_items": s["max_items"],
+            "hits": s["hits"],
+            "built": self.built,
+            "uncacheable": self.uncacheable,
+            "hit_rate": s["hit_rate"],
+            "config_version": config_version(),
+        }
+
+response_cache = ResponseCache(
+    max_items=int(os.getenv("RESPONSE_CACHE_MAX_ITEMS", "512")),
+    ttl_s=int(os.getenv("RESPONSE_CACHE_TTL_S", "3600")),
+)
@@ -0,0 +1,102 @@
+# src/wavewarn/utils/revalidate.py
+"""
+Background refreshes for stale-while-revalidate.
+
+A cache entry past its soft TTL (see TTLCache.lookup) is still served, and
+the caller schedules a refresh here instead of waiting on upstream. At most
+one refresh per key is queued; it goes through the same SingleFlight as
+foreground misses, so it also joins (or is joined by) a blocking fetch of
+the same key. Refreshes run without the request's deadline.
+"""
+import asyncio
+import contextvars
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Optional, Set
+
+from .singleflight import SingleFlight, wx_flight, aq_flight
+
+logger = logging.getLogger("wavewarn.revalidate")
+
+WORKERS = int(os.getenv("REVALIDATE_WORKERS", "4"))
+
+class Revalidator:
+    def __init__(self, name: str, flight: SingleFlight):
+        self.name = name
+        self.flight = flight
+        self._lock = threading.Lock()
+        self._pending: Set[str] = set()
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._tasks: Set[asyncio.Task] = set()
+        self.scheduled = 0
+        self.deduped = 0
+        self.failed = 0
+
+    def _claim(self, key: str) -> bool:
+        with self._lock:
+            if key in self._pending:
+                self.deduped += 1
+                return False
+            self._pending.add(key)
+            self.scheduled += 1
+            return True
+
+    def _release(self, key: str) -> None:
+        with self._lock:
+            self._pending.discard(key)
+
+    def _failed(self, key: str, e: BaseException) -> None:
+        self.failed += 1
+        logger.info("revalidate %s %s failed: %s", self.name, key, e)
+
+    def schedule(self, key: str, fn: Callable[[], Any]) -> None:
+        """Refresh key with fn() on a worker thread, unless one is already queued."""
+        if not self._claim(key):
+            return
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=WORKERS, thread_name_prefix=f"revalidate-{self.name}")
+            pool = self._pool
+
+        def run() -> None:
+            try:
+                self.flight.do(key, fn)
+            except Exception as e:
+                self._failed(key, e)
+            finally:
+                self._release(key)
+
+        pool.submit(run)
+
+    def aschedule(self, key: str, fn: Callable[[], Awaitable[Any]]) -> None:
+        """Async twin of schedule(): refresh on the running loop as a detached task."""
+        if not self._claim(key):
+            return
+
+        async def run() -> None:
+            try:
+                await self.flight.ado(key, fn)
+            except Exception as e:
+                self._failed(key, e)
+            finally:
+                self._release(key)
+
+        # fresh context: the refresh must not inherit (and die with) the request deadline
+        task = asyncio.get_running_loop().create_task(run(), context=contextvars.Context())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "scheduled": self.scheduled,
+                "deduped": self.deduped,
+                "failed": self.failed,
+                "in_flight": len(self._pending),
+            }
+
+# one per provider cache, sharing the provider's single-flight slots
+wx_revalidator = Revalidator("weather", wx_flight)
+aq_revalidator = Revalidator("air", aq_flight)
@@ -10,11 +10,17 @@ class RuntimeConfig:
     weight_aqi: float = 0.4
 
 CFG = RuntimeConfig()
+_version = 0
+
+def config_version() -> int:
+    """Bumped by every update_config(); computed-response cache keys include it."""
+    return _version
 
 def get_config() -> Dict[str, Any]:
     return asdict(CFG)
 
 def update_config(patch: Dict[str, Any]) -> Dict[str, Any]:
+    global _version
     if "weather_provider_prefer" in patch:
         val = str(patch["weather_provider_prefer"]).lower().strip()
         if val not in ("auto", "openmeteo", "openweather"):
@@ -31,5 +37,6 @@ def update_config(patch: Dict[str, Any]) -> Dict[str, Any]:
             raise ValueError("weight_aqi must be 0.0..1.0")
         CFG.weight_aqi = wa
     # keep weights unconstrained from summing to 1 on purpose; combine_tiers handles normalization if needed
+    _version += 1
     return get_config()
 
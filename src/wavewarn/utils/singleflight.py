@@ -0,0 +1,118 @@
+# src/wavewarn/utils/singleflight.py
+"""
+Single-flight coalescing for upstream fetches.
+
+Concurrent cache misses on the same key wait on one outstanding fetch instead
+of each calling the provider. Works across both the threadpool (sync routes)
+and the event loop (async routes): the shared slot is a concurrent.futures
+Future, which threads block on and coroutines await via wrap_future.
+"""
+import asyncio
+import logging
+import threading
+from collections import deque
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Deque, Dict, Tuple
+
+logger = logging.getLogger("wavewarn.singleflight")
+
+class _LeaderAborted(Exception):
+    """The fetching caller was cancelled; waiters retry on their own."""
+
+class _Call:
+    __slots__ = ("future", "waiters")
+
+    def __init__(self):
+        self.future: Future = Future()
+        self.waiters = 0
+
+class SingleFlight:
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self._inflight: Dict[str, _Call] = {}
+        self.fetches = 0      # upstream fetches actually made
+        self.coalesced = 0    # callers served by another caller's fetch
+        self.max_served = 0   # most callers a single fetch has served
+        self._recent: Deque[Tuple[str, int]] = deque(maxlen=20)
+
+    def _join(self, key: str) -> Tuple[_Call, bool]:
+        with self._lock:
+            call = self._inflight.get(key)
+            if call is not None:
+                call.waiters += 1
+                self.coalesced += 1
+                return call, False
+            call = self._inflight[key] = _Call()
+            self.fetches += 1
+            return call, True
+
+    def _finish(self, key: str, call: _Call, value: Any = None, exc: BaseException | None = None) -> None:
+        with self._lock:
+            self._inflight.pop(key, None)
+            served = call.waiters + 1
+            self.max_served = max(self.max_served, served)
+            self._recent.append((key, served))
+        if served > 1:
+            logger.debug("singleflight %s %s served %d callers", self.name, key, served)
+        if call.future.done():
+            return      # cancelled from outside; nobody is left to read it
+        if exc is not None:
+            call.future.set_exception(exc)
+        else:
+            call.future.set_result(value)
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Any:
+        """Run fn() once per key among concurrent callers; everyone gets its result."""
+        while True:
+            call, leader = self._join(key)
+            if not leader:
+                try:
+                    return call.future.result()
+                except _LeaderAborted:
+                    continue
+            try:
+                value = fn()
+            except BaseException as e:
+                self._finish(key, call, exc=e)
+                raise
+            self._finish(key, call, value)
+            return value
+
+    async def ado(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Async twin of do(); shares in-flight slots with sync callers."""
+        while True:
+            call, leader = self._join(key)
+            if not leader:
+                try:
+                    # shielded: a cancelled waiter must not cancel the shared future
+                    return await asyncio.shield(asyncio.wrap_future(call.future))
+                except _LeaderAborted:
+                    continue
+            try:
+                value = await fn()
+            except asyncio.CancelledError:
+                # don't hand our cancellation to callers that still have budget
+                self._finish(key, call, exc=_LeaderAborted(key))
+                raise
+            except BaseException as e:
+                self._finish(key, call, exc=e)
+                raise
+            self._finish(key, call, value)
+            return value
+
+    def stats(self) -> dict:
+        with self._lock:
+            callers = self.fetches + self.coalesced
+            return {
+                "fetches": self.fetches,
+                "coalesced_callers": self.coalesced,
+                "callers_per_fetch": round(callers / self.fetches, 2) if self.fetches else None,
+                "max_served": self.max_served,
+                "in_flight": len(self._inflight),
+                "recent": [{"key": k, "served": n} for k, n in self._recent],
+            }
+
+# singletons keyed on the same cache keys as wx_cache / aq_cache
+wx_flight = SingleFlight("weather")
+aq_flight = SingleFlight("air")
@@ -0,0 +1,103 @@
+# src/wavewarn/utils/sketch.py
+"""
+Streaming heavy hitters in fixed memory: a count-min sketch plus a top-k table.
+
+The sketch is `depth` rows of `width` uint32 counters. add() bumps one counter
+per row (double hashing on hash(key)) with conservative update, so
+estimate = min over rows never under-counts and over-counts little while
+the width comfortably exceeds the number of hot keys. The k keys with the
+highest estimates are kept exactly in a dict with a min-heap beside it (one
+heap item per key, re-keyed lazily), together with a caller payload such as
+the query point. 512 x 4 counters is 8 KB; with k=256 the whole structure
+stays in the tens of KB no matter how many distinct keys pass through.
+
+decay() halves everything, so estimates follow recent traffic. Keys use
+Python's per-process string hash; sketches are not shared or persisted.
+"""
+import heapq
+import threading
+from array import array
+from typing import Any, Dict, List, Optional, Tuple
+
+class CountMinTopK:
+    def __init__(self, width: int = 512, depth: int = 4, k: int = 256):
+        self.width = width
+        self.depth = depth
+        self.k = k
+        self._rows = [array("I", bytes(4 * width)) for _ in range(depth)]
+        self._top: Dict[str, List[Any]] = {}       # key -> [estimate, payload]
+        self._heap: List[Tuple[int, str]] = []      # (estimate, key), min first
+        self._lock = threading.Lock()
+        self.total = 0
+
+    def _slots(self, key: str) -> List[int]:
+        h = hash(key)
+        step = ((h >> 17) ^ h) | 1
+        return [(h + i * step) % self.width for i in range(self.depth)]
+
+    def add(self, key: str, payload: Any = None) -> int:
+        """Count one occurrence of key; returns its new estimate."""
+        slots = self._slots(key)
+        with self._lock:
+            self.total += 1
+            cur = [row[j] for row, j in zip(self._rows, slots)]
+            est = min(cur) + 1
+            for row, j, c in zip(self._rows, slots, cur):
+                if c < est:     # conservative update: only raise the counters at the minimum
+                    row[j] = est
+            e = self._top.get(key)
+            if e is not None:
+                e[0] = est
+                if payload is not None:
+                    e[1] = payload
+            elif len(self._top) < self.k:
+                self._top[key] = [est, payload]
+                heapq.heappush(self._heap, (est, key))
+            elif est > self._floor():
+                _, old = heapq.heappop(self._heap)
+                del self._top[old]
+                self._top[key] = [est, payload]
+                heapq.heappush(self._heap, (est, key))
+            return est
+
+    def _floor(self) -> int:
+        # caller holds the lock; re-key stale heap items until the head is current
+        heap, top = self._heap, self._top
+        while heap[0][0] != top[heap[0][1]][0]:
+            heapq.heapreplace(heap, (top[heap[0][1]][0], heap[0][1]))
+        return heap[0][0]
+
+    def estimate(self, key: str) -> int:
+        slots = self._slots(key)
+        with self._lock:
+            return min(row[j] for row, j in zip(self._rows, slots))
+
+    def top(self, n: Optional[int] = None, min_count: int = 1) -> List[Tuple[str, int, Any]]:
+        """(key, estimate, payload) of the heaviest keys, heaviest first."""
+        with self._lock:
+            rows = [(k, e[0], e[1]) for k, e in self._top.items() if e[0] >= min_count]
+        rows.sort(key=lambda r: r[1], reverse=True)
+        return rows if n is None else rows[:n]
+
+    def decay(self) -> None:
+        """Halve every count (old traffic fades out)."""
+        with self._lock:
+            for row in self._rows:
+                for j, v in enumerate(row):
+                    if v:
+                        row[j] = v >> 1
+            self._top = {k: [e[0] >> 1, e[1]] for k, e in self._top.items() if e[0] >> 1}
+            self._heap = [(e[0], k) for k, e in self._top.items()]
+            heapq.heapify(self._heap)
+            self.total >>= 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "width": self.width,
+                "depth": self.depth,
+                "k": self.k,
+                "tracked": len(self._top),
+                "total": self.total,
+                "sketch_bytes": self.width * self.depth * 4,
+            }
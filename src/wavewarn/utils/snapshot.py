@@ -0,0 +1,290 @@
+# src/wavewarn/utils/snapshot.py
+"""
+On-disk snapshots of the Open-Meteo caches, for warm restarts.
+
+A restart used to empty wx_cache/aq_cache, and every location then missed
+at once. A background thread started from the app lifespan now checkpoints
+each cache every CACHE_SNAPSHOT_INTERVAL_S, and shutdown flushes once more.
+A checkpoint writes the live entries to a temp file and renames it over
+the previous snapshot, so readers never see a half-written file. Entries
+use the same blobs as the shared backends (cache_backends.encode), so
+compact forecasts stay compact on disk.
+
+Cache keys name provider grid cells (grid.py), so each snapshot also holds
+its GridIndex's learned aliases as one record; those are restored eagerly,
+otherwise restarted workers would look up provisional keys and never find
+the snapshot's entries.
+
+Startup otherwise only indexes the file. It is memory-mapped, and the scan
+reads record headers and skips entries past their drop time. Values are
+decoded the first time a key misses L1 (TTLCache._from_snapshot), so a big
+snapshot doesn't slow startup. Keys not used before the next checkpoint
+are carried over as raw blobs.
+
+All workers share one file per cache. A checkpoint therefore re-reads the
+file under an exclusive lock and merges it: records other workers wrote
+since our load are kept, and where keys collide the record with the later
+drop time wins (ours, for entries live in our L1). Grid aliases are unioned.
+Nothing is lost to whichever worker happened to write last.
+
+File layout: MAGIC, then records of <HId (key length, blob length,
+drop_at) + key + blob.
+"""
+import logging
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows: checkpoints there aren't serialised across workers
+    fcntl = None
+
+from .cache import TTLCache, wx_cache, aq_cache
+from .cache_backends import decode, encode
+from .grid import GridIndex, wx_grid, aq_grid
+
+logger = logging.getLogger("wavewarn.snapshot")
+
+_MAGIC = b"WWSNAP1\n"
+_REC = struct.Struct("<HId")
+_GRID_KEY = "\0grid"     # record holding GridIndex.aliases()
+
+def _open(path: str) -> Optional[mmap.mmap]:
+    try:
+        with open(path, "rb") as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):     # missing or empty file
+        return None
+    if mm[:len(_MAGIC)] != _MAGIC:
+        logger.warning("snapshot %s: unknown format, ignored", path)
+        mm.close()
+        return None
+    return mm
+
+def _scan(mm: mmap.mmap, path: str, now: float) -> Dict[str, Tuple[int, int, float]]:
+    """key -> (offset, length, drop_at) of the records not yet past their drop time."""
+    index: Dict[str, Tuple[int, int, float]] = {}
+    pos, end = len(_MAGIC), len(mm)
+    try:
+        while pos < end:
+            klen, blen, drop_at = _REC.unpack_from(mm, pos)
+            pos += _REC.size
+            key = mm[pos:pos + klen].decode()
+            pos += klen
+            if pos + blen > end:
+                break       # truncated tail
+            if drop_at > now:
+                index[key] = (pos, blen, drop_at)
+            pos += blen
+    except (struct.error, UnicodeDecodeError):
+        logger.warning("snapshot %s: corrupt after %d keys", path, len(index))
+    return index
+
+SNAPSHOT_DIR = os.getenv("CACHE_SNAPSHOT_DIR") or os.path.join(tempfile.gettempdir(), "wavewarn", "snapshot")
+INTERVAL_S = float(os.getenv("CACHE_SNAPSHOT_INTERVAL_S", "300"))   # 0 = no snapshots
+
+class Snapshot:
+    def __init__(self, path: str, grid: Optional[GridIndex] = None):
+        self.path = path
+        self.grid = grid
+        self._lock = threading.Lock()
+        self._mm: Optional[mmap.mmap] = None
+        self._index: Dict[str, Tuple[int, int, float]] = {}     # key -> (offset, length, drop_at)
+        self.recovered = 0      # valid keys found at startup
+        self.restored = 0       # of those, loaded into L1 so far
+        self.checkpoints = 0
+        self.last_checkpoint: Optional[float] = None
+        self.last_written = 0
+        self.last_checkpoint_ms: Optional[float] = None
+        self.errors = 0
+
+    def load(self) -> int:
+        """Index the snapshot file (values stay on disk); returns the number of usable keys."""
+        mm = _open(self.path)
+        if mm is None:
+            return 0
+        index = _scan(mm, self.path, time.time())
+        with self._lock:
+            self._mm, self._index = mm, index
+        aliases = self.take(_GRID_KEY)
+        if aliases is not None and self.grid is not None:
+            self.grid.restore(aliases[0])
+        self.restored = 0
+        self.recovered = len(index)
+        logger.info("snapshot %s: %d keys recovered", self.path, len(index))
+        return len(index)
+
+    def take(self, key: str) -> Optional[Tuple[Any, float, float, float]]:
+        """(value, stored_at, fresh_until, drop_at) for key, once; None if absent or unreadable."""
+        if not self._index:
+            return None
+        with self._lock:
+            rec = self._index.pop(key, None)
+            if rec is None:
+                return None
+            off, n, drop_at = rec
+            blob = self._mm[off:off + n]
+        try:
+            value, stored_at, fresh_until = decode(blob)
+        except ValueError:
+            return None
+        self.restored += 1
+        return value, stored_at, fresh_until, drop_at
+
+    def discard(self, key: str) -> None:
+        if self._index:
+            with self._lock:
+                self._index.pop(key, None)
+
+    def pending(self) -> int:
+        """Keys still waiting to be restored (0 once the snapshot is used up)."""
+        return len(self._index)
+
+    def _lock_file(self):
+        # serialises read-merge-replace across workers; None where flock is unavailable
+        if fcntl is None:
+            return None
+        f = open(f"{self.path}.lock", "a")
+        fcntl.flock(f, fcntl.LOCK_EX)
+        return f
+
+    def _merge_grid(self, mm: Optional[mmap.mmap], index: Dict[str, Tuple[int, int, float]]) -> List[Any]:
+        # the file's aliases (other workers') first, ours after them so they count as newer
+        ours = self.grid.aliases()
+        rec = index.pop(_GRID_KEY, None)
+        if mm is None or rec is None:
+            return ours
+        try:
+            theirs = decode(mm[rec[0]:rec[0] + rec[1]])[0]
+        except ValueError:
+            return ours
+        mine = {(i, j) for i, j, _ in ours}
+        merged = [a for a in theirs if (a[0], a[1]) not in mine] + ours
+        return merged[-self.grid.max_aliases:]
+
+    def checkpoint(self, cache: TTLCache) -> int:
+        """Merge cache's live entries, our not-yet-restored ones and the file's current records
+        (other workers'), then replace the file atomically; returns records written."""
+        t0 = time.perf_counter()
+        now = time.time()
+        entries = cache.entries()
+        live = {k for k, _ in entries}
+        with self._lock:
+            # keys restored on first use are now in L1; the rest are copied raw
+            carried = {k: (self._mm[off:off + n], drop_at) for k, (off, n, drop_at) in self._index.items()
+                       if drop_at > now and k not in live}
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        written = 0
+        lock = None
+        mm = None
+        try:
+            lock = self._lock_file()
+            mm = _open(self.path)
+            index = _scan(mm, self.path, now) if mm is not None else {}
+            aliases = self._merge_grid(mm, index) if self.grid is not None else None
+            with open(tmp, "wb") as f:
+                f.write(_MAGIC)
+                for k, e in entries:
+                    theirs = index.get(k)
+                    if theirs is not None and theirs[2] > e[3]:
+                        continue        # another worker stored it later; copied below
+                    index.pop(k, None)
+                    f.write(self._record(k, encode(e[0], e[1], e[2]), e[3]))
+                    written += 1
+                for k, (off, n, drop_at) in index.items():
+                    mine = carried.get(k)
+                    if mine is not None and mine[1] >= drop_at:
+                        continue
+                    carried.pop(k, None)
+                    f.write(self._record(k, mm[off:off + n], drop_at))
+                    written += 1
+                for k, (blob, drop_at) in carried.items():
+                    f.write(self._record(k, blob, drop_at))
+                    written += 1
+                if aliases is not None:
+                    f.write(self._record(_GRID_KEY, encode(aliases, now, now), float("inf")))
+                    written += 1
+            os.replace(tmp, self.path)
+        except Exception as e:
+            self.errors += 1
+            logger.warning("snapshot %s: checkpoint failed: %s", self.path, e)
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+            return 0
+        finally:
+            if mm is not None:
+                mm.close()
+            if lock is not None:
+                lock.close()        # releases the flock
+        self.checkpoints += 1
+        self.last_checkpoint = now
+        self.last_written = written
+        self.last_checkpoint_ms = round((time.perf_counter() - t0) * 1000, 1)
+        return written
+
+    @staticmethod
+    def _record(key: str, blob: bytes, drop_at: float) -> bytes:
+        kb = key.encode()
+        return _REC.pack(len(kb), len(blob), drop_at) + kb + blob
+
+    def stats(self) -> dict:
+        return {
+            "path": self.path,
+            "recovered": self.recovered,
+            "restored": self.restored,
+            "pending": len(self._index),
+            "checkpoints": self.checkpoints,
+            "last_checkpoint_age_s": None if self.last_checkpoint is None else round(time.time() - self.last_checkpoint),
+            "last_written": self.last_written,
+            "last_checkpoint_ms": self.last_checkpoint_ms,
+            "errors": self.errors,
+        }
+
+_CACHES: Dict[str, Tuple[TTLCache, GridIndex]] = {"weather": (wx_cache, wx_grid), "air": (aq_cache, aq_grid)}
+_stop = threading.Event()
+
+def restore() -> int:
+    """Attach a Snapshot to each cache and index its file; returns total keys recovered."""
+    total = 0
+    for name, (cache, grid) in _CACHES.items():
+        snap = Snapshot(os.path.join(SNAPSHOT_DIR, f"{name}.snap"), grid)
+        total += snap.load()
+        cache.snapshot = snap
+    return total
+
+def checkpoint() -> None:
+    for cache, _ in _CACHES.values():
+        if cache.snapshot is not None:
+            cache.snapshot.checkpoint(cache)
+
+def _loop() -> None:
+    while not _stop.wait(INTERVAL_S):
+        checkpoint()
+
+def start() -> None:
+    if INTERVAL_S <= 0:
+        return
+    restore()
+    _stop.clear()
+    threading.Thread(target=_loop, daemon=True, name="cache-snapshot").start()
+
+def stop() -> None:
+    """Stop checkpointing and flush one last snapshot."""
+    if INTERVAL_S <= 0:
+        return
+    _stop.set()
+    checkpoint()
+
+def stats() -> dict:
+    if INTERVAL_S <= 0:
+        return {"enabled": False}
+    return {"enabled": True, "interval_s": INTERVAL_S,
+            **{name: c.snapshot.stats() for name, (c, _) in _CACHES.items() if c.snapshot is not None}}
@@ -1,30 +1,73 @@
 # src/wavewarn/utils/waqi_client.py
-from typing import Dict, Any, Optional
+from typing import Dict, Any, NoReturn, Optional
 import os
 import httpx
+from . import http_pool
+from .negative_cache import negative_cache, client_error
 
 class WAQIError(Exception):
     pass
 
+# WAQI error strings that are about our token/quota, not the location
+_NOT_PER_POINT = ("invalid key", "over quota")
+
 def _token() -> str:
     tok = os.getenv("WAQI_TOKEN")
     if not tok:
         raise WAQIError("WAQI_TOKEN not set (put it in .env)")
     return tok
 
+def _url(lat: float, lon: float) -> str:
+    return f"https://api.waqi.info/feed/geo:{lat};{lon}/?token={_token()}"
+
+def _data(js: Dict[str, Any]) -> Dict[str, Any]:
+    if js.get("status") != "ok":
+        raise WAQIError(f"WAQI returned status={js.get('status')}, data={js.get('data')}")
+    return js["data"]
+
+def _known_bad(lat: float, lon: float) -> str:
+    cell = negative_cache.cell(lat, lon)
+    hit = negative_cache.get("waqi", cell)
+    if hit is not None:
+        raise WAQIError(hit["detail"])
+    return cell
+
+def _fail(cell: str, e: Exception) -> NoReturn:
+    # "no station here" / per-point 4xx; bad tokens and quota are not about the point
+    if isinstance(e, WAQIError):
+        if not any(s in str(e).lower() for s in _NOT_PER_POINT):
+            negative_cache.empty("waqi", cell, str(e))
+        raise e
+    status = client_error(e)
+    if status is None:
+        raise e
+    detail = f"WAQI returned HTTP {status}"
+    negative_cache.failed("waqi", cell, status, detail)
+    raise WAQIError(detail) from e     # same error the cached marker raises next time
+
 def fetch_geo(lat: float, lon: float) -> Dict[str, Any]:
     """
     Geo feed: current AQI + pollutants near given coords.
     Docs: https://aqicn.org/json-api/doc/
     """
-    url = f"https://api.waqi.info/feed/geo:{lat};{lon}/?token={_token()}"
-    with httpx.Client(timeout=20.0) as c:
-        r = c.get(url, headers={"Accept": "application/json"})
-    r.raise_for_status()
-    js = r.json()
-    if js.get("status") != "ok":
-        raise WAQIError(f"WAQI returned status={js.get('status')}, data={js.get('data')}")
-    return js["data"]
+    url = _url(lat, lon)
+    cell = _known_bad(lat, lon)
+    try:
+        r = http_pool.get("waqi", url)
+        r.raise_for_status()
+        return _data(r.json())
+    except (WAQIError, httpx.HTTPStatusError) as e:
+        _fail(cell, e)
+
+async def fetch_geo_async(lat: float, lon: float) -> Dict[str, Any]:
+    url = _url(lat, lon)
+    cell = _known_bad(lat, lon)
+    try:
+        r = await http_pool.aget("waqi", url)
+        r.raise_for_status()
+        return _data(r.json())
+    except (WAQIError, httpx.HTTPStatusError) as e:
+        _fail(cell, e)
 
 def extract_latest(data: Dict[str, Any]) -> Dict[str, Any]:
     """
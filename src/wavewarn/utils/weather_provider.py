@@ -1,11 +1,38 @@
 # src/wavewarn/utils/weather_provider.py
-from typing import Dict, Any
-from .openmeteo_weather_client import fetch_weather_hourly as om_fetch, OMWeatherError
-from .openweather_client      import fetch_hourly         as owm_fetch, OWMError
+import os
+from typing import Dict, Any, Optional
+from .cache import wx_cache
+from .grid import wx_grid
+from .compact import expand
+from .openmeteo_weather_client import fetch_weather_hourly as om_fetch, OMWeatherError, om_latency, MAX_DAYS
+from .openmeteo_weather_client import fetch_weather_hourly_async as om_fetch_async
+from .openweather_client      import fetch_hourly         as owm_fetch, OWMError, has_spare_budget
+from .openweather_client      import fetch_hourly_async   as owm_fetch_async
+from .hedge import Hedger
+from .circuit_breaker import is_open
 
 class WeatherProviderError(Exception):
     pass
 
+# "auto" = Open-Meteo, hedged with OpenWeather once Open-Meteo runs past its p95
+wx_hedger = Hedger("weather", om_latency, primary="openmeteo", secondary="openweather")
+
+def _valid(js: Dict[str, Any]) -> bool:
+    return bool(((js or {}).get("hourly") or {}).get("time"))
+
+def _owm_can_hedge() -> bool:
+    # keep a slice of the OWM minute budget for explicit openweather requests
+    return not is_open("openweather") and has_spare_budget(float(os.getenv("HEDGE_OWM_RESERVE", "0.2")))
+
+def _om_down() -> bool:
+    # Open-Meteo's breaker is open: on a cache miss, ask OpenWeather first
+    # instead of racing a primary that can only answer from stale cache
+    return is_open("openmeteo") and _owm_can_hedge()
+
+def _om_cached(hit: Optional[tuple], days: int) -> Optional[Dict[str, Any]]:
+    # a fresh Open-Meteo entry costs no quota: serve it even with the breaker open
+    return None if hit is None else {"provider": "openmeteo", **expand(hit[0], min(days, MAX_DAYS) * 24)}
+
 def get_weather_hourly(lat: float, lon: float, *, provider: str = "openmeteo",
                        days: int = 5, hours: int | None = None) -> Dict[str, Any]:
     try:
@@ -14,15 +41,56 @@ def get_weather_hourly(lat: float, lon: float, *, provider: str = "openmeteo",
         elif provider == "openweather":
             return {"provider": "openweather", **owm_fetch(lat, lon, days=days, hours=hours)}
         elif provider == "auto":
-            try:
-                return {"provider": "openmeteo", **om_fetch(lat, lon, days=days)}
-            except Exception:
-                return {"provider": "openweather", **owm_fetch(lat, lon, days=days, hours=hours)}
+            if _om_down():
+                cached = _om_cached(wx_cache.lookup(wx_grid.key(lat, lon)), days)
+                if cached is not None:
+                    return cached
+                try:
+                    return {"provider": "openweather", **owm_fetch(lat, lon, days=days, hours=hours)}
+                except OWMError:
+                    pass    # fall through; Open-Meteo may still have a stale copy
+            winner, js = wx_hedger.race(
+                lambda: om_fetch(lat, lon, days=days),
+                lambda: owm_fetch(lat, lon, days=days, hours=hours),
+                can_hedge=_owm_can_hedge, valid=_valid,
+            )
+            return {"provider": winner, **js}
+        else:
+            raise WeatherProviderError(f"Unknown provider: {provider}")
+    except (OMWeatherError, OWMError) as e:
+        raise WeatherProviderError(str(e)) from e
+
+async def get_weather_hourly_async(lat: float, lon: float, *, provider: str = "openmeteo",
+                                   days: int = 5, hours: int | None = None) -> Dict[str, Any]:
+    """Async twin of get_weather_hourly for the async routes."""
+    try:
+        if provider == "openmeteo":
+            return {"provider": "openmeteo", **(await om_fetch_async(lat, lon, days=days))}
+        elif provider == "openweather":
+            return {"provider": "openweather", **(await owm_fetch_async(lat, lon, days=days, hours=hours))}
+        elif provider == "auto":
+            if _om_down():
+                cached = _om_cached(await wx_cache.alookup(wx_grid.key(lat, lon)), days)
+                if cached is not None:
+                    return cached
+                try:
+                    return {"provider": "openweather", **(await owm_fetch_async(lat, lon, days=days, hours=hours))}
+                except OWMError:
+                    pass
+            winner, js = await wx_hedger.arace(
+                lambda: om_fetch_async(lat, lon, days=days),
+                lambda: owm_fetch_async(lat, lon, days=days, hours=hours),
+                can_hedge=_owm_can_hedge, valid=_valid,
+            )
+            return {"provider": winner, **js}
         else:
             raise WeatherProviderError(f"Unknown provider: {provider}")
     except (OMWeatherError, OWMError) as e:
         raise WeatherProviderError(str(e)) from e
 
+def hedge_stats() -> Dict[str, Any]:
+    return wx_hedger.stats()
+
 # Back-compat alias (prevents old imports from crashing)
 get_hourly_weather = get_weather_hourly
-
+get_hourly_weather_async = get_weather_hourly_async
@@ -0,0 +1,195 @@
+import asyncio
+import socket
+import socketserver
+import threading
+import time
+
+import pytest
+
+from wavewarn.utils.cache import TTLCache
+from wavewarn.utils.cache_backends import CacheBackend, RedisBackend
+
+
+class _FakeRedis(socketserver.ThreadingTCPServer):
+    """Just enough RESP2 for RedisBackend: AUTH, SELECT, GET, SET .. PX, DEL."""
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, password=None):
+        super().__init__(("127.0.0.1", 0), _Handler)
+        self.password = password
+        self.data = {}      # key -> (value, expires_at)
+        self.commands = []
+        self.lock = threading.Lock()
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def _command(self):
+        line = self.rfile.readline()
+        if not line:
+            return None
+        assert line[:1] == b"*"
+        args = []
+        for _ in range(int(line[1:-2])):
+            n = int(self.rfile.readline()[1:-2])
+            args.append(self.rfile.read(n + 2)[:-2])
+        return args
+
+    def handle(self):
+        srv = self.server
+        authed = srv.password is None
+        while True:
+            args = self._command()
+            if args is None:
+                return
+            cmd = args[0].upper()
+            with srv.lock:
+                srv.commands.append(cmd)
+                if cmd == b"AUTH":
+                    authed = args[1].decode() == srv.password
+                    reply = b"+OK\r\n" if authed else b"-WRONGPASS\r\n"
+                elif not authed:
+                    reply = b"-NOAUTH Authentication required.\r\n"
+                elif cmd == b"SELECT":
+                    reply = b"+OK\r\n"
+                elif cmd == b"GET":
+                    hit = srv.data.get(args[1])
+                    if hit is None or hit[1] <= time.time():
+                        reply = b"$-1\r\n"
+                    else:
+                        reply = b"$%d\r\n%s\r\n" % (len(hit[0]), hit[0])
+                elif cmd == b"SET":
+                    assert args[3].upper() == b"PX"
+                    srv.data[args[1]] = (args[2], time.time() + int(args[4]) / 1000)
+                    reply = b"+OK\r\n"
+                elif cmd == b"DEL":
+                    reply = b":%d\r\n" % (srv.data.pop(args[1], None) is not None)
+                else:
+                    reply = b"-ERR unknown command\r\n"
+            self.wfile.write(reply)
+
+
+@pytest.fixture
+def redis_server():
+    srv = _FakeRedis(password="s3cret")
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    yield srv
+    srv.shutdown()
+    srv.server_close()
+
+
+def _url(srv, db=2):
+    host, port = srv.server_address
+    return f"redis://:{srv.password}@{host}:{port}/{db}"
+
+
+def test_redis_backend_round_trip(redis_server):
+    b = RedisBackend(_url(redis_server), prefix="t:")
+    assert b.get("k") is None
+    b.set("k", b"\x00blob\r\n", 60)
+    assert b.get("k") == b"\x00blob\r\n"
+    assert b"t:k" in redis_server.data
+    b.delete("k")
+    assert b.get("k") is None
+    assert redis_server.commands[:2] == [b"AUTH", b"SELECT"]
+    assert b.stats()["errors"] == 0 and b.stats()["hits"] == 1
+
+
+def test_two_caches_share_through_redis(redis_server):
+    b = RedisBackend(_url(redis_server))
+    worker1 = TTLCache(ttl_seconds=60, backend=b, namespace="wx:")
+    worker2 = TTLCache(ttl_seconds=60, backend=b, namespace="wx:")
+    worker1.set("cell", {"temp": [20.5, 21.0]})
+    assert worker2.get("cell") == {"temp": [20.5, 21.0]}
+    assert worker2.l2_hits == 1
+    assert worker2.peek("cell") is not None      # now in worker2's L1
+
+
+def test_async_lookup_reads_l2_off_the_event_loop(redis_server):
+    b = RedisBackend(_url(redis_server))
+    writer = TTLCache(ttl_seconds=60, backend=b, namespace="aq:")
+    reader = TTLCache(ttl_seconds=60, backend=b, namespace="aq:")
+    loop_thread = []
+
+    real_get = b._get
+
+    def spy(key):
+        loop_thread.append(threading.current_thread())
+        return real_get(key)
+
+    b._get = spy
+
+    async def main():
+        await writer.aset("cell", [1, 2, 3])
+        return threading.current_thread(), await reader.alookup("cell"), await reader.aget_stale("cell", 60)
+
+    main_thread, hit, stale = asyncio.run(main())
+    assert hit == ([1, 2, 3], False)
+    assert stale == [1, 2, 3]
+    assert loop_thread and all(t is not main_thread for t in loop_thread)
+
+
+def test_backend_down_backs_off_and_cache_keeps_working():
+    s = socket.socket()
+    s.bind(("127.0.0.1", 0))
+    port = s.getsockname()[1]
+    s.close()       # nothing listens here
+    b = RedisBackend(f"redis://127.0.0.1:{port}", timeout=0.1)
+    c = TTLCache(ttl_seconds=60, backend=b, namespace="x:")
+    c.set("k", "v")
+    assert c.get("k") == "v"
+    assert c.get("other") is None
+    assert b.errors == 1        # later calls skipped during the backoff
+    assert b.stats()["available"] is False
+
+
+def test_l2_hit_is_not_counted_as_a_miss(redis_server):
+    b = RedisBackend(_url(redis_server))
+    TTLCache(ttl_seconds=60, backend=b, namespace="m:").set("k", 1)
+    c = TTLCache(ttl_seconds=60, backend=b, namespace="m:")
+    assert c.get("k") == 1          # L1 miss, L2 hit
+    assert c.get("k") == 1          # L1 hit
+    assert c.get("absent") is None  # missed everywhere
+    s = c.stats()
+    assert (s["l1_hits"], s["l1_misses"]) == (1, 2)
+    assert (s["hits"], s["misses"], s["l2_hits"]) == (2, 1, 1)
+    assert s["hit_rate"] == round(2 / 3, 3)
+
+
+class _DictBackend(CacheBackend):
+    name = "dict"
+
+    def __init__(self):
+        super().__init__()
+        self.d = {}
+
+    def _get(self, key):
+        return self.d.get(key)
+
+    def _set(self, key, blob, ttl_s):
+        self.d[key] = blob
+
+    def _delete(self, key):
+        self.d.pop(key, None)
+
+
+def test_tier_counters_add_up_under_concurrency():
+    b = _DictBackend()
+    writer = TTLCache(ttl_seconds=60, backend=b, namespace="c:")
+    for i in range(50):
+        writer.set(f"k{i}", i)
+    reader = TTLCache(ttl_seconds=60, max_items=8, stripes=1, backend=b, namespace="c:")   # L1 churns
+
+    def work():
+        for n in range(400):
+            reader.get(f"k{n % 60}")        # k50..k59 miss everywhere
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    s = reader.stats()
+    assert s["l1_hits"] + s["l1_misses"] == 8 * 400
+    assert s["l1_misses"] == s["l2_hits"] + s["snapshot_hits"] + s["misses"]
+    assert s["misses"] == 8 * sum(1 for n in range(400) if n % 60 >= 50)
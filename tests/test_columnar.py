@@ -0,0 +1,15 @@
+from math import isnan
+
+from wavewarn.utils.columnar import HourlyFrame, loads
+
+
+def test_frame_packs_columns_with_nan_for_gaps():
+    js = loads(b'{"hourly": {"time": ["2026-01-01T00:00", "2026-01-01T01:00", "2026-01-02T00:00"],'
+               b' "temperature_2m": [1, null, 3.5], "wind_speed_10m": [2.0]}}')
+    f = HourlyFrame.from_openmeteo(js, {"T": "temperature_2m", "W": "wind_speed_10m", "X": "missing"})
+    assert list(f.cols["T"])[::2] == [1.0, 3.5] and isnan(f.cols["T"][1])
+    assert len(f.cols["W"]) == 3 and isnan(f.cols["W"][2])
+    assert all(isnan(v) for v in f.cols["X"])
+    assert f.day_spans() == [("2026-01-01", 0, 2), ("2026-01-02", 2, 3)]
+    assert f.present("T", 0, 2) == [1.0]
+    assert f.rows()[1] == {"time": "2026-01-01T01:00", "T": None, "W": None, "X": None}
@@ -0,0 +1,42 @@
+import zlib
+from email.utils import formatdate
+
+import pytest
+
+from wavewarn.utils.freshness import MIN_TTL_S, FreshnessPolicy
+
+DAY = 1_780_000_000 // 86400 * 86400     # a UTC midnight
+
+
+def test_fresh_until_the_next_run_plus_the_key_offset():
+    p = FreshnessPolicy("t", every_h=3, anchor_utc_h=2, spread_s=900)
+    off = zlib.crc32(b"cell") % 900
+    assert p.soft_ttl("cell", now=DAY + 2 * 3600 + 60) == 3 * 3600 - 60 + off
+    assert p.soft_ttl("cell", now=DAY + 4 * 3600) == 3600 + off    # next run at 05:00
+    assert p.soft_ttl("cell", now=DAY + 23 * 3600) == 3 * 3600 + off   # 02:00 tomorrow
+
+
+def test_a_run_boundary_starts_a_full_period():
+    p = FreshnessPolicy("t", every_h=12, anchor_utc_h=10, spread_s=1)
+    assert p.next_publish(DAY + 10 * 3600 - 1) == DAY + 10 * 3600
+    assert p.next_publish(DAY + 10 * 3600) == DAY + 22 * 3600
+
+
+def test_offsets_spread_keys_across_the_window():
+    p = FreshnessPolicy("t", every_h=3, anchor_utc_h=0, spread_s=900)
+    ttls = {p.soft_ttl(f"k{i}", now=DAY) for i in range(50)}
+    assert len(ttls) > 40
+    assert all(3 * 3600 <= t < 3 * 3600 + 900 for t in ttls)
+
+
+def test_headers_reanchor_and_cap():
+    p = FreshnessPolicy("t", every_h=3, anchor_utc_h=2, spread_s=1)
+    now = DAY + 3 * 3600
+    # a run published at 02:40 moves the next one to 05:40
+    lm = {"last-modified": formatdate(DAY + 2 * 3600 + 2400, usegmt=True)}
+    assert p.soft_ttl("k", lm, now=now) == 2 * 3600 + 2400
+    assert p.soft_ttl("k", {"cache-control": "public, max-age=600"}, now=now) == 600
+    assert p.soft_ttl("k", {"expires": formatdate(now + 900, usegmt=True)}, now=now) == 900
+    assert p.soft_ttl("k", {"cache-control": "max-age=86400"}, now=now) == 2 * 3600   # longer: ignored
+    assert p.soft_ttl("k", {"cache-control": "max-age=5"}, now=now) == MIN_TTL_S
+    assert p.from_headers == 3
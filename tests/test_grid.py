@@ -0,0 +1,45 @@
+from wavewarn.utils.grid import GridIndex
+
+CELL = {"latitude": 40.0, "longitude": -3.0, "elevation": 655.0}
+
+
+def test_learned_alias_shares_one_key_across_nearby_points():
+    g = GridIndex("wx", 0.05)
+    provisional = g.key(40.01, -3.01)
+    assert provisional == "wx:s800:-60"
+    assert g.learn(40.01, -3.01, CELL) == "wx:40.0000:-3.0000:e6"
+    assert g.key(40.012, -3.008) == "wx:40.0000:-3.0000:e6"        # same snapped point
+    g.learn(40.03, -3.03, CELL)
+    assert g.key(40.03, -3.03) == g.key(40.01, -3.01)
+    assert g.learn(41.0, -3.0, {"hourly": {}}) == "wx:s820:-60"     # no cell echoed: stays provisional
+    s = g.stats()
+    assert (s["aliases"], s["cells"], s["points_per_cell"]) == (2, 1, 2.0)
+    assert (g.resolved, g.provisional) == (3, 1)
+
+
+def test_uncounted_lookups_leave_stats_and_lru_alone():
+    g = GridIndex("wx", 0.05, max_aliases=2)
+    g.learn(1.0, 1.0, {**CELL, "latitude": 1.0})
+    g.learn(2.0, 2.0, {**CELL, "latitude": 2.0})
+    g.key(1.0, 1.0, count=False)
+    g.learn(3.0, 3.0, {**CELL, "latitude": 3.0})
+    assert [a[2][:6] for a in g.aliases()] == ["2.0000", "3.0000"]   # 1.0 was still the oldest
+    assert (g.resolved, g.provisional) == (0, 0)
+
+
+def test_restore_keeps_order_and_live_aliases_win():
+    old = GridIndex("wx", 0.05)
+    for lat in (1.0, 2.0, 3.0):
+        old.learn(lat, 0.0, {**CELL, "latitude": lat})
+    saved = old.aliases()
+
+    g = GridIndex("wx", 0.05, max_aliases=3)
+    g.learn(3.0, 0.0, {**CELL, "latitude": 33.0})                   # learned since startup
+    assert g.restore(saved) == 2
+    assert g.key(3.0, 0.0).startswith("wx:33.0000")
+    assert [a[2][:6] for a in g.aliases()] == ["1.0000", "2.0000", "33.000"]
+
+    small = GridIndex("wx", 0.05, max_aliases=2)
+    small.learn(9.0, 0.0, {**CELL, "latitude": 9.0})
+    small.restore(saved)
+    assert [a[2][:6] for a in small.aliases()] == ["3.0000", "9.0000"]   # the oldest restored go first
@@ -0,0 +1,93 @@
+import asyncio
+import time
+
+from wavewarn.utils.hedge import Hedger, LatencyWindow
+
+
+def _hedger(monkeypatch):
+    monkeypatch.setenv("HEDGE_DELAY_MS", "20")
+    return Hedger("test", LatencyWindow(), primary="a", secondary="b")
+
+
+def test_slow_failing_primary_falls_back_without_hedge_budget(monkeypatch):
+    h = _hedger(monkeypatch)
+
+    def primary():
+        time.sleep(0.1)
+        raise RuntimeError("primary down")
+
+    who, value = h.race(primary, lambda: "fallback", can_hedge=lambda: False, valid=lambda v: True)
+    assert (who, value) == ("b", "fallback")
+    assert h.counts["skipped_budget"] == 1 and h.counts["fallback"] == 1
+
+
+def test_async_slow_failing_primary_falls_back_without_hedge_budget(monkeypatch):
+    h = _hedger(monkeypatch)
+
+    async def primary():
+        await asyncio.sleep(0.1)
+        raise RuntimeError("primary down")
+
+    async def secondary():
+        return "fallback"
+
+    who, value = asyncio.run(h.arace(primary, secondary, can_hedge=lambda: False, valid=lambda v: True))
+    assert (who, value) == ("b", "fallback")
+
+
+def test_slow_primary_still_wins_without_hedge_budget(monkeypatch):
+    h = _hedger(monkeypatch)
+
+    def primary():
+        time.sleep(0.1)
+        return "primary"
+
+    assert h.race(primary, lambda: "fallback", can_hedge=lambda: False, valid=lambda v: True) == ("a", "primary")
+
+
+def _fill_pool(monkeypatch, threads):
+    import threading
+    from wavewarn.utils import hedge
+
+    monkeypatch.setattr(hedge, "_THREADS", threads)
+    release = threading.Event()
+    held = [hedge._submit(release.wait) for _ in range(threads)]
+    assert all(held) and hedge._submit(lambda: None) is None
+    return release, held
+
+
+def test_full_pool_runs_primary_inline_instead_of_queueing(monkeypatch):
+    import threading
+
+    h = _hedger(monkeypatch)
+    release, held = _fill_pool(monkeypatch, 2)
+    try:
+        ran_in = []
+        who, value = h.race(lambda: ran_in.append(threading.current_thread()) or "primary",
+                            lambda: "fallback", can_hedge=lambda: True, valid=lambda v: True)
+        assert (who, value) == ("a", "primary")
+        assert ran_in == [threading.current_thread()]
+        assert h.counts["skipped_pool"] == 1
+
+        def failing():
+            raise RuntimeError("down")
+
+        assert h.race(failing, lambda: "fallback", can_hedge=lambda: True, valid=lambda v: True) == ("b", "fallback")
+    finally:
+        release.set()
+        for f in held:
+            f.result(timeout=1)
+
+
+def test_no_free_thread_for_the_hedge_waits_on_the_primary(monkeypatch):
+    from wavewarn.utils import hedge
+
+    h = _hedger(monkeypatch)
+    monkeypatch.setattr(hedge, "_THREADS", hedge._busy + 1)      # room for the primary only
+
+    def primary():
+        time.sleep(0.1)
+        return "primary"
+
+    assert h.race(primary, lambda: "fallback", can_hedge=lambda: True, valid=lambda v: True) == ("a", "primary")
+    assert h.counts["skipped_pool"] == 1 and h.counts["hedged"] == 0
@@ -0,0 +1,39 @@
+import threading
+
+import httpx
+
+from wavewarn.utils.negative_cache import NegativeCache, client_error
+
+
+def _status_error(code):
+    req = httpx.Request("GET", "https://example.test")
+    return httpx.HTTPStatusError("x", request=req, response=httpx.Response(code, request=req))
+
+
+def test_only_per_point_4xx_are_cacheable():
+    assert client_error(_status_error(400)) == 400
+    assert client_error(_status_error(404)) == 404
+    assert client_error(_status_error(429)) is None
+    assert client_error(_status_error(503)) is None
+    assert client_error(ValueError()) is None
+
+
+def test_markers_and_counts_from_many_threads():
+    nc = NegativeCache(max_items=64)
+    cell = nc.cell(12.345, 67.891)
+    nc.empty("waqi", cell, "no station")
+
+    def work():
+        for _ in range(500):
+            assert nc.get("waqi", cell)["kind"] == "empty"
+            nc.failed("openaq", cell, 404, "unknown")
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    counts = nc.stats()["providers"]
+    assert counts["waqi"] == {"hits": 4000, "empty": 1, "errors": 0}
+    assert counts["openaq"]["errors"] == 4000
+    assert nc.get("openaq", cell) == {"kind": "error", "status": 404, "detail": "unknown"}
@@ -0,0 +1,53 @@
+import asyncio
+
+import pytest
+
+from wavewarn.routes import openaq
+from wavewarn.utils.negative_cache import negative_cache
+
+
+@pytest.fixture
+def rings(monkeypatch):
+    started, cancelled = [], []
+
+    async def ring(lat, lon, radius_m, limit):
+        started.append(radius_m)
+        try:
+            await asyncio.sleep(0.01 * len(started))
+        except asyncio.CancelledError:
+            cancelled.append(radius_m)
+            raise
+        return [{"id": radius_m, "name": f"r{radius_m}"}]
+
+    async def probe(loc, hours, sem, flaky):
+        return (12.0, None, loc["name"]) if loc["id"] in with_data else None
+
+    with_data = set()
+    monkeypatch.setattr(openaq, "_ring", ring)
+    monkeypatch.setattr(openaq, "_probe", probe)
+    monkeypatch.setattr(negative_cache, "get", lambda *a: None)
+    monkeypatch.setattr(negative_cache, "empty", lambda *a, **kw: None)
+    return started, cancelled, with_data
+
+
+def _nearby(lat):
+    return asyncio.run(openaq.openaq_nearby(lat=lat, lon=0.0, radius_m=10000, expand_search=True,
+                                            hours=24, max_locations=8))
+
+
+def test_hit_in_first_ring_discovers_only_one_more(rings):
+    started, cancelled, with_data = rings
+    with_data.add(10000)
+    out = _nearby(1.0)
+    assert out["ok"] and out["search_radii_tried_m"] == [10000]
+    assert started == [10000, 17500]
+    assert cancelled == [17500]
+
+
+def test_rings_are_discovered_one_ahead(rings):
+    started, cancelled, with_data = rings
+    with_data.add(30625)
+    out = _nearby(2.0)
+    assert out["ok"] and out["search_radii_tried_m"] == [10000, 17500, 30625]
+    assert started == [10000, 17500, 30625, 53593]
+    assert cancelled == [53593]
@@ -0,0 +1,62 @@
+import asyncio
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from wavewarn.utils import openaq_series as os
+
+NOW = 500_000       # epoch hour
+
+
+@pytest.fixture
+def upstream(monkeypatch):
+    published = {}      # hour -> value, what OpenAQ has right now
+    asked = []
+
+    async def aget_json(url):
+        q = parse_qs(urlparse(url).query)
+        a, b = (os._row_hour({"period": {"datetimeFrom": {"utc": q[k][0]}}}) for k in ("datetime_from", "datetime_to"))
+        asked.append((a, b))
+        return {"results": [{"value": v, "parameter": {"name": "pm25"},
+                             "period": {"datetimeFrom": {"utc": os._iso(h)}}}
+                            for h, v in published.items() if a <= h < b]}
+
+    monkeypatch.setattr(os, "_aget_json", aget_json)
+    monkeypatch.setattr(os, "_now_hour", lambda: NOW)
+    return published, asked
+
+
+def _hours(store, n=24):
+    store.series(1).synced_at -= os.SYNC_S      # next sync is due
+    return {os._row_hour(r) for r in asyncio.run(store.hours(1, hours=n))}
+
+
+def test_late_hour_is_filled_by_the_overlap(upstream):
+    published, asked = upstream
+    published.update({h: 1.0 for h in range(NOW - 23, NOW + 1) if h != NOW - 2})    # NOW-2 is late
+    store = os.SeriesStore()
+    assert NOW - 2 not in _hours(store)
+    published[NOW - 2] = 2.0
+    assert _hours(store) == set(range(NOW - 23, NOW + 1))
+    assert asked[-1][0] <= NOW - 2
+
+
+def test_outage_hole_older_than_the_overlap_is_refetched(upstream):
+    published, asked = upstream
+    outage = range(NOW - 20, NOW - 10)
+    published.update({h: 1.0 for h in range(NOW - 23, NOW + 1) if h not in outage})
+    store = os.SeriesStore()
+    _hours(store)
+    published.update({h: 3.0 for h in outage})      # backfilled after the outage
+    assert _hours(store) == set(range(NOW - 23, NOW + 1))
+    assert asked[-1] == (NOW - 20, NOW + 1)
+    assert len(asked) == 2                          # one call per sync
+
+
+def test_complete_buffer_only_re_asks_the_overlap(upstream):
+    published, asked = upstream
+    published.update({h: 1.0 for h in range(NOW - 23, NOW + 1)})
+    store = os.SeriesStore()
+    _hours(store)
+    _hours(store)
+    assert asked[-1] == (NOW + 1 - os.OVERLAP_H, NOW + 1)
@@ -0,0 +1,58 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from wavewarn.utils import http_pool
+from wavewarn.utils import openmeteo_air_client as om_air
+from wavewarn.utils import openmeteo_weather_client as om_wx
+from wavewarn.utils.cache import aq_cache, wx_cache
+from wavewarn.utils.openmeteo_batch import fetch_weather_batch
+
+PAYLOAD = {
+    "latitude": 40.0, "longitude": -3.0, "utc_offset_seconds": 0,
+    "hourly": {
+        "time": ["2026-06-01T00:00", "2026-06-01T01:00", "2026-06-01T02:00"],
+        "temperature_2m": [21.123456, 22.0, None],
+        "uv_index": [3, 4, 5],
+        "pm2_5": [7.777, 8, 9.5],
+    },
+}
+
+
+@pytest.fixture
+def upstream(monkeypatch):
+    wx_cache.clear()
+    aq_cache.clear()
+    calls = []
+
+    def respond(url):
+        calls.append(url)
+        return httpx.Response(200, content=json.dumps(PAYLOAD).encode(), request=httpx.Request("GET", url))
+
+    async def aget(provider, url, **kw):
+        return respond(url)
+
+    monkeypatch.setattr(http_pool, "get", lambda provider, url, **kw: respond(url))
+    monkeypatch.setattr(http_pool, "aget", aget)
+    return calls
+
+
+def _strip(js):
+    return {k: v for k, v in js.items() if k != "_fetched_at"}
+
+
+@pytest.mark.parametrize("fetch", [
+    lambda: om_wx.fetch_weather_hourly(40.0, -3.0, days=1),
+    lambda: om_air.fetch_air_quality(40.0, -3.0, days=1),
+    lambda: asyncio.run(om_wx.fetch_weather_hourly_async(40.0, -3.0, days=1)),
+    lambda: asyncio.run(om_air.fetch_air_quality_async(40.0, -3.0, days=1)),
+    lambda: fetch_weather_batch([(40.0, -3.0)], days=1)[(40.0, -3.0)],
+])
+def test_miss_and_hit_return_the_same_payload(upstream, fetch):
+    miss = fetch()
+    hit = fetch()
+    assert len(upstream) == 1
+    assert _strip(miss) == _strip(hit)
+    assert miss["_fetched_at"] == hit["_fetched_at"]
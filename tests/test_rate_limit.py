@@ -0,0 +1,70 @@
+import multiprocessing
+
+import pytest
+
+from wavewarn.utils import rate_limit as rl
+from wavewarn.utils.rate_limit import RateLimitExceeded, TokenBucket
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1_000_000.0]
+    monkeypatch.setattr(rl.time, "time", lambda: now[0])
+    return now
+
+
+def test_refills_at_the_per_minute_rate_up_to_the_burst(tmp_path, clock):
+    b = TokenBucket("refill", per_minute=60, burst=3, state_dir=str(tmp_path))
+    for _ in range(3):
+        assert b._reserve(0) == 0
+    with pytest.raises(RateLimitExceeded):
+        b._reserve(0.5)                 # next token is 1s away
+    clock[0] += 0.5
+    assert b.tokens() == pytest.approx(0.5)
+    clock[0] += 60
+    assert b.tokens() == 3.0            # capped at the burst
+
+
+def test_queued_callers_go_into_debt_in_order(tmp_path, clock):
+    b = TokenBucket("debt", per_minute=60, burst=1, state_dir=str(tmp_path))
+    assert b._reserve(5) == 0
+    assert b._reserve(5) == pytest.approx(1.0)
+    assert b._reserve(5) == pytest.approx(2.0)
+    with pytest.raises(RateLimitExceeded):
+        b._reserve(2.5)
+    s = b.stats()
+    assert (s["granted"], s["queued"], s["rejected"]) == (3, 2, 1)
+
+
+def test_instances_with_one_state_dir_share_the_bucket(tmp_path, clock):
+    a = TokenBucket("shared", per_minute=60, burst=4, state_dir=str(tmp_path))
+    b = TokenBucket("shared", per_minute=60, burst=4, state_dir=str(tmp_path))
+    assert a.stats()["shared"] and b.stats()["shared"]
+    a._reserve(0)
+    a._reserve(0)
+    b._reserve(0)
+    assert a.tokens() == b.tokens() == 1.0
+    assert not b.has_spare(0.25)        # 1 token left is all reserve
+
+
+def _drain(state_dir, out):
+    b = TokenBucket("procs", per_minute=0.001, burst=20, state_dir=state_dir)
+    got = 0
+    for _ in range(20):
+        try:
+            b._reserve(0)
+            got += 1
+        except RateLimitExceeded:
+            pass
+    out.put(got)
+
+
+def test_worker_processes_never_overdraw_the_shared_bucket(tmp_path):
+    ctx = multiprocessing.get_context("fork")
+    out = ctx.Queue()
+    procs = [ctx.Process(target=_drain, args=(str(tmp_path), out)) for _ in range(4)]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join(10)
+    assert sum(out.get(timeout=5) for _ in procs) == 20
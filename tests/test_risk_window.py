@@ -0,0 +1,106 @@
+import json
+from datetime import datetime, timedelta, timezone
+
+import httpx
+
+from wavewarn.routes import risk
+from wavewarn.utils import http_pool
+from wavewarn.utils.cache import wx_cache
+
+
+def _payload(hours):
+    start = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0)
+    return {
+        "latitude": 10.0, "longitude": 20.0, "utc_offset_seconds": 0,
+        "hourly": {
+            "time": [(start + timedelta(hours=i)).strftime("%Y-%m-%dT%H:00") for i in range(hours)],
+            "temperature_2m": [30.0] * hours,
+            "relative_humidity_2m": [50.0] * hours,
+        },
+    }
+
+
+def test_cold_cache_fetches_only_the_window(monkeypatch):
+    wx_cache.clear()
+    urls = []
+
+    def fake_get(provider, url, **kw):
+        urls.append(url)
+        return httpx.Response(200, content=json.dumps(_payload(6)).encode(), request=httpx.Request("GET", url))
+
+    monkeypatch.setattr(http_pool, "get", fake_get)
+    h = risk.fetch_openmeteo_window(10.0, 20.0, 6)
+    assert len(h["temperature_2m"]) == 6
+    assert len(urls) == 1 and f"forecast_hours={risk.WINDOW_HOURS}" in urls[0] and "forecast_days" not in urls[0]
+
+
+def test_cached_canonical_is_sliced_without_fetching(monkeypatch):
+    wx_cache.clear()
+    wx_cache.set(risk._wx_ck(10.0, 20.0), _payload(48))
+
+    def no_fetch(*a, **kw):
+        raise AssertionError("should not fetch")
+
+    monkeypatch.setattr(http_pool, "get", no_fetch)
+    h = risk.fetch_openmeteo_window(10.0, 20.0, 12)
+    assert len(h["time"]) == 12
+
+
+def test_window_entries_are_shared_per_grid_cell(monkeypatch):
+    wx_cache.clear()
+    calls = []
+
+    def fake_get(provider, url, **kw):
+        calls.append(url)
+        return httpx.Response(200, content=json.dumps(_payload(6)).encode(), request=httpx.Request("GET", url))
+
+    monkeypatch.setattr(http_pool, "get", fake_get)
+    risk.fetch_openmeteo_window(10.01, 20.01, 6)
+    # another point the provider resolves to the same cell (learned, e.g., from a canonical fetch)
+    risk.wx_grid.learn(10.09, 20.09, _payload(1))
+    risk.fetch_openmeteo_window(10.09, 20.09, 6)
+    assert len(calls) == 1
+    assert risk._model_ck(10.01, 20.01) == risk._model_ck(10.09, 20.09)
+
+
+def test_one_compact_window_serves_every_length(monkeypatch):
+    wx_cache.clear()
+    calls = []
+
+    def fake_get(provider, url, **kw):
+        calls.append(url)
+        return httpx.Response(200, content=json.dumps(_payload(risk.WINDOW_HOURS)).encode(),
+                              request=httpx.Request("GET", url))
+
+    monkeypatch.setattr(http_pool, "get", fake_get)
+    first = risk.fetch_openmeteo_window(10.0, 20.0, 6)
+    assert len(risk.fetch_openmeteo_window(10.0, 20.0, 72)["time"]) == 72
+    assert risk.fetch_openmeteo_window(10.0, 20.0, 6) == first     # a hit looks like the miss
+    assert len(calls) == 1
+    assert isinstance(wx_cache.peek(risk._model_ck(10.0, 20.0)), risk.CompactHourly)
+
+
+def test_forecast_fetches_air_quality_once(monkeypatch):
+    calls = []
+
+    def fake_air(lat, lon, days=5):
+        calls.append(days)
+        return {"hourly": {"time": [], "pm2_5": [], "ozone": []}, "_fetched_at": len(calls)}
+
+    monkeypatch.setattr(risk, "fetch_air_quality", fake_air)
+    monkeypatch.setattr(risk, "fetch_openmeteo_hourly", lambda lat, lon, hours: _payload(24))
+    out = risk.model_10_day_forecast(lat=1.0, lon=2.0, days=3)
+    assert out is not None and calls == [3]
+
+
+def test_forecast_without_air_quality(monkeypatch):
+    def down(*a, **kw):
+        raise risk.OMAirError("down")
+
+    monkeypatch.setattr(risk, "fetch_air_quality", down)
+    monkeypatch.setattr(risk, "fetch_openmeteo_hourly", lambda lat, lon, hours: _payload(24))
+    out = json.loads(risk.model_10_day_forecast(lat=1.0, lon=2.0, days=1).body)
+    assert out["ok"] and out["days_returned"] == len(out["days"]) >= 1
+    for day in out["days"]:
+        assert day["hourly"]
+        assert day["daily"]["air_quality"] is None
@@ -0,0 +1,35 @@
+import asyncio
+
+from wavewarn.utils.singleflight import SingleFlight
+
+
+def test_cancelled_waiter_does_not_cancel_shared_fetch():
+    sf = SingleFlight("test")
+    calls = 0
+
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.2)
+        return "value"
+
+    async def main():
+        leader = asyncio.ensure_future(sf.ado("k", fetch))
+        await asyncio.sleep(0)
+        patient = asyncio.ensure_future(sf.ado("k", fetch))
+        impatient = asyncio.wait_for(sf.ado("k", fetch), timeout=0.05)
+        try:
+            await impatient
+        except asyncio.TimeoutError:
+            pass
+        return await leader, await patient
+
+    assert asyncio.run(main()) == ("value", "value")
+    assert calls == 1
+    assert sf.stats()["in_flight"] == 0
+
+
+def test_sync_callers_share_one_call():
+    sf = SingleFlight("test")
+    assert sf.do("k", lambda: 1) == 1
+    assert sf.stats()["fetches"] == 1
@@ -0,0 +1,50 @@
+import random
+from collections import Counter
+
+from wavewarn.utils.sketch import CountMinTopK
+
+
+def _feed(s, counts):
+    for key, n in counts.items():
+        for _ in range(n):
+            s.add(key, payload=(key, n))
+
+
+def test_top_is_heaviest_first_with_payloads():
+    s = CountMinTopK(width=4096, k=8)
+    _feed(s, {"a": 3, "b": 7, "c": 5, "d": 1})
+    assert s.top() == [("b", 7, ("b", 7)), ("c", 5, ("c", 5)), ("a", 3, ("a", 3)), ("d", 1, ("d", 1))]
+    assert [k for k, _, _ in s.top(2)] == ["b", "c"]
+    assert [k for k, _, _ in s.top(min_count=4)] == ["b", "c"]
+
+
+def test_never_under_counts_and_over_counts_little():
+    rng = random.Random(7)
+    s = CountMinTopK(width=64, depth=4, k=16)      # far more keys than counters: forced collisions
+    truth = Counter(f"k{int(rng.paretovariate(1.2))}" for _ in range(5000))
+    for key in rng.sample(list(truth.elements()), sum(truth.values())):
+        s.add(key)
+    assert all(s.estimate(k) >= n for k, n in truth.items())
+    for key, n in truth.most_common(5):
+        assert s.estimate(key) - n <= s.total // 64
+
+
+def test_a_newcomer_evicts_the_lightest_only_when_heavier():
+    s = CountMinTopK(width=4096, k=2)
+    _feed(s, {"a": 4, "b": 2})
+    s.add("c")
+    assert {k for k, _, _ in s.top()} == {"a", "b"}     # 1 is not above the floor of 2
+    s.add("c")
+    s.add("c")
+    assert [k for k, _, _ in s.top()] == ["a", "c"]
+    assert s.stats()["tracked"] == 2
+
+
+def test_decay_halves_counts_and_drops_faded_keys():
+    s = CountMinTopK(width=4096, k=4)
+    _feed(s, {"a": 9, "b": 4, "c": 1})
+    s.decay()
+    assert [(k, e) for k, e, _ in s.top()] == [("a", 4), ("b", 2)]
+    assert (s.estimate("a"), s.estimate("c"), s.total) == (4, 0, 7)
+    _feed(s, {"d": 3})
+    assert [k for k, _, _ in s.top()] == ["a", "d", "b"]
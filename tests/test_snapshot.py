@@ -0,0 +1,66 @@
+import asyncio
+import threading
+
+from wavewarn.utils.cache import TTLCache
+from wavewarn.utils.grid import GridIndex
+from wavewarn.utils.snapshot import Snapshot
+
+
+def _worker(path, grid=None):
+    cache = TTLCache(ttl_seconds=600, max_items=64)
+    cache.snapshot = Snapshot(path, grid)
+    cache.snapshot.load()
+    return cache
+
+
+def test_checkpoints_from_two_workers_are_merged(tmp_path):
+    path = str(tmp_path / "weather.snap")
+    g1, g2 = GridIndex("wx", 0.05), GridIndex("wx", 0.05)
+    w1, w2 = _worker(path, g1), _worker(path, g2)
+    w1.set("a", {"v": 1})
+    g1.learn(10.0, 20.0, {"latitude": 10.0, "longitude": 20.0})
+    w2.set("b", {"v": 2})
+    g2.learn(30.0, 40.0, {"latitude": 30.0, "longitude": 40.0})
+    w1.snapshot.checkpoint(w1)
+    w2.snapshot.checkpoint(w2)      # used to overwrite w1's file wholesale
+
+    g3 = GridIndex("wx", 0.05)
+    restarted = _worker(path, g3)
+    assert restarted.get("a") == {"v": 1}
+    assert restarted.get("b") == {"v": 2}
+    assert len(g3.aliases()) == 2
+
+
+def test_later_record_wins_on_collision(tmp_path):
+    path = str(tmp_path / "air.snap")
+    w1, w2 = _worker(path), _worker(path)
+    w1.set("k", "long", ttl=600)
+    w2.set("k", "short", ttl=60)
+    w1.snapshot.checkpoint(w1)
+    w2.snapshot.checkpoint(w2)
+    assert _worker(path).get("k") == "long"
+
+
+def test_async_lookup_restores_from_snapshot_off_the_event_loop(tmp_path):
+    path = str(tmp_path / "weather.snap")
+    w = _worker(path)
+    w.set("k", [1.5, 2.5])
+    w.snapshot.checkpoint(w)
+
+    restarted = _worker(path)
+    seen = []
+    take = restarted.snapshot.take
+
+    def spy(key):
+        seen.append(threading.current_thread())
+        return take(key)
+
+    restarted.snapshot.take = spy
+
+    async def main():
+        return threading.current_thread(), await restarted.alookup("k")
+
+    loop_thread, hit = asyncio.run(main())
+    assert hit == ([1.5, 2.5], False)
+    assert seen and loop_thread not in seen
+    assert restarted.snapshot.pending() == 0
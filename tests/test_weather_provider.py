@@ -0,0 +1,44 @@
+import asyncio
+
+import pytest
+
+from wavewarn.utils import weather_provider as wp
+from wavewarn.utils.cache import wx_cache
+from wavewarn.utils.compact import CompactHourly
+from wavewarn.utils.grid import wx_grid
+
+PAYLOAD = {"latitude": 5.0, "longitude": 6.0,
+           "hourly": {"time": ["2026-01-01T00:00", "2026-01-01T01:00"], "temperature_2m": [20.0, 21.0]}}
+
+
+@pytest.fixture
+def om_breaker_open(monkeypatch):
+    monkeypatch.setattr(wp, "is_open", lambda name: name == "openmeteo")
+    monkeypatch.setattr(wp, "has_spare_budget", lambda reserve: True)
+    wx_cache.clear()
+    calls = []
+
+    def owm(*a, **kw):
+        calls.append("owm")
+        return {"hourly": {"time": ["x"]}}
+
+    async def owm_async(*a, **kw):
+        return owm()
+
+    monkeypatch.setattr(wp, "owm_fetch", owm)
+    monkeypatch.setattr(wp, "owm_fetch_async", owm_async)
+    return calls
+
+
+def test_breaker_open_serves_fresh_cache_without_openweather(om_breaker_open):
+    wx_cache.set(wx_grid.key(5.0, 6.0), CompactHourly.from_payload(PAYLOAD))
+    out = wp.get_weather_hourly(5.0, 6.0, provider="auto", days=1)
+    assert out["provider"] == "openmeteo" and out["hourly"]["temperature_2m"] == [20.0, 21.0]
+    out = asyncio.run(wp.get_weather_hourly_async(5.0, 6.0, provider="auto", days=1))
+    assert out["provider"] == "openmeteo"
+    assert om_breaker_open == []
+
+
+def test_breaker_open_cache_miss_asks_openweather(om_breaker_open):
+    out = wp.get_weather_hourly(7.0, 8.0, provider="auto", days=1)
+    assert out["provider"] == "openweather" and om_breaker_open == ["owm"]